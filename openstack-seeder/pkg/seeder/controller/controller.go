@@ -53,6 +53,7 @@ var (
 type Options struct {
 	KubeConfig       string
 	DryRun           bool
+	Serve            bool
 	InterfaceType    string
 	IgnoreNamespaces []string
 	OnlyNamespaces   []string
@@ -63,6 +64,7 @@ type SeederController struct {
 	SeederClient *rest.RESTClient
 	SeederScheme *runtime.Scheme
 	seedInformer cache.SharedIndexInformer
+	daemon       seederDaemon
 }
 
 // New creates a new operator using the given options
@@ -227,6 +229,7 @@ func (c *SeederController) seedApply(seed *seederv1.OpenstackSeed) {
 	}
 
 	yaml_seed, _ := yaml.Marshal(result.Spec)
+	seedName := seed.ObjectMeta.Namespace + "/" + seed.ObjectMeta.Name
 
 	glog.V(1).Infof("Seeding %s/%s ..", seed.ObjectMeta.Namespace, seed.ObjectMeta.Name)
 
@@ -247,11 +250,25 @@ func (c *SeederController) seedApply(seed *seederv1.OpenstackSeed) {
 		level = "DEBUG"
 	}
 
-	cmd := exec.Command(seeder_name, "--interface", c.Options.InterfaceType, "-l", level)
+	args := []string{"--interface", c.Options.InterfaceType, "-l", level}
 	if c.Options.DryRun {
-		cmd = exec.Command(seeder_name, "--interface", c.Options.InterfaceType, "-l", level, "--dry-run")
+		args = append(args, "--dry-run")
 	}
 
+	// stream the seed to a long-running seeder
+	if c.Options.Serve {
+		if err := c.daemon.Apply(seeder_name, args, seedName, yaml_seed); err != nil {
+			msg := fmt.Errorf("failed to seed '%s/%s' - version %s: %s", seed.ObjectMeta.Namespace, seed.ObjectMeta.Name, seed.ObjectMeta.ResourceVersion, err.Error())
+			raven.CaptureError(msg, nil)
+			glog.Errorf("ERROR: %s", msg.Error())
+			return
+		}
+		glog.Infof("Seeding of %s/%s - version %s done.", seed.ObjectMeta.Namespace, seed.ObjectMeta.Name, seed.ObjectMeta.ResourceVersion)
+		return
+	}
+
+	cmd := exec.Command(seeder_name, append(args, "--seed-name", seedName)...)
+
 	// inherit the os-environment
 	env := os.Environ()
 	cmd.Env = env
@@ -0,0 +1,134 @@
+/*
+Copyright 2017 SAP SE
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+*/
+
+package controller
+
+import (
+	"bufio"
+	"encoding/json"
+	"fmt"
+	"io"
+	"os"
+	"os/exec"
+	"sync"
+
+	"github.com/golang/glog"
+)
+
+// seedResult is the per-document result a seeder in --serve mode reports back
+type seedResult struct {
+	Status        string          `json:"status"`
+	Error         string          `json:"error,omitempty"`
+	Duration      float64         `json:"duration,omitempty"`
+	ParseDuration float64         `json:"parse_duration,omitempty"`
+	MaxRSS        int64           `json:"max_rss,omitempty"`
+	Plan          json.RawMessage `json:"plan,omitempty"`
+}
+
+// seederDaemon keeps a single python seeder running in --serve mode and streams
+// the seeds to its stdin, so that the interpreter startup, the authentication and
+// the seeders caches are paid for once instead of once per seed
+type seederDaemon struct {
+	mu      sync.Mutex
+	cmd     *exec.Cmd
+	stdin   io.WriteCloser
+	results *bufio.Reader
+}
+
+func (d *seederDaemon) start(name string, args []string) error {
+	cmd := exec.Command(name, append(args, "--serve")...)
+
+	// inherit the os-environment
+	cmd.Env = os.Environ()
+	cmd.Stderr = os.Stderr
+
+	stdin, err := cmd.StdinPipe()
+	if err != nil {
+		return err
+	}
+	stdout, err := cmd.StdoutPipe()
+	if err != nil {
+		return err
+	}
+
+	glog.V(2).Infof("Spawning %s, args: %s, env: %s", cmd.Path, cmd.Args, cmd.Env)
+
+	if err = cmd.Start(); err != nil {
+		return fmt.Errorf("could not spawn %s: %v", name, err)
+	}
+	glog.Infof("Started %s in serve mode (pid %d)", name, cmd.Process.Pid)
+
+	d.cmd = cmd
+	d.stdin = stdin
+	d.results = bufio.NewReader(stdout)
+	return nil
+}
+
+func (d *seederDaemon) stop() {
+	if d.cmd == nil {
+		return
+	}
+	d.stdin.Close()
+	d.cmd.Process.Kill()
+	d.cmd.Wait()
+	d.cmd = nil
+}
+
+// Apply streams a seed to the seeder (starting it if needed) and waits for its result.
+// seedName identifies the seed towards the seeder, e.g. to keep its state apart from other seeds
+func (d *seederDaemon) Apply(name string, args []string, seedName string, seed []byte) error {
+	d.mu.Lock()
+	defer d.mu.Unlock()
+
+	if d.cmd == nil {
+		if err := d.start(name, args); err != nil {
+			return err
+		}
+	}
+
+	// a leading comment names the seed, a '...' line terminates the yaml document
+	document := append([]byte(fmt.Sprintf("# seed: %s\n", seedName)), seed...)
+	document = append(document, []byte("\n...\n")...)
+	if _, err := d.stdin.Write(document); err != nil {
+		d.stop()
+		return fmt.Errorf("could not send seed to %s: %v", name, err)
+	}
+
+	line, err := d.results.ReadBytes('\n')
+	if err != nil {
+		d.stop()
+		return fmt.Errorf("could not read result from %s: %v", name, err)
+	}
+
+	var result seedResult
+	if err = json.Unmarshal(line, &result); err != nil {
+		d.stop()
+		return fmt.Errorf("invalid result from %s: %v", name, err)
+	}
+	glog.V(1).Infof("Seeder reported %s after %.3fs (parsing %.3fs, peak memory %d MiB)",
+		result.Status, result.Duration, result.ParseDuration, result.MaxRSS>>20)
+	if len(result.Plan) > 0 {
+		// the plan of a --dry-run
+		glog.Infof("Seed plan: %s", result.Plan)
+	}
+	if result.Status != "ok" {
+		if result.Error != "" {
+			return fmt.Errorf("seeder reported %s: %s", result.Status, result.Error)
+		}
+		return fmt.Errorf("seeder reported %s", result.Status)
+	}
+	return nil
+}
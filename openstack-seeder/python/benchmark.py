@@ -0,0 +1,945 @@
+#!/usr/bin/env python
+
+# Copyright 2017 SAP SE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+benchmark the seeder against an in-process fake openstack
+
+the fake implements just enough of the keystone, neutron, nova, designate,
+swift, manila, cinder and placement apis for the seeder. a synthetic seed is
+applied twice: cold (everything has to be created) and unchanged (nothing has
+to be done). for both runs the wall time and the api calls per endpoint are
+reported, e.g.
+
+    python benchmark.py --domains 2 --projects 20 --networks 2 \\
+        --recordsets 20 --role-assignments 5
+
+--save FILE keeps the call counts, --baseline FILE fails the benchmark if an
+endpoint is called more often than in the baseline, which catches call-count
+regressions like an O(n) pattern turning into O(n^2).
+"""
+
+import argparse
+import copy
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import openstack_seeder
+
+# the services of the fake, by catalog type: (path prefix, version suffix)
+SERVICES = {
+    'identity': ('identity', '/v3'),
+    'network': ('network', ''),
+    'compute': ('compute', '/v2.1'),
+    'dns': ('dns', ''),
+    'object-store': ('object-store', '/v1/AUTH_admin'),
+    'sharev2': ('sharev2', '/v2'),
+    'volumev3': ('volumev3', '/v3'),
+    'placement': ('placement', ''),
+}
+
+# designate pages its listings
+DNS_PAGE_SIZE = 20
+
+ID_SEGMENT = re.compile(r'^([0-9a-f]{32}|[0-9a-f-]{36}|AUTH_.+)$')
+
+
+class Response(object):
+    """ the response of the fake to a request """
+
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class NotFound(Exception):
+    pass
+
+
+def new_id(dashed=True):
+    if dashed:
+        return str(uuid.uuid4())
+    return uuid.uuid4().hex
+
+
+def singular(kind):
+    """ the singular of a collection name, e.g. rbac_policies """
+    if kind.endswith('ies'):
+        return kind[:-3] + 'y'
+    return kind[:-1]
+
+
+def matches(resource, filters):
+    """ the (string-)equality filters of a listing """
+    for k, v in filters.items():
+        if str(resource.get(k)) != v and \
+                str(resource.get(k)).lower() != v.lower():
+            return False
+    return True
+
+
+class FakeOpenstack(object):
+    """
+    an in-process stand-in for the openstack apis the seeder uses, counting
+    the calls per endpoint
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.calls = Counter()
+        self.url = None
+        self.server = None
+        # resources by (service, kind) and id
+        self.stores = {}
+        # keystone role assignments and group members
+        self.assignments = set()
+        self.members = set()
+        # swift accounts and their containers
+        self.accounts = {}
+
+        # the preexisting admin domain, project and user
+        self.store('identity', 'domains')['default'] = {
+            'id': 'default', 'name': 'Default', 'enabled': True,
+            'description': 'Owns users and tenants'}
+        self.admin_project = {'id': new_id(False), 'name': 'admin',
+                              'domain_id': 'default', 'enabled': True}
+        self.store('identity', 'projects')[self.admin_project['id']] = \
+            self.admin_project
+        self.admin_user = {'id': new_id(False), 'name': 'admin',
+                           'domain_id': 'default', 'enabled': True}
+        self.store('identity', 'users')[self.admin_user['id']] = \
+            self.admin_user
+
+    def store(self, service, kind):
+        with self.lock:
+            return self.stores.setdefault((service, kind), {})
+
+    def start(self):
+        """ serve the fake on a free port of the loopback interface """
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def endpoint(self, service):
+        prefix, suffix = SERVICES[service]
+        return '%s/%s%s' % (self.url, prefix, suffix)
+
+    def count(self, service, method, template, query):
+        if query:
+            template += '?' + '&'.join(sorted(set(k for k, _ in query)))
+        with self.lock:
+            self.calls['%s %s %s' % (service, method, template)] += 1
+
+    def handle(self, method, path, query, headers, body):
+        """ dispatch a request to the handler of its service """
+        segments = [s for s in path.split('/') if s]
+        services = dict((prefix, service)
+                        for service, (prefix, _) in SERVICES.items())
+        if not segments or segments[0] not in services:
+            return Response(404, {'error': 'unknown service'})
+        service = services[segments[0]]
+
+        template = '/' + '/'.join(
+            '{id}' if ID_SEGMENT.match(s) else s for s in segments)
+        handler = getattr(self, 'handle_' + service.replace('-', '_'))
+        try:
+            response = handler(method, segments[1:], dict(query), headers,
+                               body)
+        except NotFound:
+            response = Response(404, {'error': 'not found'})
+        # names in the path of the endpoints, which take a name
+        if service == 'object-store' and len(segments) > 3:
+            template = '/'.join(template.split('/')[:4]) + '/{container}'
+        if service == 'placement' and len(segments) > 2:
+            template = '/'.join(template.split('/')[:3]) + '/{name}'
+        self.count(service, method, template, query)
+
+        # echo the microversion
+        for header, value in headers.items():
+            if header.lower().startswith('x-openstack-') or \
+                    header.lower() == 'openstack-api-version':
+                response.headers.setdefault(header, value)
+        return response
+
+    def versions(self, service, version, status='CURRENT'):
+        href = '%s/%s/%s/' % (self.url, SERVICES[service][0], version)
+        return {'id': version, 'status': status, 'updated': '2018-01-01',
+                'links': [{'rel': 'self', 'href': href}],
+                'media-types': [{'base': 'application/json',
+                                 'type': 'application/json'}]}
+
+    def collection(self, service, kind, query, filters=(), page=False):
+        """ list a collection, filtered by the query (and paginated) """
+        with self.lock:
+            resources = list(self.store(service, kind).values())
+        criteria = dict((k, v) for k, v in query.items() if k in filters)
+        resources = [r for r in resources if matches(r, criteria)]
+        if not page:
+            return resources, None
+        resources.sort(key=lambda r: r['id'])
+        if 'marker' in query:
+            resources = [r for r in resources if r['id'] > query['marker']]
+        limit = int(query.get('limit', DNS_PAGE_SIZE))
+        if len(resources) > limit:
+            return resources[:limit], resources[limit - 1]['id']
+        return resources, None
+
+    def get(self, service, kind, id):
+        with self.lock:
+            resource = self.store(service, kind).get(id)
+        if resource is None:
+            raise NotFound()
+        return resource
+
+    def create(self, service, kind, resource, dashed=True):
+        resource = dict(resource)
+        resource.setdefault('id', new_id(dashed))
+        with self.lock:
+            self.store(service, kind)[resource['id']] = resource
+        return resource
+
+    def update(self, service, kind, id, changes):
+        with self.lock:
+            resource = self.get(service, kind, id)
+            resource.update(changes)
+            return resource
+
+    # keystone
+
+    def token(self, body):
+        catalog = []
+        for service in SERVICES:
+            url = self.endpoint(service)
+            catalog.append({
+                'type': service, 'name': service, 'id': new_id(False),
+                'endpoints': [{'id': new_id(False), 'interface': interface,
+                               'region': 'local', 'region_id': 'local',
+                               'url': url}
+                              for interface in ('public', 'internal',
+                                                'admin')]})
+        project = self.admin_project
+        scope = body.get('auth', {}).get('scope', {}).get('project', {})
+        if scope.get('id'):
+            project = dict(project, id=scope['id'])
+        token = {'methods': ['password'],
+                 'expires_at': time.strftime('%Y-%m-%dT%H:%M:%S.000000Z',
+                                             time.gmtime(time.time() + 3600)),
+                 'issued_at': time.strftime('%Y-%m-%dT%H:%M:%S.000000Z',
+                                            time.gmtime()),
+                 'user': {'id': self.admin_user['id'], 'name': 'admin',
+                          'domain': {'id': 'default', 'name': 'Default'}},
+                 'project': {'id': project['id'], 'name': project['name'],
+                             'domain': {'id': 'default', 'name': 'Default'}},
+                 'roles': [{'id': new_id(False), 'name': 'admin'}],
+                 'catalog': catalog}
+        return Response(201, {'token': token},
+                        {'X-Subject-Token': new_id(False)})
+
+    def handle_identity(self, method, segments, query, headers, body):
+        if not segments:
+            return Response(300, {'versions': {'values': [
+                self.versions('identity', 'v3', 'stable')]}})
+        segments = segments[1:]
+        if not segments:
+            return Response(200, {'version': self.versions('identity', 'v3',
+                                                           'stable')})
+        if segments == ['auth', 'tokens']:
+            return self.token(body or {})
+
+        kind = segments[0]
+        if kind == 'role_assignments':
+            return Response(200, {'role_assignments':
+                                  self.role_assignments(query),
+                                  'links': {}})
+
+        # grants: /{projects|domains}/{id}/{users|groups}/{id}/roles/{id}
+        if len(segments) == 6 and segments[4] == 'roles':
+            grant = tuple(segments)
+            with self.lock:
+                if method == 'PUT':
+                    self.assignments.add(grant)
+                    return Response(204)
+                if grant in self.assignments:
+                    return Response(204)
+            raise NotFound()
+
+        # group members: /groups/{id}/users[/{id}]
+        if kind == 'groups' and len(segments) >= 3 and \
+                segments[2] == 'users':
+            if len(segments) == 4:
+                with self.lock:
+                    self.members.add((segments[1], segments[3]))
+                return Response(204)
+            with self.lock:
+                ids = [u for g, u in self.members if g == segments[1]]
+            users = [self.get('identity', 'users', id) for id in ids]
+            return Response(200, {'users': users, 'links': {}})
+
+        key = singular(kind)
+        if len(segments) == 1:
+            if method == 'POST':
+                resource = dict(body[key])
+                resource.pop('password', None)
+                if kind in ('projects', 'users', 'groups'):
+                    resource.setdefault('domain_id', 'default')
+                if kind in ('projects', 'users', 'domains'):
+                    resource.setdefault('enabled', True)
+                return Response(201, {key: self.create('identity', kind,
+                                                       resource, False)})
+            filters = ('name', 'domain_id', 'type', 'interface',
+                       'service_id', 'region_id', 'user_id')
+            resources, _ = self.collection('identity', kind, query, filters)
+            if kind == 'roles' and 'domain_id' not in query:
+                resources = [r for r in resources if not r.get('domain_id')]
+            return Response(200, {kind: resources, 'links': {}})
+
+        if method == 'PATCH':
+            changes = dict(body[key])
+            changes.pop('password', None)
+            return Response(200, {key: self.update('identity', kind,
+                                                   segments[1], changes)})
+        return Response(200, {key: self.get('identity', kind, segments[1])})
+
+    def role_assignments(self, query):
+        with self.lock:
+            grants = list(self.assignments)
+        result = []
+        for target, target_id, actor, actor_id, _, role_id in grants:
+            scope = target[:-1]
+            if query.get('scope.%s.id' % scope, target_id) != target_id:
+                continue
+            if 'scope.project.id' in query and scope != 'project' or \
+                    'scope.domain.id' in query and scope != 'domain':
+                continue
+            if query.get('%s.id' % actor[:-1], actor_id) != actor_id:
+                continue
+            result.append({'role': {'id': role_id},
+                           actor[:-1]: {'id': actor_id},
+                           'scope': {scope: {'id': target_id}}})
+        return result
+
+    # neutron
+
+    def handle_network(self, method, segments, query, headers, body):
+        if not segments:
+            return Response(200, {'versions': [{
+                'id': 'v2.0', 'status': 'CURRENT', 'links': [
+                    {'rel': 'self', 'href': self.endpoint('network') +
+                     '/v2.0/'}]}]})
+        segments = segments[1:]
+        kind = segments[0].replace('-', '_')
+        key = singular(kind)
+
+        if kind == 'quotas':
+            quota = self.store('network', 'quotas').setdefault(
+                segments[1], {'network': 100, 'subnet': 100, 'port': 500,
+                              'router': 10, 'floatingip': 50,
+                              'subnetpool': -1, 'security_group': 10,
+                              'security_group_rule': 100,
+                              'rbac_policy': 10})
+            if method == 'PUT':
+                quota.update(body['quota'])
+            return Response(200, {'quota': quota})
+
+        # tags: /networks/{id}/tags/{tag}
+        if len(segments) == 4 and segments[2] == 'tags':
+            resource = self.get('network', kind, segments[1])
+            with self.lock:
+                if segments[3] not in resource['tags']:
+                    resource['tags'].append(segments[3])
+            return Response(201)
+
+        # router interfaces: /routers/{id}/add_router_interface
+        if len(segments) == 3 and segments[2] == 'add_router_interface':
+            router = self.get('network', 'routers', segments[1])
+            port = self.create('network', 'ports', {
+                'device_id': router['id'], 'tenant_id': router['tenant_id'],
+                'fixed_ips': [{'subnet_id': body.get('subnet_id')}],
+                'name': ''})
+            return Response(200, {'id': router['id'], 'port_id': port['id'],
+                                  'subnet_id': body.get('subnet_id')})
+
+        if len(segments) == 1:
+            if method == 'POST':
+                resource = dict(body[key])
+                resource.setdefault('tags', [])
+                if kind == 'subnetpools':
+                    resource.setdefault('prefixes', [])
+                return Response(201, {key: self.create('network', kind,
+                                                       resource)})
+            filters = ('name', 'tenant_id', 'project_id', 'network_id',
+                       'device_id', 'object_id', 'object_type', 'action',
+                       'target_tenant')
+            resources, _ = self.collection('network', kind, query, filters)
+            return Response(200, {kind: resources})
+
+        if method == 'PUT':
+            return Response(200, {key: self.update('network', kind,
+                                                   segments[1], body[key])})
+        return Response(200, {key: self.get('network', kind, segments[1])})
+
+    # nova
+
+    def handle_compute(self, method, segments, query, headers, body):
+        if not segments or segments == ['v2.1']:
+            return Response(200, {'version': self.versions('compute',
+                                                           'v2.1')})
+        segments = segments[1:]
+        if segments[0] != 'flavors':
+            raise NotFound()
+
+        if segments == ['flavors', 'detail']:
+            flavors, _ = self.collection('compute', 'flavors', {})
+            if query.get('is_public', 'None') not in ('None', 'none'):
+                public = query['is_public'].lower() in ('true', '1')
+                flavors = [f for f in flavors
+                           if f['os-flavor-access:is_public'] == public]
+            flavors.sort(key=lambda f: f['id'])
+            if 'marker' in query:
+                flavors = [f for f in flavors if f['id'] > query['marker']]
+            if 'limit' in query:
+                flavors = flavors[:int(query['limit'])]
+            return Response(200, {'flavors': flavors})
+
+        if segments == ['flavors'] and method == 'POST':
+            flavor = dict(body['flavor'])
+            flavor.setdefault('id', new_id())
+            flavor.setdefault('OS-FLV-DISABLED:disabled', False)
+            flavor.setdefault('OS-FLV-EXT-DATA:ephemeral', 0)
+            flavor.setdefault('os-flavor-access:is_public', True)
+            flavor.setdefault('swap', '')
+            flavor.setdefault('rxtx_factor', 1.0)
+            flavor['extra_specs'] = {}
+            flavor['access'] = []
+            flavor['links'] = []
+            return Response(200, {'flavor': self.create('compute', 'flavors',
+                                                        flavor)})
+
+        flavor = self.get('compute', 'flavors', segments[1])
+        if len(segments) == 2:
+            if method == 'DELETE':
+                with self.lock:
+                    del self.store('compute', 'flavors')[flavor['id']]
+                return Response(202)
+            return Response(200, {'flavor': flavor})
+        if segments[2] == 'os-extra_specs':
+            if method == 'POST':
+                with self.lock:
+                    flavor['extra_specs'].update(body['extra_specs'])
+            return Response(200, {'extra_specs': flavor['extra_specs']})
+        if segments[2] == 'action' and 'addTenantAccess' in body:
+            with self.lock:
+                flavor['access'].append(body['addTenantAccess']['tenant'])
+        access = [{'flavor_id': flavor['id'], 'tenant_id': t}
+                  for t in flavor['access']]
+        return Response(200, {'flavor_access': access})
+
+    # designate
+
+    def handle_dns(self, method, segments, query, headers, body):
+        if not segments:
+            return Response(200, {'versions': {'values': [
+                self.versions('dns', 'v2')]}})
+        segments = segments[1:]
+        kind = segments[0]
+        project = headers.get('X-Auth-Sudo-Project-ID') or \
+            self.admin_project['id']
+
+        if kind == 'quotas':
+            quota = self.store('dns', 'quotas').setdefault(
+                segments[1], {'zones': 10, 'zone_recordsets': 500,
+                              'zone_records': 500, 'recordset_records': 20,
+                              'api_export_size': 1000})
+            if method == 'PATCH':
+                quota.update(body)
+            return Response(200, quota)
+
+        if kind == 'zones' and len(segments) >= 3:
+            zone = self.get('dns', 'zones', segments[1])
+            return self.handle_recordsets(method, zone, segments[3:], query,
+                                          body)
+
+        if len(segments) == 1:
+            if method == 'POST':
+                resource = dict(body)
+                resource['project_id'] = project
+                if kind == 'zones':
+                    resource.setdefault('type', 'PRIMARY')
+                    resource.setdefault('status', 'ACTIVE')
+                    resource.setdefault('masters', [])
+                return Response(201, self.create('dns', kind, resource))
+            return self.dns_listing(kind, query, ('name', 'type', 'email',
+                                                  'project_id'))
+
+        if method in ('PATCH', 'PUT'):
+            return Response(200, self.update('dns', kind, segments[1], body))
+        return Response(200, self.get('dns', kind, segments[1]))
+
+    def handle_recordsets(self, method, zone, segments, query, body):
+        kind = 'recordsets:%s' % zone['id']
+        if not segments:
+            if method == 'POST':
+                resource = dict(body)
+                resource['zone_id'] = zone['id']
+                resource['zone_name'] = zone['name']
+                resource.setdefault('ttl', None)
+                resource.setdefault('description', None)
+                return Response(202, self.create('dns', kind, resource))
+            return self.dns_listing(kind, query, ('name', 'type'),
+                                    'recordsets')
+        if method == 'PUT':
+            return Response(202, self.update('dns', kind, segments[0], body))
+        return Response(200, self.get('dns', kind, segments[0]))
+
+    def dns_listing(self, kind, query, filters, key=None):
+        resources, marker = self.collection('dns', kind, query, filters,
+                                            page=True)
+        links = {'self': 'self'}
+        if marker:
+            params = dict(query, marker=marker)
+            links['next'] = '%s?%s' % (self.endpoint('dns'), '&'.join(
+                '%s=%s' % item for item in sorted(params.items())))
+        return Response(200, {key or kind: resources, 'links': links,
+                              'metadata': {'total_count': len(resources)}})
+
+    # swift
+
+    def handle_object_store(self, method, segments, query, headers, body):
+        # /v1/AUTH_{project}[/container]
+        account = segments[1]
+        with self.lock:
+            if len(segments) == 2:
+                if method == 'PUT' or method == 'POST':
+                    self.accounts.setdefault(account, {})
+                    return Response(201)
+                if account not in self.accounts:
+                    raise NotFound()
+                if method == 'GET':
+                    # swiftclient pages with the marker until a page is empty
+                    containers = sorted(c for c in self.accounts[account]
+                                        if c > query.get('marker', ''))
+                    containers = containers[:int(query.get('limit', 10000))]
+                    return Response(200, [{'name': c, 'count': 0,
+                                           'bytes': 0} for c in containers])
+                return Response(204, None, {
+                    'X-Account-Container-Count':
+                        str(len(self.accounts[account]))})
+
+            containers = self.accounts.setdefault(account, {})
+            name = segments[2]
+            metadata = dict((k.lower(), v) for k, v in headers.items()
+                            if k.lower().startswith('x-container-'))
+            if method == 'PUT':
+                containers.setdefault(name, {}).update(metadata)
+                return Response(201)
+            if name not in containers:
+                raise NotFound()
+            if method == 'POST':
+                containers[name].update(metadata)
+                return Response(204)
+            return Response(204, None, dict(containers[name]))
+
+    # manila and cinder
+
+    def handle_types(self, service, method, segments, query, body, key):
+        if not segments:
+            raise NotFound()
+        segments = segments[1:]
+        if segments and segments[0] == 'types':
+            if len(segments) == 1:
+                if method == 'POST':
+                    resource = dict(body[key])
+                    resource.setdefault('extra_specs', {})
+                    return Response(200, {key: self.create(service, 'types',
+                                                           resource)})
+                types, _ = self.collection(service, 'types', query)
+                return Response(200, {key + 's': types})
+            resource = self.get(service, 'types', segments[1])
+            if len(segments) == 2:
+                return Response(200, {key: resource})
+            if segments[2] == 'extra_specs':
+                with self.lock:
+                    if method == 'POST':
+                        resource['extra_specs'].update(body['extra_specs'])
+                    elif method == 'DELETE':
+                        resource['extra_specs'].pop(segments[3], None)
+                        return Response(202)
+                return Response(200, {'extra_specs': resource['extra_specs']})
+        if segments and segments[0] in ('types_access', 'share_types'):
+            return Response(200, {key + '_access': []})
+        raise NotFound()
+
+    def handle_sharev2(self, method, segments, query, headers, body):
+        return self.handle_types('sharev2', method, segments, query, body,
+                                 'share_type')
+
+    def handle_volumev3(self, method, segments, query, headers, body):
+        return self.handle_types('volumev3', method, segments, query, body,
+                                 'volume_type')
+
+    # placement
+
+    def handle_placement(self, method, segments, query, headers, body):
+        if not segments:
+            return Response(200, {'versions': [{
+                'id': 'v1.0', 'status': 'CURRENT', 'min_version': '1.0',
+                'max_version': '1.36', 'links': []}]})
+        kind = segments[0]
+        names = self.store('placement', kind)
+        if len(segments) == 1:
+            with self.lock:
+                listed = sorted(names)
+            if kind == 'traits':
+                return Response(200, {'traits': listed})
+            return Response(200, {kind: [{'name': n} for n in listed]})
+        with self.lock:
+            created = segments[1] not in names
+            names[segments[1]] = True
+        return Response(201 if created else 204)
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """ the http front of the fake openstack """
+
+    protocol_version = 'HTTP/1.1'
+    # the headers and the body are written separately, with nagle the body
+    # of a keep-alive response waits for the delayed ack of the client
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def dispatch(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = None
+        if length:
+            content = self.rfile.read(length)
+            try:
+                body = json.loads(content.decode('utf-8'))
+            except ValueError:
+                body = None
+
+        response = self.server.fake.handle(
+            self.command, parsed.path, parse_qsl(parsed.query),
+            dict(self.headers.items()), body)
+
+        content = b''
+        if response.body is not None and self.command != 'HEAD':
+            content = json.dumps(response.body).encode('utf-8')
+        self.send_response(response.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for header, value in response.headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = dispatch
+
+
+def generate_seed(options):
+    """ a synthetic seed scaled by the benchmark options """
+    roles = ['bench-role-%d' % i for i in range(max(1, options.roles))]
+    seed = {'roles': [{'name': role, 'description': 'benchmark role'}
+                      for role in roles],
+            'domains': []}
+
+    if options.flavors:
+        seed['flavors'] = [{'id': 'bench-%d' % i, 'name': 'bench-%d' % i,
+                            'vcpus': 1 + i % 8, 'ram': 1024 * (1 + i % 8),
+                            'disk': 10, 'is_public': False,
+                            'extra_specs': {'trait:CUSTOM_BENCH': 'required'}}
+                           for i in range(options.flavors)]
+    if options.share_types:
+        seed['share_types'] = [{
+            'name': 'bench-share-%d' % i, 'description': 'benchmark',
+            'is_public': True,
+            'specs': {'driver_handles_share_servers': False,
+                      'snapshot_support': True},
+            'extra_specs': {'bench': 'share-%d' % i}}
+            for i in range(options.share_types)]
+    if options.volume_types:
+        seed['volume_types'] = [{
+            'name': 'bench-volume-%d' % i, 'description': 'benchmark',
+            'is_public': True,
+            'extra_specs': {'volume_backend_name': 'bench-%d' % i}}
+            for i in range(options.volume_types)]
+
+    for d in range(options.domains):
+        domain = 'bench-domain-%d' % d
+        users = ['user-%d' % u for u in range(options.users)]
+        seed['domains'].append({
+            'name': domain,
+            'description': 'benchmark domain',
+            'enabled': True,
+            'users': [{'name': user, 'description': 'benchmark user',
+                       'enabled': True, 'password': 'secret'}
+                      for user in users],
+            'groups': [{'name': 'group-%d' % g,
+                        'description': 'benchmark group',
+                        'users': users,
+                        'role_assignments': [
+                            {'domain': domain, 'role': roles[0]}]}
+                       for g in range(options.groups)],
+            'projects': [generate_project(options, d, p, roles, users)
+                         for p in range(options.projects)]})
+    return seed
+
+
+def generate_project(options, d, p, roles, users):
+    """ a synthetic project of the seed """
+    project = {'name': 'project-%d' % p,
+               'description': 'benchmark project',
+               'enabled': True,
+               'role_assignments': [],
+               'networks': [],
+               'dns_zones': []}
+
+    for i in range(options.role_assignments):
+        assignment = {'role': roles[i % len(roles)]}
+        if users:
+            assignment['user'] = users[i % len(users)]
+        else:
+            assignment['group'] = 'group-0'
+        project['role_assignments'].append(assignment)
+
+    project['network_quota'] = {'network': 10 + options.networks,
+                                'subnet': 10 + options.networks}
+    for n in range(options.networks):
+        project['networks'].append({
+            'name': 'network-%d' % n,
+            'admin_state_up': True,
+            'tags': ['bench'],
+            'subnets': [{'name': 'subnet-%d-%d' % (n, s),
+                         'cidr': '10.%d.%d.0/24' % (n % 256, s % 256),
+                         'ip_version': 4,
+                         'enable_dhcp': True}
+                        for s in range(options.subnets)]})
+
+    for z in range(options.zones):
+        zone = 'zone-%d.project-%d.domain-%d.bench.example.com.' % (z, p, d)
+        project['dns_zones'].append({
+            'name': zone,
+            'email': 'hostmaster@example.com',
+            'ttl': 3600,
+            'type': 'PRIMARY',
+            'recordsets': [{'name': 'host-%d.%s' % (r, zone),
+                            'type': 'A',
+                            'ttl': 300,
+                            'records': ['10.0.%d.%d' % (r // 250,
+                                                        r % 250 + 1)]}
+                           for r in range(options.recordsets)]})
+
+    if options.containers:
+        project['swift'] = {'enabled': True, 'containers': [
+            {'name': 'container-%d' % c,
+             'metadata': {'meta-bench': 'container-%d' % c}}
+            for c in range(options.containers)]}
+
+    if options.flavors:
+        project['flavors'] = ['bench-%d' % f for f in range(options.flavors)]
+    return project
+
+
+def seeder_args(url, options):
+    """ the seeders arguments to authenticate against the fake """
+    argv = ['--interface', 'internal',
+            '-l', options.logLevel,
+            '--concurrency', str(options.concurrency),
+            '--domain-workers', str(options.domain_workers),
+            '--os-auth-type', 'password',
+            '--os-auth-url', url + '/identity/v3',
+            '--os-username', 'admin',
+            '--os-password', 'secret',
+            '--os-user-domain-name', 'Default',
+            '--os-project-name', 'admin',
+            '--os-project-domain-name', 'Default']
+    if options.designate_sudo:
+        argv.append('--designate-sudo')
+    for limit in options.service_limit:
+        argv.extend(['--service-limit', limit])
+    return openstack_seeder.make_parser(argv).parse_args(argv)
+
+
+def run(fake, seed, args, sess):
+    """ apply a seed and collect the wall time and the api calls """
+    with fake.lock:
+        fake.calls.clear()
+    start = time.time()
+    status = openstack_seeder.apply_seed(copy.deepcopy(seed), args, sess)
+    duration = time.time() - start
+    with fake.lock:
+        calls = dict(fake.calls)
+    # token requests are no writes
+    writes = sum(n for endpoint, n in calls.items()
+                 if endpoint.split(' ')[1] not in ('GET', 'HEAD') and
+                 not endpoint.endswith('/auth/tokens'))
+    errors = sum(m['errors'] for m in
+                 openstack_seeder.metrics['entities'].values())
+    return {'status': 'ok' if status == 0 and not errors else 'failed',
+            'errors': errors,
+            'seconds': round(duration, 3),
+            'api_calls': sum(calls.values()),
+            'writes': writes,
+            'calls': calls}
+
+
+def print_report(report, output):
+    for name, result in report.items():
+        output.write('%s apply: %s, %.3fs, %d api calls (%d writes), '
+                     '%d errors\n' % (name, result['status'],
+                                       result['seconds'], result['api_calls'],
+                                       result['writes'], result['errors']))
+        for endpoint, count in sorted(result['calls'].items(),
+                                      key=lambda item: (-item[1], item[0])):
+            output.write('  %6d  %s\n' % (count, endpoint))
+        output.write('\n')
+
+
+def compare(report, baseline, tolerance):
+    """
+    compare the call counts with a baseline
+    :return: the list of regressions
+    """
+    regressions = []
+    for name, result in report.items():
+        expected = baseline.get(name, {}).get('calls', {})
+        for endpoint, count in sorted(result['calls'].items()):
+            limit = expected.get(endpoint, 0) * (1 + tolerance)
+            if count > limit:
+                regressions.append('%s apply: %s called %d times, %d in the '
+                                   'baseline' % (name, endpoint, count,
+                                                 expected.get(endpoint, 0)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='benchmark the seeder against a fake openstack')
+    parser.add_argument('--domains', type=int, default=2)
+    parser.add_argument('--projects', type=int, default=10,
+                        help='projects per domain')
+    parser.add_argument('--users', type=int, default=5,
+                        help='users per domain')
+    parser.add_argument('--groups', type=int, default=2,
+                        help='groups per domain')
+    parser.add_argument('--roles', type=int, default=3)
+    parser.add_argument('--role-assignments', type=int, default=3,
+                        help='role assignments per project')
+    parser.add_argument('--networks', type=int, default=2,
+                        help='networks per project')
+    parser.add_argument('--subnets', type=int, default=1,
+                        help='subnets per network')
+    parser.add_argument('--zones', type=int, default=1,
+                        help='dns zones per project')
+    parser.add_argument('--recordsets', type=int, default=10,
+                        help='recordsets per dns zone')
+    parser.add_argument('--containers', type=int, default=0,
+                        help='swift containers per project')
+    parser.add_argument('--flavors', type=int, default=0,
+                        help='private flavors, granted to every project')
+    parser.add_argument('--share-types', type=int, default=0)
+    parser.add_argument('--volume-types', type=int, default=0)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--domain-workers', type=int, default=1)
+    parser.add_argument('--designate-sudo', default=False,
+                        action='store_true')
+    parser.add_argument('--service-limit', action='append', default=[],
+                        metavar='SERVICE=N')
+    parser.add_argument('--json', default=False, action='store_true',
+                        help='report as json')
+    parser.add_argument('--save',
+                        help='the file to save the report to, as a baseline')
+    parser.add_argument('--baseline',
+                        help='a saved report, more api calls to an endpoint '
+                             'than in the baseline fail the benchmark')
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help='the tolerated increase of the call counts, '
+                             'e.g. 0.1 for 10%%')
+    parser.add_argument("-l", "--log", dest="logLevel",
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR',
+                                 'CRITICAL'],
+                        default='ERROR')
+    options = parser.parse_args()
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s:%(name)s:%(message)s',
+        datefmt='%d.%m.%Y %H:%M:%S',
+        level=getattr(logging, options.logLevel))
+
+    fake = FakeOpenstack()
+    url = fake.start()
+    try:
+        args = seeder_args(url, options)
+        sess = openstack_seeder.create_session(args)
+        seed = generate_seed(options)
+
+        report = {}
+        report['cold'] = run(fake, seed, args, sess)
+        report['unchanged'] = run(fake, seed, args, sess)
+    finally:
+        fake.stop()
+
+    if options.json:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        print_report(report, sys.stdout)
+
+    if options.save:
+        with open(options.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    failed = [name for name, result in report.items()
+              if result['status'] != 'ok']
+    for name in failed:
+        logging.error("%s apply failed" % name)
+    if report['unchanged']['writes']:
+        logging.warn("the unchanged apply made %d writes" %
+                     report['unchanged']['writes'])
+
+    if options.baseline:
+        with open(options.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, options.tolerance)
+        for regression in regressions:
+            logging.error("call-count regression: %s" % regression)
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,9 +16,19 @@
 
 import argparse
 import copy
+import hashlib
+import json
 import logging
 import os
+import queue
 import re
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial, wraps
+from resource import RUSAGE_SELF, getrusage
 from urllib.parse import urlparse
 
 import requests
@@ -45,6 +55,10 @@ from raven.transport.requests import RequestsHTTPTransport
 from swiftclient import client as swiftclient
 from urllib3.exceptions import InsecureRequestWarning
 
+# the libyaml based loader parses large seeds many times faster than the
+# pure python one, if pyyaml has been built with it
+SeedLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 # caches
 role_cache = {}
 domain_cache = {}
@@ -55,13 +69,130 @@ subnetpool_cache = {}
 network_cache = {}
 subnet_cache = {}
 
+# guards the caches and assignments when seeding concurrently
+cache_lock = threading.RLock()
+
 # assignments to be resolved after everything else has been processed
 group_members = {}
 role_assignments = []
 
+# per-thread buffer of the assignments collected by a domain worker
+pending = threading.local()
+
+# default number of concurrent requests per backend service type, capped
+# by --concurrency (which defaults to serial seeding), see --service-limit
+SERVICE_LIMITS = {
+    'identity': 4,
+    'network': 4,
+    'object-store': 4,
+    'dns': 2,
+    'compute': 4,
+    'sharev2': 2,
+    'placement': 4,
+}
+service_semaphores = {}
+
+# api clients, created once per kind and session, see get_client()
+clients = {}
+
+# designate clients acting on behalf of a project, by project-id, their
+# sessions share the connection pool of the seeders session
+designate_clients = {}
+
+# the version discovery of the endpoints, shared by all sessions
+discovery_cache = {}
+
+# page size of the designate listings, see list_designate()
+DNS_PAGE_SIZE = 1000
+
+# designate zones by (project-id, name) and by name, and tsig keys by name
+# of all projects, listed once per run, see get_designate_inventory()
+designate_inventory = {}
+designate_lock = threading.Lock()
+
+# the object-store storage-url prefix of the accounts, resolved once per
+# seed run, see get_swift_prefix()
+swift_auth = {}
+
+# pools of idle http connections to the object-store by netloc, shared by
+# all threads, see checkout_swift_connection()
+swift_connections = {}
+
+# nova flavors by id, including their extra specs, see get_flavor_catalog()
+FLAVOR_PAGE_SIZE = 1000
+flavor_catalog = {}
+flavor_lock = threading.Lock()
+
+# projects having access to a nova flavor by flavor-id, each flavor is
+# fetched when first needed, see get_flavor_access()
+flavor_access = {}
+
+# a lock per flavor cache entry being fetched, so that concurrent callers
+# wait for a single fetch, see fetch_flavor_cache()
+flavor_fetches = {}
+
+# manila share types and cinder volume types by name, including their
+# extra specs, see get_type_catalog()
+type_catalogs = {}
+type_catalog_lock = threading.Lock()
+
+# manila share types and the projects having access to the private ones,
+# see get_share_type_access()
+share_type_access = {}
+share_type_lock = threading.Lock()
+
+# fingerprints of the subtrees of the last successful run, see --state-file
+fingerprints = {}
+# fingerprints of the subtrees seen in the current run
+pending_fingerprints = {}
+# the subtrees of the current run which have been seeded only partially
+incomplete_fingerprints = set()
+# the identity of the seed being applied, its fingerprints are kept apart
+# from the ones of other seeds, see --seed-name
+seed_name = None
+
 resource_classes = set()
 traits = set()
 
+# a dry-run only reads, the changes it would make are collected in the
+# plan, see plan_change()
+dry_run = False
+plan = []
+
+# metrics of a seed run by entity kind and by backend service, see
+# --metrics-file
+metrics = {'entities': {}, 'services': {}}
+# per-thread stack of the entities being seeded, see metered()
+current = threading.local()
+
+# the api requests (and seeded entities) of a seed run, see --trace-file
+tracing = False
+trace = []
+
+# path segments of urls, which are replaced by {id} in the trace
+ID_PATTERN = re.compile(r'^([0-9a-fA-F-]{32,36}|\d+|AUTH_[0-9a-fA-F-]+)$')
+
+# the leading comment naming a seed document in serve mode
+SEED_HEADER = re.compile(r'^#\s*seed:\s*(\S+)\s*$', re.MULTILINE)
+
+# attributes blanked out when seed data is logged or planned, see redact()
+SECRET_KEYS = ('password', 'secret', 'userPassword', 'cam_password')
+
+# the seed is logged at debug level up to this many characters
+SEED_LOG_LIMIT = 65536
+
+# snapshot of the keystone entities touched by a seed run, indexed by
+# kind and (domain, name), see load_keystone_inventory()
+keystone_inventory = {}
+
+# the (kind, domain) indexes of the snapshot known to be complete, those of
+# the domains created by the run, a miss in them needs no fallback listing
+keystone_complete = set()
+
+# neutron resources of a seed run, indexed by (kind, tenant-id) and name,
+# see get_neutron_index()
+neutron_inventory = {}
+
 
 # todo: role.domainId ?
 def get_role_id(name, keystone):
@@ -95,16 +226,16 @@ def get_domain_id(name, keystone):
 def get_project_id(domain, name, keystone):
     """ get a (cached) project-id for a domain and project name """
     result = None
-    if domain not in project_cache:
-        project_cache[domain] = dict()
-    if name not in project_cache[domain]:
+    with cache_lock:
+        cache = project_cache.setdefault(domain, dict())
+    if name not in cache:
         projects = keystone.projects.list(
             domain=get_domain_id(domain, keystone),
             name=name)
         if projects:
-            result = project_cache[domain][name] = projects[0].id
+            result = cache[name] = projects[0].id
     else:
-        result = project_cache[domain][name]
+        result = cache[name]
     if not result:
         logging.error("project %s/%s not found" % (domain, name))
     return result
@@ -113,16 +244,16 @@ def get_project_id(domain, name, keystone):
 def get_user_id(domain, name, keystone):
     """ get a (cached) user-id for a domain and user name """
     result = None
-    if domain not in user_cache:
-        user_cache[domain] = dict()
-    if name not in user_cache[domain]:
+    with cache_lock:
+        cache = user_cache.setdefault(domain, dict())
+    if name not in cache:
         users = keystone.users.list(
             domain=get_domain_id(domain, keystone),
             name=name)
         if users:
-            result = user_cache[domain][name] = users[0].id
+            result = cache[name] = users[0].id
     else:
-        result = user_cache[domain][name]
+        result = cache[name]
     if not result:
         logging.error("user %s/%s not found" % (domain, name))
     return result
@@ -131,16 +262,16 @@ def get_user_id(domain, name, keystone):
 def get_group_id(domain, name, keystone):
     """ get a (cached) group-id for a domain and group name """
     result = None
-    if domain not in group_cache:
-        group_cache[domain] = dict()
-    if name not in group_cache[domain]:
+    with cache_lock:
+        cache = group_cache.setdefault(domain, dict())
+    if name not in cache:
         groups = keystone.groups.list(
             domain=get_domain_id(domain, keystone),
             name=name)
         if groups:
-            result = group_cache[domain][name] = groups[0].id
+            result = cache[name] = groups[0].id
     else:
-        result = group_cache[domain][name]
+        result = cache[name]
     if not result:
         logging.error("group %s/%s not found" % (domain, name))
     return result
@@ -148,18 +279,14 @@ def get_group_id(domain, name, keystone):
 
 def get_subnetpool_id(project_id, name, neutron):
     """ get a (cached) subnetpool-id for a project-id and subnetpool name """
-    if project_id not in subnetpool_cache:
-        subnetpool_cache[project_id] = dict()
-    if name not in subnetpool_cache[project_id]:
-        query = {'tenant_id': project_id, 'name': name}
-        result = neutron.list_subnetpools(retrieve_all=True, **query)
-        if result and result['subnetpools']:
-            result = subnetpool_cache[project_id][name] = \
-                result['subnetpools'][0]['id']
-        else:
-            result = None
+    with cache_lock:
+        cache = subnetpool_cache.setdefault(project_id, dict())
+    if name not in cache:
+        result = find_neutron_resource('subnetpools', project_id, name, neutron)
+        if result:
+            result = cache[name] = result['id']
     else:
-        result = subnetpool_cache[project_id][name]
+        result = cache[name]
     if not result:
         logging.error("subnetpool %s/%s not found" % (project_id, name))
     return result
@@ -167,18 +294,14 @@ def get_subnetpool_id(project_id, name, neutron):
 
 def get_network_id(project_id, name, neutron):
     """ get a (cached) network-id for a project-id and network name """
-    if project_id not in network_cache:
-        network_cache[project_id] = dict()
-    if name not in network_cache[project_id]:
-        query = {'tenant_id': project_id, 'name': name}
-        result = neutron.list_networks(retrieve_all=True, **query)
-        if result and result['networks']:
-            result = network_cache[project_id][name] = \
-                result['networks'][0]['id']
-        else:
-            result = None
+    with cache_lock:
+        cache = network_cache.setdefault(project_id, dict())
+    if name not in cache:
+        result = find_neutron_resource('networks', project_id, name, neutron)
+        if result:
+            result = cache[name] = result['id']
     else:
-        result = network_cache[project_id][name]
+        result = cache[name]
     if not result:
         logging.error("network %s/%s not found" % (project_id, name))
     return result
@@ -186,23 +309,968 @@ def get_network_id(project_id, name, neutron):
 
 def get_subnet_id(project_id, name, neutron):
     """ get a (cached) subnet-id for a project-id and subnet name """
-    if project_id not in subnet_cache:
-        subnet_cache[project_id] = dict()
-    if name not in subnet_cache[project_id]:
-        query = {'tenant_id': project_id, 'name': name}
-        result = neutron.list_subnets(retrieve_all=True, **query)
-        if result and result['subnets']:
-            result = subnet_cache[project_id][name] = \
-                result['subnets'][0]['id']
-        else:
-            result = None
+    with cache_lock:
+        cache = subnet_cache.setdefault(project_id, dict())
+    if name not in cache:
+        result = find_neutron_resource('subnets', project_id, name, neutron)
+        if result:
+            result = cache[name] = result['id']
     else:
-        result = subnet_cache[project_id][name]
+        result = cache[name]
     if not result:
         logging.error("subnet %s/%s not found" % (project_id, name))
     return result
 
 
+def remember_keystone_entity(kind, key, resource):
+    """ add a keystone entity to the inventory snapshot and the id caches """
+    with cache_lock:
+        keystone_inventory.setdefault(kind, {})[key] = resource
+        if kind == 'domains':
+            domain_cache[key] = resource.id
+        elif kind == 'roles':
+            if key[0] is None:
+                role_cache[key[1]] = resource.id
+        elif kind == 'projects':
+            project_cache.setdefault(key[0], {})[key[1]] = resource.id
+        elif kind == 'users':
+            user_cache.setdefault(key[0], {})[key[1]] = resource.id
+        elif kind == 'groups':
+            group_cache.setdefault(key[0], {})[key[1]] = resource.id
+
+
+def find_keystone_entity(kind, key, fetch):
+    """
+    look up a keystone entity in the inventory snapshot
+    :param kind: domains, roles, projects, users or groups
+    :param key: the entities name, (domain-id, name) for roles and
+                (domain-name, name) for projects, users and groups
+    :param fetch: fallback listing, used if the snapshot misses the entity,
+                  unless the index of its domain is complete
+    :return: the entity or None
+    """
+    with cache_lock:
+        index = keystone_inventory.setdefault(kind, {})
+        complete = isinstance(key, tuple) and \
+            (kind, key[0]) in keystone_complete
+    if key in index:
+        return index[key]
+    if complete:
+        return None
+    # the listings of an existing domain may have been truncated
+    result = fetch()
+    if result:
+        remember_keystone_entity(kind, key, result[0])
+        return result[0]
+    return None
+
+
+def remember_created_domain(resource):
+    """
+    add a domain created by the run to the inventory, with complete (and
+    empty) indexes of its projects, users, groups and roles
+    """
+    remember_keystone_entity('domains', resource.name, resource)
+    with cache_lock:
+        for kind in ('projects', 'users', 'groups'):
+            keystone_complete.add((kind, resource.name))
+        # domain roles are indexed by domain-id
+        keystone_complete.add(('roles', resource.id))
+
+
+def load_keystone_inventory(config, keystone):
+    """
+    snapshot the domains and roles, and the projects, users and groups of
+    the seeded domains with one listing per kind (and domain)
+    """
+    keystone_inventory.clear()
+    keystone_complete.clear()
+
+    for resource in keystone.domains.list():
+        remember_keystone_entity('domains', resource.name, resource)
+    for resource in keystone.roles.list():
+        remember_keystone_entity('roles', (None, resource.name), resource)
+
+    for domain in config.get('domains') or []:
+        if not domain or not domain.get('name'):
+            continue
+        dom = keystone_inventory['domains'].get(domain['name'])
+        if not dom:
+            # a new domain, everything in it has to be created anyway
+            continue
+        if domain.get('roles'):
+            for resource in keystone.roles.list(domain=dom.id):
+                remember_keystone_entity('roles', (dom.id, resource.name),
+                                         resource)
+        for kind in ('projects', 'users', 'groups'):
+            if domain.get(kind):
+                manager = getattr(keystone, kind)
+                for resource in manager.list(domain=dom.id):
+                    remember_keystone_entity(kind, (dom.name, resource.name),
+                                             resource)
+
+    logging.debug("keystone inventory: %s", dict(
+        (kind, len(index)) for kind, index in keystone_inventory.items()))
+
+
+def get_neutron_index(kind, tenant_id, neutron):
+    """
+    get the (cached) index of a projects neutron resources of a kind, which
+    is fetched with a single listing
+    :param kind: networks, subnets, routers, subnetpools or address_scopes
+    :param tenant_id:
+    :param neutron:
+    :return: dict of resource name to list of resources
+    """
+    key = (kind, tenant_id)
+    with cache_lock:
+        index = neutron_inventory.get(key)
+    if index is None:
+        result = getattr(neutron, 'list_' + kind)(retrieve_all=True,
+                                                  tenant_id=tenant_id)
+        index = {}
+        for resource in result[kind]:
+            index.setdefault(resource['name'], []).append(resource)
+        with cache_lock:
+            index = neutron_inventory.setdefault(key, index)
+    return index
+
+
+def find_neutron_resource(kind, tenant_id, name, neutron, **match):
+    """ look up a projects neutron resource by name (and attributes) """
+    for resource in get_neutron_index(kind, tenant_id, neutron).get(name, []):
+        if all(resource.get(k) == v for k, v in match.items()):
+            return resource
+    return None
+
+
+def remember_neutron_resource(kind, resource):
+    """ add a created or updated neutron resource to the inventory """
+    with cache_lock:
+        index = neutron_inventory.get((kind, resource['tenant_id']))
+        if index is None:
+            # not fetched yet, the listing will include it
+            return
+        entries = [r for r in index.get(resource['name'], [])
+                   if r['id'] != resource['id']]
+        entries.append(resource)
+        index[resource['name']] = entries
+
+
+def get_share_type_access(manila, args):
+    """
+    get the (cached) manila share types and the projects having access to
+    each private share type, which are fetched once per run
+    :param manila:
+    :param args:
+    :return: (list of share types, dict of share-type-id to project-ids)
+    """
+    with share_type_lock:
+        if not share_type_access:
+            share_types = manila.share_types.list()
+            private = [t for t in share_types if t.is_public is False]
+            projects = run_concurrently(
+                lambda t: set(a.project_id for a in
+                              manila.share_type_access.list(t)),
+                private, get_service_limit('sharev2', args))
+            share_type_access['types'] = share_types
+            share_type_access['access'] = dict(
+                zip([t.id for t in private], projects))
+        return share_type_access['types'], share_type_access['access']
+
+
+def fetch_flavor_cache(cache, key, fetch):
+    """
+    get an entry of a flavor cache, fetching it once when missing. the
+    flavor lock only guards the caches, the fetch holds a lock of its own
+    entry, which concurrent callers of the same entry wait for
+    :param cache: flavor_catalog or flavor_access
+    :param key:
+    :param fetch: function fetching the entry
+    :return: the entry
+    """
+    with flavor_lock:
+        if key in cache:
+            return cache[key]
+        lock = flavor_fetches.setdefault((id(cache), key), threading.Lock())
+    with lock:
+        with flavor_lock:
+            if key in cache:
+                return cache[key]
+        value = fetch()
+        with flavor_lock:
+            cache[key] = value
+            return value
+
+
+def get_flavor_catalog(args, sess):
+    """
+    get the (cached) catalog of the public and private nova flavors, which
+    is fetched once per run
+    :param args:
+    :param sess:
+    :return: dict of flavor-id to flavor (including its extra specs)
+    """
+
+    def fetch():
+        nova = get_client('nova-2.61', args, sess)
+        flavors = {}
+        marker = None
+        while True:
+            # nova caps the page size at its [api] max_limit, which can be
+            # below the requested limit, only an empty page is final
+            page = nova.flavors.list(is_public=None, marker=marker,
+                                     limit=FLAVOR_PAGE_SIZE)
+            if not page:
+                return flavors
+            for flavor in page:
+                flavors[flavor.id] = flavor
+            marker = page[-1].id
+
+    return fetch_flavor_cache(flavor_catalog, 'flavors', fetch)
+
+
+def get_flavor_access(flavorid, args, sess):
+    """
+    get the (cached) projects having access to a nova flavor, which are
+    fetched once per run and flavor
+    :param flavorid:
+    :param args:
+    :param sess:
+    :return: set of project-ids
+    """
+    flavorid = str(flavorid)
+    if flavorid not in get_flavor_catalog(args, sess):
+        raise novaexceptions.NotFound(
+            404, "Flavor %s could not be found." % flavorid)
+
+    def fetch():
+        nova = get_client('nova', args, sess)
+        return set(
+            [a.tenant_id for a in nova.flavor_access.list(flavor=flavorid)])
+
+    return fetch_flavor_cache(flavor_access, flavorid, fetch)
+
+
+def get_type_catalog(kind, client):
+    """
+    get the (cached) catalog of manila share types or cinder volume types,
+    which is fetched once per run
+    :param kind: share_types or volume_types
+    :param client: a manila or cinder client
+    :return: dict of type name to type (including its extra specs)
+    """
+    with type_catalog_lock:
+        if kind not in type_catalogs:
+            if kind == 'share_types':
+                types = client.share_types.list(
+                    search_opts={'all_tenants': 1})
+            else:
+                # is_public=None lists the public and the private types
+                types = client.volume_types.list(is_public=None)
+            type_catalogs[kind] = dict((t.name, t) for t in types)
+        return type_catalogs[kind]
+
+
+def remember_type(kind, resource):
+    """ add a created share or volume type to its catalog """
+    with type_catalog_lock:
+        if kind in type_catalogs:
+            type_catalogs[kind][resource.name] = resource
+
+
+def extra_spec_differs(desired, current):
+    """ compare an extra spec, the apis return all values as strings """
+    if current is None:
+        return True
+    if isinstance(desired, bool):
+        return str(desired).lower() != str(current).lower()
+    return str(desired) != str(current)
+
+
+def update_extra_specs(resource, extra_specs, kind):
+    """
+    set and unset only those extra specs of a share or volume type, which
+    differ from the desired ones
+    """
+    current = getattr(resource, 'extra_specs', None) or {}
+    to_be_unset = [k for k in current if k not in extra_specs]
+    to_be_set = dict((k, v) for k, v in extra_specs.items()
+                     if extra_spec_differs(v, current.get(k)))
+    if (to_be_unset or to_be_set) and plan_change(
+            'update', '%s-extra-specs' % kind.replace(' ', '-'),
+            resource.name, dict(to_be_set, **dict.fromkeys(to_be_unset)),
+            current):
+        return
+    if to_be_unset:
+        logging.info("unset extra-specs %s of %s '%s'", to_be_unset, kind,
+                     resource.name)
+        resource.unset_keys(to_be_unset)
+    if to_be_set:
+        logging.info("set extra-specs %s of %s '%s'", to_be_set, kind,
+                     resource.name)
+        resource.set_keys(to_be_set)
+
+
+def add_role_assignment(assignment):
+    """
+    queue a role assignment to be resolved after the seeding, along with
+    the subtrees it belongs to
+    """
+    item = (assignment, open_subtrees())
+    buffer = getattr(pending, 'role_assignments', None)
+    if buffer is not None:
+        buffer.append(item)
+    else:
+        with cache_lock:
+            role_assignments.append(item)
+
+
+def add_group_member(group_id, user):
+    """
+    queue a group membership to be resolved after the seeding, along with
+    the subtrees it belongs to
+    """
+    buffer = getattr(pending, 'group_members', None)
+    if buffer is None:
+        buffer = group_members
+    item = (user, open_subtrees())
+    with cache_lock:
+        buffer.setdefault(group_id, []).append(item)
+
+
+def run_concurrently(func, items, workers):
+    """
+    call func for each item, using up to workers threads
+    :param func:
+    :param items:
+    :param workers:
+    :return: the results in the order of the items, the first error (in
+             the order of the items) is raised once all items are done
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    # the workers seed on behalf of the callers entities
+    entities = list(current_entities())
+
+    def call(item):
+        current.entities = list(entities)
+        return func(item)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        futures = [pool.submit(call, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def get_concurrency(args):
+    """ get the --concurrency of a run, 1 seeds serially """
+    return max(1, getattr(args, 'concurrency', 1) or 1)
+
+
+def get_service_limit(service, args):
+    """
+    get the concurrency limit of a backend service type: its default limit
+    capped by --concurrency, unless it is given with --service-limit
+    """
+    concurrency = get_concurrency(args)
+    limits = dict((name, min(limit, concurrency))
+                  for name, limit in SERVICE_LIMITS.items())
+    limits.update(getattr(args, 'service_limit', None) or [])
+    return limits.get(service, 1)
+
+
+def service_limit(value):
+    """
+    parse a --service-limit
+    :param value: SERVICE=N, e.g. network=8
+    :return: (service, limit)
+    """
+    name, _, limit = value.partition('=')
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if not name.strip() or limit < 1:
+        raise argparse.ArgumentTypeError(
+            "invalid service limit '%s', expected SERVICE=N with N > 0" %
+            value)
+    return name.strip(), limit
+
+
+def get_service_semaphore(service, args):
+    """ get the (shared) semaphore bounding the concurrency of a service """
+    with cache_lock:
+        if service not in service_semaphores:
+            service_semaphores[service] = threading.BoundedSemaphore(
+                get_service_limit(service, args))
+        return service_semaphores[service]
+
+
+def make_client(kind, args, sess):
+    """ create an api client of a kind """
+    if kind == 'keystone':
+        return keystoneclient.Client(session=sess, interface=args.interface)
+    if kind == 'neutron':
+        return neutronclient.Client(session=sess, interface=args.interface)
+    if kind == 'nova':
+        return novaclient.Client("2.1", session=sess,
+                                 endpoint_type=args.interface + 'URL')
+    if kind == 'nova-2.61':
+        # 2.61 embeds the extra specs in the flavor listings
+        return novaclient.Client("2.61", session=sess,
+                                 endpoint_type=args.interface + 'URL')
+    if kind == 'manila':
+        api_version = api_versions.APIVersion("2.40")
+        return manilaclient.Client(session=sess, api_version=api_version)
+    if kind == 'cinder':
+        return cinderclient.Client(session=sess, interface=args.interface,
+                                   api_version="3.50")
+    if kind == 'designate':
+        # the seeders own view of all projects, see get_designate_client()
+        # for the clients acting on behalf of a project
+        return designateclient.Client(session=sess,
+                                      endpoint_type=args.interface + 'URL',
+                                      all_projects=True)
+    if kind == 'placement':
+        ks_filter = {'service_type': 'placement',
+                     'interface': args.interface}
+        # api_version=1.7 -> idempotent resource class creation (and traits)
+        return placementclient(session=sess, ks_filter=ks_filter,
+                               api_version='1.7')
+    raise ValueError("unknown client kind '%s'" % kind)
+
+
+def get_client(kind, args, sess):
+    """
+    get a (cached) api client of a kind for a session, so that the client
+    construction and the version discovery happen only once per run
+    :param kind: keystone, neutron, nova, nova-2.61, manila, cinder,
+                 designate or placement
+    :param args:
+    :param sess:
+    :return: the client
+    """
+    key = (kind, id(sess))
+    with cache_lock:
+        if key not in clients:
+            # keep a reference to the session, so that its id stays unique
+            clients[key] = (sess, make_client(kind, args, sess))
+        return clients[key][1]
+
+
+def get_pool_size(args):
+    """ size the http connection pool for the seeders concurrency """
+    workers = getattr(args, 'domain_workers', 1) or 1
+    limit = max(get_service_limit(service, args)
+                for service in SERVICE_LIMITS)
+    return max(10, workers * limit)
+
+
+class SeederSession(session.Session):
+    """ a keystoneauth session accounting its api calls in the metrics """
+
+    def request(self, url, method, **kwargs):
+        endpoint_filter = kwargs.get('endpoint_filter') or {}
+        service = endpoint_filter.get('service_type')
+        if not service:
+            # token requests of the auth plugin
+            service = 'auth' if kwargs.get('authenticated') is False \
+                else 'unknown'
+        start = time.time()
+        status = None
+        try:
+            response = session.Session.request(self, url, method, **kwargs)
+            status = response.status_code
+            return response
+        except keystoneauthexceptions.HttpError as e:
+            status = e.http_status
+            raise
+        finally:
+            seconds = time.time() - start
+            record_api_call(service, seconds, not status or status >= 400)
+            if tracing:
+                trace_request(service, method, url, status, start, seconds)
+
+
+def make_session(args, auth, http=None):
+    """
+    create a keystoneauth session with an http connection pool, which is
+    shared by all clients of the session. the version discovery is shared
+    by all sessions
+    :param http: the requests session of another session, to share its
+                 connection pool, only the auth plugin differs
+    """
+    if http is None:
+        pool_size = get_pool_size(args)
+        http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        http.mount('https://', adapter)
+        http.mount('http://', adapter)
+    return SeederSession(auth=auth,
+                         session=http,
+                         user_agent='openstack-seeder',
+                         discovery_cache=discovery_cache,
+                         verify=not args.insecure)
+
+
+def get_designate_client(project, args, sess):
+    """
+    get a (cached) designate client acting on behalf of a project
+    :param project:
+    :param args:
+    :param sess: the seeders (admin) session
+    :return: the client
+    """
+    with cache_lock:
+        if project.id in designate_clients:
+            return designate_clients[project.id]
+
+        if getattr(args, 'designate_sudo', False):
+            # impersonate the project with the seeders own token
+            designate = designateclient.Client(
+                session=sess,
+                endpoint_type=args.interface + 'URL',
+                all_projects=True,
+                sudo_project_id=project.id)
+        else:
+            # the designate client needs a token scoped to a project.id,
+            # due to a crappy bugfix in https://review.openstack.org/#/c/187570/
+            designate_args = copy.copy(args)
+            designate_args.os_project_id = project.id
+            designate_args.os_domain_id = None
+            designate_args.os_domain_name = None
+            plugin = cli.load_from_argparse_arguments(designate_args)
+            designate = designateclient.Client(
+                session=make_session(args, plugin, sess.session),
+                endpoint_type=args.interface + 'URL',
+                all_projects=True)
+
+        designate_clients[project.id] = designate
+        return designate
+
+
+def fingerprint(subtree):
+    """ a stable content hash of a seed subtree """
+    content = json.dumps(subtree, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def subtree_unchanged(kind, name, subtree, args):
+    """
+    check if a seed subtree is unchanged since the last successful run and
+    does not need to be seeded again. has to be called within the metering
+    of the subtree, before it is modified by seeding it: a warning while
+    seeding the subtree marks it incomplete, see mark_incomplete()
+    :param kind: the kind of the subtree, e.g. domain or project
+    :param name: the unique name of the subtree
+    :param subtree:
+    :param args:
+    :return: True if the subtree can be skipped
+    """
+    # a dry-run compares everything against the live state
+    if dry_run or not getattr(args, 'state_file', None):
+        return False
+
+    key = '%s:%s' % (kind, name)
+    if seed_name:
+        key = '%s:%s' % (seed_name, key)
+    digest = fingerprint(subtree)
+    now = time.time()
+
+    previous = fingerprints.get(key)
+    unchanged = bool(not getattr(args, 'full', False) and
+                     previous and previous.get('hash') == digest and
+                     now - previous.get('applied', 0) < args.state_ttl)
+
+    with cache_lock:
+        if unchanged:
+            # the ttl keeps counting from the last time it was applied
+            pending_fingerprints[key] = previous
+        else:
+            pending_fingerprints[key] = {'hash': digest, 'applied': now}
+
+    if unchanged:
+        logging.debug("skipping unchanged %s %s", kind, name)
+    else:
+        entities = current_entities()
+        if entities:
+            entities[-1].setdefault('subtrees', []).append(key)
+    return unchanged
+
+
+def open_subtrees():
+    """ the fingerprint keys of the subtrees the current thread is seeding """
+    return [key for entity in current_entities()
+            for key in entity.get('subtrees', ())]
+
+
+def mark_incomplete(keys):
+    """
+    do not remember the fingerprints of subtrees which have been seeded only
+    partially, e.g. when an entry was skipped since a dependency is missing,
+    so that they are seeded again by the next run
+    """
+    if keys:
+        with cache_lock:
+            incomplete_fingerprints.update(keys)
+
+
+def load_fingerprints(args):
+    """ load the subtree fingerprints of the last successful run """
+    fingerprints.clear()
+    pending_fingerprints.clear()
+    incomplete_fingerprints.clear()
+    if not getattr(args, 'state_file', None) or \
+            not os.path.exists(args.state_file):
+        return
+    try:
+        with open(args.state_file, 'r') as f:
+            fingerprints.update(json.load(f))
+    except Exception as e:
+        logging.warn("ignoring unreadable state file %s: %s" % (
+            args.state_file, e))
+
+
+def save_fingerprints(args):
+    """ persist the subtree fingerprints of a successful run """
+    if not getattr(args, 'state_file', None):
+        return
+    state = dict(fingerprints)
+    state.update(pending_fingerprints)
+    for key in incomplete_fingerprints:
+        state.pop(key, None)
+    if incomplete_fingerprints:
+        logging.info("not saving the fingerprints of %d incomplete subtrees",
+                     len(incomplete_fingerprints))
+    tmp = args.state_file + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f, sort_keys=True)
+    os.replace(tmp, args.state_file)
+    fingerprints.clear()
+    fingerprints.update(state)
+    logging.debug("saved %d fingerprints to %s", len(state), args.state_file)
+
+
+class ErrorCounter(logging.Handler):
+    """ counts the errors logged while seeding """
+
+    def __init__(self):
+        logging.Handler.__init__(self, level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+        with cache_lock:
+            entity_metrics(current_kind())['errors'] += 1
+
+
+class IncompleteSubtrees(logging.Handler):
+    """
+    marks the subtrees being seeded incomplete on a warning, e.g. when an
+    entry has been skipped
+    """
+
+    def __init__(self):
+        logging.Handler.__init__(self, level=logging.WARNING)
+
+    def emit(self, record):
+        mark_incomplete(open_subtrees())
+
+
+def current_entities():
+    """ the stack of the entities the current thread is seeding """
+    entities = getattr(current, 'entities', None)
+    if entities is None:
+        entities = current.entities = []
+    return entities
+
+
+def current_kind():
+    """ the kind of the entity the current thread is seeding """
+    entities = current_entities()
+    if entities:
+        return entities[-1]['kind']
+    return 'seed'
+
+
+def entity_metrics(kind):
+    """ the metrics of an entity kind, to be called with the cache_lock """
+    if kind not in metrics['entities']:
+        metrics['entities'][kind] = {'calls': 0, 'seconds': 0.0,
+                                     'api_calls': 0, 'noop': 0, 'errors': 0,
+                                     'changes': {}}
+    return metrics['entities'][kind]
+
+
+def entity_name(value):
+    """ the name of an entity, which is a seed dict or an api resource """
+    if isinstance(value, dict):
+        return value.get('name')
+    if isinstance(value, str):
+        return value
+    return getattr(value, 'name', None)
+
+
+@contextmanager
+def metering(kind, name, function):
+    """
+    account the wall time, api calls, changes and errors of seeding a
+    single entity to its kind
+    :param kind: the entity kind, e.g. project or network
+    :param name: the name of the entity
+    :param function: the name of the seed function, for the trace
+    """
+    entity = {'kind': kind, 'function': function, 'name': name,
+              'changed': False}
+    entities = current_entities()
+    entities.append(entity)
+    start = time.time()
+    try:
+        yield entity
+    finally:
+        entities.pop()
+        seconds = time.time() - start
+        with cache_lock:
+            m = entity_metrics(kind)
+            m['calls'] += 1
+            m['seconds'] += seconds
+            if not entity['changed']:
+                m['noop'] += 1
+        if tracing:
+            trace_entity(entity, start, seconds)
+
+
+def metered(kind, arg=0):
+    """
+    decorator accounting the wall time, api calls, changes and errors of a
+    seed function of a single entity to its kind, see metering()
+    :param kind: the entity kind, e.g. project or network
+    :param arg: the position of the argument holding the entity (or None)
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            name = None
+            if arg is not None and len(args) > arg:
+                name = entity_name(args[arg])
+            with metering(kind, name, func.__name__):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_change(action, kind):
+    """ account a change (create, update, grant, ..) of an entity kind """
+    entities = current_entities()
+    if entities:
+        entities[-1]['changed'] = True
+    with cache_lock:
+        changes = entity_metrics(kind)['changes']
+        changes[action] = changes.get(action, 0) + 1
+
+
+def record_unchanged(kind, count):
+    """
+    account entities of a kind, which were found unchanged in a listing and
+    not seeded one by one
+    """
+    if count <= 0:
+        return
+    with cache_lock:
+        m = entity_metrics(kind)
+        m['calls'] += count
+        m['noop'] += count
+
+
+def record_api_call(service, seconds, failed):
+    """ account an api call to a backend service and the current entity """
+    kind = current_kind()
+    with cache_lock:
+        if service not in metrics['services']:
+            metrics['services'][service] = {'api_calls': 0, 'seconds': 0.0,
+                                            'errors': 0}
+        m = metrics['services'][service]
+        m['api_calls'] += 1
+        m['seconds'] += seconds
+        if failed:
+            m['errors'] += 1
+        entity_metrics(kind)['api_calls'] += 1
+
+
+def url_template(url):
+    """
+    normalize a request url: the ids in its path are replaced by {id}, the
+    values of its query are dropped
+    """
+    parsed = urlparse(url)
+    path = '/'.join('{id}' if ID_PATTERN.match(segment) else segment
+                    for segment in parsed.path.split('/'))
+    if parsed.query:
+        names = sorted(set(p.split('=', 1)[0]
+                           for p in parsed.query.split('&')))
+        path = '%s?%s' % (path, '&'.join(names))
+    return path
+
+
+def trace_request(service, method, url, status, start, seconds):
+    """ add an api request to the trace """
+    entities = current_entities()
+    entity = entities[-1] if entities else {}
+    event = {'service': service,
+             'method': method,
+             'url': url_template(url),
+             'status': status,
+             'start': start,
+             'latency': round(seconds, 6),
+             'thread': threading.get_ident(),
+             'function': entity.get('function'),
+             'kind': entity.get('kind'),
+             'entity': entity.get('name')}
+    with cache_lock:
+        trace.append(event)
+
+
+def trace_entity(entity, start, seconds):
+    """ add the seeding of an entity to the trace """
+    event = {'function': entity['function'],
+             'kind': entity['kind'],
+             'entity': entity['name'],
+             'start': start,
+             'latency': round(seconds, 6),
+             'thread': threading.get_ident()}
+    with cache_lock:
+        trace.append(event)
+
+
+def write_trace(args):
+    """
+    write the trace of a seed run to --trace-file, as json lines (one per
+    request) or in the chrome trace-event format (requests and entities)
+    """
+    with cache_lock:
+        events = sorted(trace, key=lambda e: e['start'])
+    try:
+        with open(args.trace_file, 'w') as f:
+            if args.trace_format == 'chrome':
+                json.dump({'traceEvents': [chrome_trace_event(e)
+                                           for e in events]}, f)
+                f.write('\n')
+            else:
+                for event in events:
+                    if 'service' in event:
+                        f.write(json.dumps(event, sort_keys=True) + '\n')
+    except Exception as e:
+        logging.warn("could not write trace to %s: %s" % (
+            args.trace_file, e))
+
+
+def chrome_trace_event(event):
+    """ a trace event in the chrome trace-event format (chrome://tracing) """
+    if 'service' in event:
+        name = '%s %s' % (event['method'], event['url'])
+        category = event['service']
+    else:
+        name = '%s %s' % (event['kind'], event['entity'] or '')
+        category = 'seed'
+    args = dict((k, v) for k, v in event.items()
+                if k not in ('start', 'latency', 'thread'))
+    return {'name': name.strip(), 'cat': category, 'ph': 'X',
+            'ts': int(event['start'] * 1000000),
+            'dur': int(event['latency'] * 1000000),
+            'pid': os.getpid(), 'tid': event['thread'], 'args': args}
+
+
+def reset_metrics():
+    """ start the metrics of a new seed run """
+    with cache_lock:
+        metrics['entities'] = {}
+        metrics['services'] = {}
+        metrics['started'] = time.time()
+
+
+def format_metrics(kind):
+    """ the metrics of a seed run as a json or prometheus text document """
+    with cache_lock:
+        entities = copy.deepcopy(metrics['entities'])
+        services = copy.deepcopy(metrics['services'])
+        started = metrics.get('started', time.time())
+    duration = time.time() - started
+
+    if kind == 'json':
+        return json.dumps({'duration': round(duration, 3),
+                           'finished': int(time.time()),
+                           'entities': entities,
+                           'services': services},
+                          indent=2, sort_keys=True)
+
+    lines = []
+
+    def metric(name, help, samples):
+        lines.append('# HELP openstack_seeder_%s %s' % (name, help))
+        lines.append('# TYPE openstack_seeder_%s gauge' % name)
+        for labels, value in samples:
+            if labels:
+                labels = '{%s}' % ','.join(
+                    '%s="%s"' % (k, str(v).replace('"', '\\"'))
+                    for k, v in labels)
+            lines.append('openstack_seeder_%s%s %s' % (name, labels or '',
+                                                       value))
+
+    metric('run_duration_seconds', 'Wall time of the seed run.',
+           [((), round(duration, 3))])
+    metric('run_finished_timestamp_seconds', 'End of the seed run.',
+           [((), int(time.time()))])
+    metric('entity_duration_seconds',
+           'Wall time spent seeding an entity kind (including dependants).',
+           [((('kind', k),), round(m['seconds'], 3))
+            for k, m in sorted(entities.items())])
+    metric('entity_seeded', 'Number of times an entity kind was seeded.',
+           [((('kind', k),), m['calls']) for k, m in sorted(entities.items())])
+    metric('entity_unchanged',
+           'Number of times an entity kind was seeded without changes.',
+           [((('kind', k),), m['noop']) for k, m in sorted(entities.items())])
+    metric('entity_api_calls', 'Number of api calls made for an entity kind.',
+           [((('kind', k),), m['api_calls'])
+            for k, m in sorted(entities.items())])
+    metric('entity_errors', 'Number of errors logged for an entity kind.',
+           [((('kind', k),), m['errors']) for k, m in sorted(entities.items())])
+    metric('entity_changes', 'Number of changes made to an entity kind.',
+           [((('kind', k), ('action', a)), n)
+            for k, m in sorted(entities.items())
+            for a, n in sorted(m['changes'].items())])
+    metric('service_api_calls', 'Number of api calls made to a service.',
+           [((('service', k),), m['api_calls'])
+            for k, m in sorted(services.items())])
+    metric('service_duration_seconds', 'Time spent in api calls to a service.',
+           [((('service', k),), round(m['seconds'], 3))
+            for k, m in sorted(services.items())])
+    metric('service_errors', 'Number of failed api calls to a service.',
+           [((('service', k),), m['errors'])
+            for k, m in sorted(services.items())])
+    return '\n'.join(lines)
+
+
+def write_metrics(args):
+    """ write the metrics of a seed run to --metrics-file """
+    if not getattr(args, 'metrics_file', None):
+        return
+    try:
+        tmp = args.metrics_file + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(format_metrics(args.metrics_format) + '\n')
+        # replaced atomically, for the node-exporters textfile collector
+        os.replace(tmp, args.metrics_file)
+    except Exception as e:
+        logging.warn("could not write metrics to %s: %s" % (
+            args.metrics_file, e))
+
+
 def sanitize(source, keys):
     result = {}
     for attr in keys:
@@ -214,54 +1282,191 @@ def sanitize(source, keys):
     return result
 
 
-def redact(source,
-           keys=('password', 'secret', 'userPassword', 'cam_password')):
-    def _blankout(data, k):
-        if isinstance(data, list):
-            for item in data:
-                _blankout(item, k)
-        elif isinstance(data, dict):
-            for attr in keys:
-                if attr in data:
-                    if isinstance(data[attr], str):
-                        data[attr] = '********'
-            for k, v in data.items():
-                _blankout(v, keys)
-
-    result = copy.deepcopy(source)
-    _blankout(result, keys)
-    return result
+def redact(source, keys=SECRET_KEYS):
+    """
+    the seed data with the secrets blanked out, only the dicts and lists
+    are copied
+    """
+    if isinstance(source, dict):
+        return dict((k, '********' if k in keys and isinstance(v, str)
+                     else redact(v, keys)) for k, v in source.items())
+    if isinstance(source, list):
+        return [redact(item, keys) for item in source]
+    return source
+
+
+def format_redacted(source, keys=SECRET_KEYS, limit=None):
+    """
+    format seed data like repr() does, with the secrets blanked out and
+    without copying it
+    :param limit: the output is cut off after about as many characters
+    """
+    parts = []
+    size = [0]
+
+    class Truncated(Exception):
+        pass
+
+    def _append(part):
+        parts.append(part)
+        size[0] += len(part)
+        if limit and size[0] > limit:
+            raise Truncated()
+
+    def _format(data):
+        if isinstance(data, dict):
+            _append('{')
+            for i, (k, v) in enumerate(data.items()):
+                _append('%s%r: ' % (', ' if i else '', k))
+                if k in keys and isinstance(v, str):
+                    _append("'********'")
+                else:
+                    _format(v)
+            _append('}')
+        elif isinstance(data, list):
+            _append('[')
+            for i, item in enumerate(data):
+                if i:
+                    _append(', ')
+                _format(item)
+            _append(']')
+        else:
+            _append(repr(data))
 
+    try:
+        _format(source)
+    except Truncated:
+        return ''.join(parts)[:limit] + '... (truncated)'
+    return ''.join(parts)
 
-def seed_role(role, keystone):
-    """ seed a keystone role """
-    logging.debug("seeding role %s" % role)
+
+def summarize(config, limit=20):
+    """
+    a size-bounded summary of a seed: the number of entities by section,
+    e.g. 'domains: 2, projects: 120, networks: 240'
+    """
+    counts = {}
+
+    def _count(data):
+        for k, v in data.items():
+            if isinstance(v, dict):
+                _count(v)
+            elif isinstance(v, list):
+                for item in v:
+                    if isinstance(item, dict):
+                        counts[k] = counts.get(k, 0) + 1
+                        _count(item)
+
+    _count(config)
+    sections = sorted(counts.items(), key=lambda c: (-c[1], c[0]))
+    summary = ', '.join('%s: %d' % c for c in sections[:limit])
+    if len(sections) > limit:
+        summary += ', ... (%d more sections)' % (len(sections) - limit)
+    return summary or 'nothing'
+
+
+class LazyFormat(object):
+    """
+    a log argument, which is only formatted if the log record is actually
+    emitted, e.g. logging.debug("seed: %s", LazyFormat(summarize, config))
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    __repr__ = __str__
+
+
+def redacted(source, limit=None):
+    """ a lazily formatted view of seed data with the secrets blanked out """
+    return LazyFormat(format_redacted, source, limit=limit)
+
+
+def plan_change(action, kind, name, desired=None, current=None):
+    """
+    record a change the seeder is about to make in the plan of a dry-run
+    :param action: create, update, grant or delete
+    :param kind: the kind of the entity, e.g. project or network
+    :param name: the (qualified) name of the entity
+    :param desired: the desired attributes of the entity
+    :param current: the current attributes of the entity (updates only)
+    :return: True if the change must be skipped, since it is a dry-run
+    """
+    record_change(action, kind)
+    if not dry_run:
+        return False
+
+    change = {'action': action, 'kind': kind, 'name': name}
+    if desired is not None and current is None:
+        change['attributes'] = redact(desired)
+    elif desired is not None:
+        differing = [k for k, v in desired.items() if current.get(k) != v]
+        desired = redact(desired)
+        current = redact(current)
+        change['attributes'] = dict(
+            (k, {'current': current.get(k), 'desired': desired[k]})
+            for k in differing)
+    logging.info("dry-run: %s %s '%s'", action, kind, name)
+    with cache_lock:
+        plan.append(change)
+    return True
+
+
+@metered('role')
+def seed_role(role, keystone, args=None):
+    """
+    seed a keystone role
+    :param role:
+    :param keystone:
+    :param args: to skip an unchanged global role, the roles of a domain
+                 are part of its subtree
+    """
+    if args and subtree_unchanged('role', role.get('name'), role, args):
+        return
+    logging.debug("seeding role %s", role)
 
     role = sanitize(role, ('name', 'description', 'domainId'))
 
+    key = (role.get('domainId'), role['name'])
     if 'domainId' in role:
-        result = keystone.roles.list(name=role['name'], domain=role['domainId'])
+        resource = find_keystone_entity(
+            'roles', key,
+            lambda: keystone.roles.list(name=role['name'], domain=role['domainId']))
     else:
-        result = keystone.roles.list(name=role['name'])
-    if not result:
-        logging.info("create role '%s'" % role)
+        resource = find_keystone_entity(
+            'roles', key,
+            lambda: keystone.roles.list(name=role['name']))
+    if not resource:
+        if plan_change('create', 'role', role['name'], role):
+            return
+        logging.info("create role '%s'", role)
         resource = keystone.roles.create(**role)
+        remember_keystone_entity('roles', key, resource)
     else:
-        resource = result[0]
         for attr in list(role.keys()):
             if role[attr] != resource._info.get(attr, ''):
-                logging.info(
-                    "%s differs. update role '%s'" % (attr, role))
-                keystone.roles.update(resource.id, **role)
+                if plan_change('update', 'role', role['name'], role,
+                               resource._info):
+                    break
+                logging.info("%s differs. update role '%s'", attr, role)
+                resource = keystone.roles.update(resource.id, **role)
+                remember_keystone_entity('roles', key, resource)
                 break
 
     # todo: role.domainId ?
-    role_cache[resource.name] = resource.id
+    with cache_lock:
+        role_cache[resource.name] = resource.id
 
 
+@metered('role-inference', None)
 def seed_role_inference(role_inference, keystone):
     """ seed a keystone role inference """
-    logging.debug("seeding role-inference %s" % role_inference)
+    logging.debug("seeding role-inference %s", role_inference)
 
     # todo: role.domainId ? just for global roles?
 
@@ -282,13 +1487,19 @@ def seed_role_inference(role_inference, keystone):
     try:
         keystone.inference_rules.get(prior_role_id, implied_role_id)
     except exceptions.NotFound:
-        logging.info("create role-inference '%s'" % role_inference)
+        if plan_change('create', 'role-inference', '%s/%s' % (
+                role_inference['prior_role'], role_inference['implied_role'])):
+            return
+        logging.info("create role-inference '%s'", role_inference)
         keystone.inference_rules.create(prior_role_id, implied_role_id)
 
 
-def seed_region(region, keystone):
+@metered('region', None)
+def seed_region(region, keystone, args):
     """ seed a keystone region """
-    logging.debug("seeding region %s" % region)
+    if subtree_unchanged('region', region.get('id'), region, args):
+        return
+    logging.debug("seeding region %s", region)
 
     region = sanitize(region,
                       ('id', 'description', 'parent_region'))
@@ -303,7 +1514,9 @@ def seed_region(region, keystone):
         result = None
 
     if not result:
-        logging.info("create region '%s'" % region['id'])
+        if plan_change('create', 'region', region['id'], region):
+            return
+        logging.info("create region '%s'", region['id'])
         keystone.regions.create(**region)
     else:  # wtf: why can't they deal with parent_region(_id) consistently
         wtf = region.copy()
@@ -311,74 +1524,88 @@ def seed_region(region, keystone):
             wtf['parent_region_id'] = wtf.pop('parent_region')
         for attr in list(wtf.keys()):
             if wtf[attr] != result._info.get(attr, ''):
-                logging.info(
-                    "%s differs. update region '%s'" % (attr, region))
+                if plan_change('update', 'region', region['id'], wtf,
+                               result._info):
+                    break
+                logging.info("%s differs. update region '%s'", attr, region)
                 keystone.regions.update(result.id, **region)
                 break
 
 
 def seed_endpoints(service, endpoints, keystone):
     """ seed a keystone service endpoints """
-    logging.debug("seeding endpoints %s %s" % (service.name, endpoints))
+    logging.debug("seeding endpoints %s %s", service.name, endpoints)
 
     for endpoint in endpoints:
-        endpoint = sanitize(endpoint, (
-            'interface', 'region', 'url', 'enabled', 'name'))
-        if 'interface' not in endpoint or not endpoint['interface']:
-            logging.warn(
-                "skipping endpoint '%s/%s', since it is misconfigured" % (
-                    service['name'], endpoint))
-            continue
+        with metering('endpoint', '%s/%s' % (
+                service.name, endpoint.get('interface')), 'seed_endpoints'):
+            endpoint = sanitize(endpoint, (
+                'interface', 'region', 'url', 'enabled', 'name'))
+            if 'interface' not in endpoint or not endpoint['interface']:
+                logging.warn(
+                    "skipping endpoint '%s/%s', since it is misconfigured" % (
+                        service['name'], endpoint))
+                continue
 
-        if 'url' not in endpoint or not endpoint['url']:
-            logging.warn(
-                "skipping endpoint '%s/%s', since it has no URL configured" % (
-                    service.name, endpoint['interface']))
-            continue
-        try:
-            parsed = urlparse(endpoint['url'])
-            if not parsed.scheme or not parsed.netloc:
+            if 'url' not in endpoint or not endpoint['url']:
                 logging.warn(
-                    "skipping endpoint '%s/%s', since its URL is misconfigured" % (
+                    "skipping endpoint '%s/%s', since it has no URL configured" % (
                         service.name, endpoint['interface']))
                 continue
-        except Exception:
-            logging.warn(
-                "skipping endpoint '%s/%s', since its URL is misconfigured" % (
-                    service.name, endpoint['interface']))
-            continue
-
-        region = None
-        if 'region' in endpoint:
-            region = endpoint['region']
-            if not region or not region.strip():
+            try:
+                parsed = urlparse(endpoint['url'])
+                if not parsed.scheme or not parsed.netloc:
+                    logging.warn(
+                        "skipping endpoint '%s/%s', since its URL is misconfigured" % (
+                            service.name, endpoint['interface']))
+                    continue
+            except Exception:
                 logging.warn(
-                    "skipping endpoint '%s/%s', since its region is misconfigured" % (
+                    "skipping endpoint '%s/%s', since its URL is misconfigured" % (
                         service.name, endpoint['interface']))
                 continue
 
-        result = keystone.endpoints.list(service=service.id,
-                                         interface=endpoint[
-                                             'interface'],
-                                         region_id=region)
-        if not result:
-            logging.info("create endpoint '%s/%s'" % (
-                service.name, endpoint['interface']))
-            keystone.endpoints.create(service.id, **endpoint)
-        else:
-            resource = result[0]
-            for attr in list(endpoint.keys()):
-                if endpoint[attr] != resource._info.get(attr, ''):
-                    logging.info("%s differs. update endpoint '%s/%s'" %
-                                 (attr, service.name,
-                                  endpoint['interface']))
-                    keystone.endpoints.update(resource.id, **endpoint)
-                    break
+            region = None
+            if 'region' in endpoint:
+                region = endpoint['region']
+                if not region or not region.strip():
+                    logging.warn(
+                        "skipping endpoint '%s/%s', since its region is misconfigured" % (
+                            service.name, endpoint['interface']))
+                    continue
 
+            result = keystone.endpoints.list(service=service.id,
+                                             interface=endpoint[
+                                                 'interface'],
+                                             region_id=region)
+            if not result:
+                if plan_change('create', 'endpoint', '%s/%s' % (
+                        service.name, endpoint['interface']), endpoint):
+                    continue
+                logging.info("create endpoint '%s/%s'", service.name,
+                             endpoint['interface'])
+                keystone.endpoints.create(service.id, **endpoint)
+            else:
+                resource = result[0]
+                for attr in list(endpoint.keys()):
+                    if endpoint[attr] != resource._info.get(attr, ''):
+                        if plan_change('update', 'endpoint', '%s/%s' % (
+                                service.name, endpoint['interface']), endpoint,
+                                resource._info):
+                            break
+                        logging.info("%s differs. update endpoint '%s/%s'", attr,
+                                     service.name, endpoint['interface'])
+                        keystone.endpoints.update(resource.id, **endpoint)
+                        break
 
-def seed_service(service, keystone):
+
+@metered('service')
+def seed_service(service, keystone, args):
     """ seed a keystone service """
-    logging.debug("seeding service %s" % service)
+    if subtree_unchanged('service', '%s/%s' % (
+            service.get('type'), service.get('name')), service, args):
+        return
+    logging.debug("seeding service %s", service)
     endpoints = None
     if 'endpoints' in service:
         endpoints = service.pop('endpoints', None)
@@ -394,16 +1621,23 @@ def seed_service(service, keystone):
     result = keystone.services.list(name=service['name'],
                                     type=service['type'])
     if not result:
-        logging.info(
-            "create service '%s/%s'" % (
-                service['name'], service['type']))
+        if plan_change('create', 'service', '%s/%s' % (
+                service['name'], service['type']),
+                dict(service, endpoints=endpoints or [])):
+            return
+        logging.info("create service '%s/%s'", service['name'],
+                     service['type'])
         resource = keystone.services.create(**service)
     else:
         resource = result[0]
         for attr in list(service.keys()):
             if service[attr] != resource._info.get(attr, ''):
-                logging.info("%s differs. update service '%s/%s'" % (
-                    attr, service['name'], service['type']))
+                if plan_change('update', 'service', '%s/%s' % (
+                        service['name'], service['type']), service,
+                        resource._info):
+                    break
+                logging.info("%s differs. update service '%s/%s'", attr,
+                             service['name'], service['type'])
                 keystone.services.update(resource.id, **service)
                 break
 
@@ -413,195 +1647,214 @@ def seed_service(service, keystone):
 
 def seed_users(domain, users, keystone):
     """ seed keystone users and their role-assignments """
-    logging.debug("seeding users %s %s" % (domain.name, users))
+    logging.debug("seeding users %s %s", domain.name, users)
 
     for user in users:
-        ra = None
-        if 'role_assignments' in user:
-            ra = user.pop('role_assignments')
-
-        if '@' not in user['name']:
-            user = sanitize(user, (
-                'name', 'email', 'description', 'password', 'enabled',
-                'default_project'))
-
-            if 'name' not in user or not user['name']:
-                logging.warn(
-                    "skipping user '%s/%s', since it is misconfigured" % (
-                        domain.name, redact(user)))
-                continue
+        with metering('user', '%s/%s' % (
+                domain.name, user.get('name')), 'seed_users'):
+            ra = None
+            if 'role_assignments' in user:
+                ra = user.pop('role_assignments')
+
+            if '@' not in user['name']:
+                user = sanitize(user, (
+                    'name', 'email', 'description', 'password', 'enabled',
+                    'default_project'))
+
+                if 'name' not in user or not user['name']:
+                    logging.warn(
+                        "skipping user '%s/%s', since it is misconfigured" % (
+                            domain.name, redacted(user)))
+                    continue
 
-            result = keystone.users.list(domain=domain.id,
-                                         name=user['name'])
-            if not result:
-                logging.info(
-                    "create user '%s/%s'" % (domain.name, user['name']))
-                resource = keystone.users.create(domain=domain, **user)
-            else:
-                resource = result[0]
-                for attr in list(user.keys()):
-                    if attr == 'password':
+                key = (domain.name, user['name'])
+                resource = find_keystone_entity(
+                    'users', key,
+                    lambda: keystone.users.list(domain=domain.id, name=user['name']))
+                if not resource:
+                    if plan_change('create', 'user', '%s/%s' % (
+                            domain.name, user['name']),
+                            dict(user, role_assignments=ra or [])):
                         continue
-                    if user[attr] != resource._info.get(attr, ''):
-                        logging.info(
-                            "%s differs. update user '%s/%s' (%s)" % (
-                                attr, domain.name, user['name'], attr))
-                        keystone.users.update(resource.id, **user)
-                        break
-
-            # cache the user id
-            if domain.name not in user_cache:
-                user_cache[domain.name] = dict()
-            user_cache[domain.name][resource.name] = resource.id
-
-        # add the users role assignments to the list to be resolved later on
-        if ra:
-            for role in ra:
-                assignment = dict()
-                assignment['role'] = role['role']
-                assignment['user'] = '%s@%s' % (user['name'], domain.name)
-                if 'system' in role:
-                    assignment['system'] = role['system']
+                    logging.info("create user '%s/%s'", domain.name, user['name'])
+                    resource = keystone.users.create(domain=domain, **user)
                 else:
-                    if 'project' in role:
-                        if '@' in role['project']:
-                            assignment['project'] = role['project']
-                        else:
-                            assignment['project'] = '%s@%s' % (role['project'], domain.name)
-                    elif 'project_id' in role:
-                        assignment['project_id'] = role['project_id']
-                    elif 'domain' in role:
-                        assignment['domain'] = role['domain']
-                    if 'inherited' in role:
-                        assignment['inherited'] = role['inherited']
+                    for attr in list(user.keys()):
+                        if attr == 'password':
+                            continue
+                        if user[attr] != resource._info.get(attr, ''):
+                            if plan_change('update', 'user', '%s/%s' % (
+                                    domain.name, user['name']),
+                                    dict((k, v) for k, v in user.items()
+                                         if k != 'password'), resource._info):
+                                break
+                            logging.info("%s differs. update user '%s/%s' (%s)",
+                                         attr, domain.name, user['name'], attr)
+                            resource = keystone.users.update(resource.id, **user)
+                            break
+
+                # cache the user
+                remember_keystone_entity('users', key, resource)
+
+            # add the users role assignments to the list to be resolved later on
+            if ra:
+                for role in ra:
+                    assignment = dict()
+                    assignment['role'] = role['role']
+                    assignment['user'] = '%s@%s' % (user['name'], domain.name)
+                    if 'system' in role:
+                        assignment['system'] = role['system']
+                    else:
+                        if 'project' in role:
+                            if '@' in role['project']:
+                                assignment['project'] = role['project']
+                            else:
+                                assignment['project'] = '%s@%s' % (role['project'], domain.name)
+                        elif 'project_id' in role:
+                            assignment['project_id'] = role['project_id']
+                        elif 'domain' in role:
+                            assignment['domain'] = role['domain']
+                        if 'inherited' in role:
+                            assignment['inherited'] = role['inherited']
 
-                role_assignments.append(assignment)
+                    add_role_assignment(assignment)
 
 
 def seed_groups(domain, groups, keystone):
     """ seed keystone groups """
-    logging.debug("seeding groups %s %s" % (domain.name, groups))
+    logging.debug("seeding groups %s %s", domain.name, groups)
 
     for group in groups:
-        users = None
-        if 'users' in group:
-            users = group.pop('users')
-        ra = None
-        if 'role_assignments' in group:
-            ra = group.pop('role_assignments')
-
-        group = sanitize(group, ('name', 'description'))
-
-        if 'name' not in group or not group['name']:
-            logging.warn(
-                "skipping group '%s/%s', since it is misconfigured" %
-                (domain.name, group))
-            continue
+        with metering('group', '%s/%s' % (
+                domain.name, group.get('name')), 'seed_groups'):
+            users = None
+            if 'users' in group:
+                users = group.pop('users')
+            ra = None
+            if 'role_assignments' in group:
+                ra = group.pop('role_assignments')
+
+            group = sanitize(group, ('name', 'description'))
+
+            if 'name' not in group or not group['name']:
+                logging.warn(
+                    "skipping group '%s/%s', since it is misconfigured" %
+                    (domain.name, group))
+                continue
 
-        result = keystone.groups.list(domain=domain.id,
-                                      name=group['name'])
-        if not result:
-            logging.info(
-                "create group '%s/%s'" % (domain.name, group['name']))
-            resource = keystone.groups.create(domain=domain, **group)
-        else:
-            resource = result[0]
-            for attr in list(group.keys()):
-                if group[attr] != resource._info.get(attr, ''):
-                    logging.info(
-                        "%s differs. update group '%s/%s'" % (
-                            attr, domain.name, group['name']))
-                    keystone.groups.update(resource.id, **group)
-                    break
+            key = (domain.name, group['name'])
+            resource = find_keystone_entity(
+                'groups', key,
+                lambda: keystone.groups.list(domain=domain.id, name=group['name']))
+            if not resource:
+                if plan_change('create', 'group', '%s/%s' % (
+                        domain.name, group['name']),
+                        dict(group, users=users or [],
+                             role_assignments=ra or [])):
+                    continue
+                logging.info("create group '%s/%s'", domain.name, group['name'])
+                resource = keystone.groups.create(domain=domain, **group)
+            else:
+                for attr in list(group.keys()):
+                    if group[attr] != resource._info.get(attr, ''):
+                        if plan_change('update', 'group', '%s/%s' % (
+                                domain.name, group['name']), group,
+                                resource._info):
+                            break
+                        logging.info("%s differs. update group '%s/%s'", attr,
+                                     domain.name, group['name'])
+                        resource = keystone.groups.update(resource.id, **group)
+                        break
 
-        # cache the group id
-        if domain.name not in group_cache:
-            group_cache[domain.name] = {}
-        group_cache[domain.name][resource.name] = resource.id
+            # cache the group
+            remember_keystone_entity('groups', key, resource)
 
-        if users:
-            for user in users:
-                if resource.id not in group_members:
-                    group_members[resource.id] = []
-                if '@' in user:
-                    group_members[resource.id].append(user)
-                else:
-                    group_members[resource.id].append(
-                        '%s@%s' % (user, domain.name))
-
-        # add the groups role assignments to the list to be resolved later on
-        if ra:
-            for role in ra:
-                assignment = dict()
-                assignment['role'] = role['role']
-                assignment['group'] = '%s@%s' % (group['name'], domain.name)
-                if 'system' in role:
-                    assignment['system'] = role['system']
-                else:
-                    if 'project' in role:
-                        if '@' in role['project']:
-                            assignment['project'] = role['project']
-                        else:
-                            assignment['project'] = '%s@%s' % (role['project'], domain.name)
-                    elif 'project_id' in role:
-                        assignment['project_id'] = role['project_id']
-                    elif 'domain' in role:
-                        assignment['domain'] = role['domain']
-                    if 'inherited' in role:
-                        assignment['inherited'] = role['inherited']
-                role_assignments.append(assignment)
+            if users:
+                for user in users:
+                    if '@' in user:
+                        add_group_member(resource.id, user)
+                    else:
+                        add_group_member(resource.id,
+                                         '%s@%s' % (user, domain.name))
+
+            # add the groups role assignments to the list to be resolved later on
+            if ra:
+                for role in ra:
+                    assignment = dict()
+                    assignment['role'] = role['role']
+                    assignment['group'] = '%s@%s' % (group['name'], domain.name)
+                    if 'system' in role:
+                        assignment['system'] = role['system']
+                    else:
+                        if 'project' in role:
+                            if '@' in role['project']:
+                                assignment['project'] = role['project']
+                            else:
+                                assignment['project'] = '%s@%s' % (role['project'], domain.name)
+                        elif 'project_id' in role:
+                            assignment['project_id'] = role['project_id']
+                        elif 'domain' in role:
+                            assignment['domain'] = role['domain']
+                        if 'inherited' in role:
+                            assignment['inherited'] = role['inherited']
+                    add_role_assignment(assignment)
 
 
 def seed_project_endpoints(project, endpoints, keystone):
     """ seed a keystone projects endpoints (OS-EP-FILTER)"""
-    logging.debug(
-        "seeding project endpoint %s %s" % (project.name, endpoints))
+    logging.debug("seeding project endpoint %s %s", project.name, endpoints)
 
     for name, endpoint in endpoints.items():
-        if 'endpoint_id' in endpoint:
-            try:
-                ep = keystone.endpoints.find(id=endpoint['endpoint_id'])
+        with metering('project-endpoint', '%s/%s' % (
+                project.name, name), 'seed_project_endpoints'):
+            if 'endpoint_id' in endpoint:
                 try:
-                    keystone.endpoint_filter.check_endpoint_in_project(
-                        project,
-                        ep)
-                except exceptions.NotFound:
-                    logging.info(
-                        "add project endpoint '%s %s'" % (
-                            project.name, ep))
-                    keystone.endpoint_filter.add_endpoint_to_project(
-                        project,
-                        ep)
-            except exceptions.NotFound as e:
-                logging.error(
-                    'could not configure project endpoints for %s: endpoint %s not found: %s' % (
-                        project.name, endpoint, e))
-        else:
-            try:
-                svc = keystone.services.find(name=endpoint['service'])
-                result = keystone.endpoints.list(service=svc.id,
-                                                 region_id=endpoint[
-                                                     'region'])
-                for ep in result:
+                    ep = keystone.endpoints.find(id=endpoint['endpoint_id'])
                     try:
                         keystone.endpoint_filter.check_endpoint_in_project(
-                            project, ep)
+                            project,
+                            ep)
                     except exceptions.NotFound:
-                        logging.info(
-                            "add project endpoint '%s %s'" % (
-                                project.name, ep))
+                        if plan_change('create', 'project-endpoint', '%s/%s' % (
+                                project.name, ep.id)):
+                            continue
+                        logging.info("add project endpoint '%s %s'", project.name,
+                                     ep)
                         keystone.endpoint_filter.add_endpoint_to_project(
                             project,
                             ep)
-                    except Exception as e:
-                        logging.error(
-                            'could not configure project endpoints for %s: endpoint %s not found: %s' % (
-                                project.name, ep, e))
-            except exceptions.NotFound as e:
-                logging.error(
-                    'could not configure project endpoints for %s: service %s not found: %s' % (
-                        project.name, endpoint, e))
-                raise
+                except exceptions.NotFound as e:
+                    logging.error(
+                        'could not configure project endpoints for %s: endpoint %s not found: %s' % (
+                            project.name, endpoint, e))
+            else:
+                try:
+                    svc = keystone.services.find(name=endpoint['service'])
+                    result = keystone.endpoints.list(service=svc.id,
+                                                     region_id=endpoint[
+                                                         'region'])
+                    for ep in result:
+                        try:
+                            keystone.endpoint_filter.check_endpoint_in_project(
+                                project, ep)
+                        except exceptions.NotFound:
+                            if plan_change('create', 'project-endpoint',
+                                           '%s/%s' % (project.name, ep.id)):
+                                continue
+                            logging.info("add project endpoint '%s %s'",
+                                         project.name, ep)
+                            keystone.endpoint_filter.add_endpoint_to_project(
+                                project,
+                                ep)
+                        except Exception as e:
+                            logging.error(
+                                'could not configure project endpoints for %s: endpoint %s not found: %s' % (
+                                    project.name, ep, e))
+                except exceptions.NotFound as e:
+                    logging.error(
+                        'could not configure project endpoints for %s: service %s not found: %s' % (
+                            project.name, endpoint, e))
+                    raise
 
 
 def seed_projects(domain, projects, args, sess):
@@ -609,176 +1862,242 @@ def seed_projects(domain, projects, args, sess):
     seed keystone projects and their dependant objects
     """
 
-    logging.debug("seeding projects %s %s" % (domain.name, projects))
+    logging.debug("seeding projects %s %s", domain.name, projects)
+
+    for project in projects:
+        seed_project(domain, project, args, sess)
+
+
+@metered('project', 1)
+def seed_project(domain, project, args, sess):
+    """
+    seed a keystone project and its dependant objects
+    """
+    if subtree_unchanged('project', '%s/%s' % (
+            domain.name, project.get('name')), project, args):
+        return
 
     # grab a keystone client
-    keystone = keystoneclient.Client(session=sess,
-                                     interface=args.interface)
+    keystone = get_client('keystone', args, sess)
 
-    for project in projects:
-        ra = None
-        if 'role_assignments' in project:
-            ra = project.pop('role_assignments', None)
-        endpoints = None
-        if 'project_endpoints' in project:
-            endpoints = project.pop('project_endpoints', None)
+    # the complete spec, for the plan of a dry-run
+    spec = dict(project)
+
+    ra = None
+    if 'role_assignments' in project:
+        ra = project.pop('role_assignments', None)
+    endpoints = None
+    if 'project_endpoints' in project:
+        endpoints = project.pop('project_endpoints', None)
 
-        network_quota = None
-        if 'network_quota' in project:
-            network_quota = project.pop('network_quota', None)
+    network_quota = None
+    if 'network_quota' in project:
+        network_quota = project.pop('network_quota', None)
 
-        address_scopes = None
-        if 'address_scopes' in project:
-            address_scopes = project.pop('address_scopes', None)
+    address_scopes = None
+    if 'address_scopes' in project:
+        address_scopes = project.pop('address_scopes', None)
 
-        subnet_pools = None
-        if 'subnet_pools' in project:
-            subnet_pools = project.pop('subnet_pools', None)
+    subnet_pools = None
+    if 'subnet_pools' in project:
+        subnet_pools = project.pop('subnet_pools', None)
 
-        networks = None
-        if 'networks' in project:
-            networks = project.pop('networks', None)
+    networks = None
+    if 'networks' in project:
+        networks = project.pop('networks', None)
 
-        routers = None
-        if 'routers' in project:
-            routers = project.pop('routers', None)
+    routers = None
+    if 'routers' in project:
+        routers = project.pop('routers', None)
 
-        swift = project.pop('swift', None)
+    swift = project.pop('swift', None)
 
-        dns_quota = project.pop('dns_quota', None)
+    dns_quota = project.pop('dns_quota', None)
 
-        dns_zones = project.pop('dns_zones', None)
+    dns_zones = project.pop('dns_zones', None)
 
-        dns_tsig_keys = project.pop('dns_tsigkeys', None)
+    dns_tsig_keys = project.pop('dns_tsigkeys', None)
 
-        ec2_creds = project.pop('ec2_creds', None)
+    ec2_creds = project.pop('ec2_creds', None)
 
-        flavors = project.pop('flavors', None)
+    flavors = project.pop('flavors', None)
 
-        share_types = project.pop('share_types', None)
+    share_types = project.pop('share_types', None)
 
-        project = sanitize(project,
-                           ('name', 'description', 'enabled', 'parent'))
+    project = sanitize(project,
+                       ('name', 'description', 'enabled', 'parent'))
 
-        if 'name' not in project or not project['name']:
+    if 'name' not in project or not project['name']:
+        logging.warn(
+            "skipping project '%s/%s', since it is misconfigured" % (
+                domain.name, project))
+        return
+
+    # resolve parent project if specified
+    if 'parent' in project:
+        parent_id = get_project_id(domain.name, project['parent'],
+                                   keystone)
+        if not parent_id:
             logging.warn(
-                "skipping project '%s/%s', since it is misconfigured" % (
+                "skipping project '%s/%s', since its parent project is missing" % (
                     domain.name, project))
-            continue
-
-        # resolve parent project if specified
-        if 'parent' in project:
-            parent_id = get_project_id(domain.name, project['parent'],
-                                       keystone)
-            if not parent_id:
-                logging.warn(
-                    "skipping project '%s/%s', since its parent project is missing" % (
-                        domain.name, project))
-                continue
-            else:
-                project['parent_id'] = parent_id
-
-        project.pop('parent', None)
-
-        result = keystone.projects.list(domain=domain.id,
-                                        name=project['name'])
-        if not result:
-            logging.info(
-                "create project '%s/%s'" % (
-                    domain.name, project['name']))
-            resource = keystone.projects.create(domain=domain,
-                                                **project)
+            return
         else:
-            resource = result[0]
-            for attr in list(project.keys()):
-                if project[attr] != resource._info.get(attr, ''):
-                    logging.info(
-                        "%s differs. update project '%s/%s'" % (
-                            attr, domain.name, project['name']))
-                    keystone.projects.update(resource.id, **project)
+            project['parent_id'] = parent_id
+
+    project.pop('parent', None)
+
+    key = (domain.name, project['name'])
+    resource = find_keystone_entity(
+        'projects', key,
+        lambda: keystone.projects.list(domain=domain.id, name=project['name']))
+    if not resource:
+        if plan_change('create', 'project', '%s/%s' % (
+                domain.name, project['name']), spec):
+            return
+        logging.info("create project '%s/%s'", domain.name, project['name'])
+        resource = keystone.projects.create(domain=domain,
+                                            **project)
+    else:
+        for attr in list(project.keys()):
+            if project[attr] != resource._info.get(attr, ''):
+                if plan_change('update', 'project', '%s/%s' % (
+                        domain.name, project['name']), project,
+                        resource._info):
                     break
+                logging.info("%s differs. update project '%s/%s'", attr,
+                             domain.name, project['name'])
+                resource = keystone.projects.update(resource.id,
+                                                    **project)
+                break
 
-        # cache the project id
-        if domain.name not in project_cache:
-            project_cache[domain.name] = {}
-        project_cache[domain.name][resource.name] = resource.id
-
-        # seed the projects endpoints
-        if endpoints:
-            seed_project_endpoints(resource, endpoints, keystone)
-
-        # add the projects role assignments to the list to be resolved later on
-        if ra:
-            for role in ra:
-                assignment = dict()
-                assignment['role'] = role['role']
-                assignment['project'] = '%s@%s' % (
-                    project['name'], domain.name)
-                if 'user' in role:
-                    if '@' in role['user']:
-                        assignment['user'] = role['user']
-                    else:
-                        assignment['user'] = '%s@%s' % (
-                            role['user'], domain.name)
-                elif 'group' in role:
-                    if '@' in role['group']:
-                        assignment['group'] = role['group']
-                    else:
-                        assignment['group'] = '%s@%s' % (
-                            role['group'], domain.name)
-                if 'inherited' in role:
-                    assignment['inherited'] = role['inherited']
-                role_assignments.append(assignment)
+    # cache the project
+    remember_keystone_entity('projects', key, resource)
+
+    # seed the projects endpoints
+    if endpoints:
+        seed_project_endpoints(resource, endpoints, keystone)
 
-        # seed the projects network quota
-        if network_quota:
-            seed_project_network_quota(resource, network_quota, args,
-                                       sess)
+    # add the projects role assignments to the list to be resolved later on
+    if ra:
+        for role in ra:
+            assignment = dict()
+            assignment['role'] = role['role']
+            assignment['project'] = '%s@%s' % (
+                project['name'], domain.name)
+            if 'user' in role:
+                if '@' in role['user']:
+                    assignment['user'] = role['user']
+                else:
+                    assignment['user'] = '%s@%s' % (
+                        role['user'], domain.name)
+            elif 'group' in role:
+                if '@' in role['group']:
+                    assignment['group'] = role['group']
+                else:
+                    assignment['group'] = '%s@%s' % (
+                        role['group'], domain.name)
+            if 'inherited' in role:
+                assignment['inherited'] = role['inherited']
+            add_role_assignment(assignment)
+
+    # the dependent objects are grouped into one branch per backend
+    # service. the branches are seeded concurrently, while the objects
+    # within a branch are seeded in order (e.g. subnet-pools before
+    # networks before routers)
+    network = []
+    object_store = []
+    dns = []
+    identity = []
+    compute = []
+    share = []
+
+    # seed the projects network quota
+    if network_quota:
+        network.append(partial(seed_project_network_quota, resource,
+                               network_quota, args, sess))
+
+    # seed the projects network address scopes
+    if address_scopes:
+        network.append(partial(seed_project_address_scopes, resource,
+                               address_scopes, args, sess))
+
+    # seed the projects network subnet-pools
+    if subnet_pools:
+        network.append(partial(seed_project_subnet_pools, resource,
+                               subnet_pools, args, sess))
+
+    # seed the projects networks
+    if networks:
+        network.append(partial(seed_project_networks, resource,
+                               networks, args, sess))
+
+    # seed the projects routers
+    if routers:
+        network.append(partial(seed_project_routers, resource, routers,
+                               args, sess))
+
+    # seed swift account
+    if swift:
+        object_store.append(partial(seed_swift, resource, swift, args,
+                                    sess))
 
-        # seed the projects network address scopes
-        if address_scopes:
-            seed_project_address_scopes(resource, address_scopes, args,
-                                        sess)
+    # seed designate quota
+    if dns_quota:
+        dns.append(partial(seed_project_designate_quota, resource,
+                           dns_quota, args, sess))
 
-        # seed the projects network subnet-pools
-        if subnet_pools:
-            seed_project_subnet_pools(resource, subnet_pools, args,
-                                      sess)
+    # seed designate zone
+    if dns_zones:
+        dns.append(partial(seed_project_dns_zones, resource, dns_zones,
+                           args, sess))
 
-        # seed the projects networks
-        if networks:
-            seed_project_networks(resource, networks, args, sess)
+    # seed designate tsig keys
+    if dns_tsig_keys:
+        dns.append(partial(seed_project_tsig_keys, resource,
+                           dns_tsig_keys, args, sess))
 
-        # seed the projects routers
-        if routers:
-            seed_project_routers(resource, routers, args, sess)
+    # seed ec2 credentials
+    if ec2_creds:
+        identity.append(partial(seed_project_ec2_creds, resource, domain,
+                                ec2_creds, args, sess))
 
-        # seed swift account
-        if swift:
-            seed_swift(resource, swift, args, sess)
+    # seed flavors
+    if flavors:
+        compute.append(partial(seed_project_flavors, resource, flavors,
+                               args, sess))
 
-        # seed designate quota
-        if dns_quota:
-            seed_project_designate_quota(resource, dns_quota, args)
+    if share_types:
+        share.append(partial(seed_project_share_types, resource,
+                             share_types, args, sess))
 
-        # seed designate zone
-        if dns_zones:
-            seed_project_dns_zones(resource, dns_zones, args)
+    seed_project_branches(resource, [
+        ('network', network), ('object-store', object_store),
+        ('dns', dns), ('identity', identity), ('compute', compute),
+        ('sharev2', share)], args)
 
-        # seed designate tsig keys
-        if dns_tsig_keys:
-            seed_project_tsig_keys(resource, dns_tsig_keys, args)
 
-        # seed ec2 credentials
-        if ec2_creds:
-            seed_project_ec2_creds(resource, domain, ec2_creds, args, sess)
+def seed_project_branches(project, branches, args):
+    """
+    seed the branches of a projects dependent objects concurrently
+    :param project:
+    :param branches: list of (service-type, [seed calls]) tuples
+    :param args:
+    :return:
+    """
 
-        # seed flavors
-        if flavors:
-            seed_project_flavors(resource, flavors, args, sess)
+    def seed_branch(branch):
+        service, calls = branch
+        # bound the number of branches hitting the same service at once
+        with get_service_semaphore(service, args):
+            for call in calls:
+                call()
 
-        if share_types:
-            seed_project_share_types(resource, share_types, args, sess)
+    branches = [branch for branch in branches if branch[1]]
+    logging.debug("seeding %d service branches of project %s", len(branches),
+                  project.name)
+    workers = len(branches) if get_concurrency(args) > 1 else 1
+    run_concurrently(seed_branch, branches, workers)
 
 
 def seed_project_flavors(project, flavors, args, sess):
@@ -786,28 +2105,31 @@ def seed_project_flavors(project, flavors, args, sess):
     seed a projects compute flavors
     """
 
-    logging.debug("seeding flavors of project %s" % project.name)
+    logging.debug("seeding flavors of project %s", project.name)
 
     # grab a nova client
-    nova = novaclient.Client("2.1", session=sess,
-                             endpoint_type=args.interface + 'URL')
+    nova = get_client('nova', args, sess)
     for flavorid in flavors:
-        try:
-            # validate flavor-id
-            nova.flavors.get(flavorid)
-            # check if project has access
-            access = set([a.tenant_id for a in
-                          nova.flavor_access.list(flavor=flavorid)])
-            if project.id not in access:
-                # add it
-                logging.info(
-                    "adding flavor '%s' access to project '%s" % (flavorid, project.name))
-                nova.flavor_access.add_tenant_access(flavorid, project.id)
-        except Exception as e:
-            logging.error(
-                "could not add flavor-id '%s' access for project '%s': %s" % (
-                    flavorid, project.name, e))
-            raise
+        with metering('flavor-access', '%s/%s' % (
+                flavorid, project.name), 'seed_project_flavors'):
+            try:
+                # validate flavor-id and check if project has access
+                access = get_flavor_access(flavorid, args, sess)
+                if project.id not in access:
+                    if plan_change('grant', 'flavor-access', '%s/%s' % (
+                            flavorid, project.name)):
+                        continue
+                    # add it
+                    logging.info("adding flavor '%s' access to project '%s",
+                                 flavorid, project.name)
+                    nova.flavor_access.add_tenant_access(flavorid, project.id)
+                    with flavor_lock:
+                        access.add(project.id)
+            except Exception as e:
+                logging.error(
+                    "could not add flavor-id '%s' access for project '%s': %s" % (
+                        flavorid, project.name, e))
+                raise
 
 
 def seed_project_share_types(project, share_types, args, sess):
@@ -816,15 +2138,15 @@ def seed_project_share_types(project, share_types, args, sess):
     """
     # intialize manila client
     try:
-        api_version = api_versions.APIVersion("2.40")
-        client = manilaclient.Client(session=sess, api_version=api_version)
+        client = get_client('manila', args, sess)
         shareTypeManager = client.share_types
         shareTypeAccessManager = client.share_type_access
     except Exception as e:
         logging.error("Fail to initialize manila client: %s" % e)
         raise
 
-    all_private_share_types = [t for t in shareTypeManager.list()
+    all_share_types, access = get_share_type_access(client, args)
+    all_private_share_types = [t for t in all_share_types
                                if t.is_public is False]
     validated_types = [t for t in all_private_share_types
                        if t.name in share_types]
@@ -836,36 +2158,51 @@ def seed_project_share_types(project, share_types, args, sess):
 
     logging.info('Assign %s to project %s', validated_types, project.id)
 
-    def list_type_projects(stype):
-        return [l.project_id for l in shareTypeAccessManager.list(stype)]
-
     current_types = [t for t in all_private_share_types
-                     if project.id in list_type_projects(t)]
+                     if project.id in access.get(t.id, ())]
 
-    logging.info(current_types)
+    logging.debug("current share types of project %s: %s", project.id,
+                  current_types)
 
     to_add = [t for t in validated_types if t not in current_types]
     to_remove = [t for t in current_types if t not in validated_types]
 
-    logging.info('add share types %s' % to_add)
-    logging.info('remove share types %s' % to_remove)
+    logging.info('add share types %s', to_add)
+    logging.info('remove share types %s', to_remove)
+
+    def change_access(change):
+        add, t = change
+        name = '%s/%s' % (t.name, project.name)
+        with metering('share-type-access', name, 'seed_project_share_types'):
+            if plan_change('grant' if add else 'revoke', 'share-type-access',
+                           name):
+                return
+            if add:
+                shareTypeAccessManager.add_project_access(t, project.id)
+                with share_type_lock:
+                    access.setdefault(t.id, set()).add(project.id)
+            else:
+                shareTypeAccessManager.remove_project_access(t, project.id)
+                with share_type_lock:
+                    access.setdefault(t.id, set()).discard(project.id)
 
-    for t in to_remove:
-        shareTypeAccessManager.remove_project_access(t, project.id)
-    for t in to_add:
-        shareTypeAccessManager.add_project_access(t, project.id)
+    record_unchanged('share-type-access',
+                     len([t for t in validated_types if t in current_types]))
+    changes = [(False, t) for t in to_remove] + [(True, t) for t in to_add]
+    run_concurrently(change_access, changes,
+                     get_service_limit('sharev2', args))
 
 
+@metered('network-quota')
 def seed_project_network_quota(project, quota, args, sess):
     """
     seed a projects network quota
     """
 
-    logging.debug("seeding network-quota of project %s" % project.name)
+    logging.debug("seeding network-quota of project %s", project.name)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     quota = sanitize(quota, (
         'floatingip', 'healthmonitor', 'l7policy', 'listener',
@@ -877,9 +2214,10 @@ def seed_project_network_quota(project, quota, args, sess):
     body = {'quota': quota.copy()}
     result = neutron.show_quota(project.id)
     if not result or not result['quota']:
-        logging.info(
-            "set project %s network quota to '%s'" % (
-                project.name, quota))
+        if plan_change('update', 'network-quota', project.name, quota):
+            return
+        logging.info("set project %s network quota to '%s'", project.name,
+                     quota)
         neutron.update_quota(project.id, body)
     else:
         resource = result['quota']
@@ -887,10 +2225,12 @@ def seed_project_network_quota(project, quota, args, sess):
         for attr in list(quota.keys()):
             if int(quota[attr]) > int(resource.get(attr, '')):
                 logging.info(
-                    "%s differs. set project %s network quota to '%s'" % (
-                        attr, project.name, quota))
+                    "%s differs. set project %s network quota to '%s'", attr,
+                    project.name, quota)
                 new_quota[attr] = quota[attr]
-        if len(new_quota):
+        if len(new_quota) and not plan_change(
+                'update', 'network-quota', project.name, new_quota,
+                resource):
             neutron.update_quota(project.id, {'quota': new_quota})
 
 
@@ -904,147 +2244,171 @@ def seed_project_address_scopes(project, address_scopes, args, sess):
     :return: 
     """
 
-    logging.debug("seeding address-scopes of project %s" % project.name)
+    logging.debug("seeding address-scopes of project %s", project.name)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     for scope in address_scopes:
-        try:
-            subnet_pools = None
-            if 'subnet_pools' in scope:
-                subnet_pools = scope.pop('subnet_pools', None)
+        with metering('address-scope', '%s/%s' % (
+                project.name, scope.get('name')),
+                'seed_project_address_scopes'):
+            try:
+                subnet_pools = None
+                if 'subnet_pools' in scope:
+                    subnet_pools = scope.pop('subnet_pools', None)
 
-            scope = sanitize(scope, ('name', 'ip_version', 'shared'))
+                scope = sanitize(scope, ('name', 'ip_version', 'shared'))
 
-            if 'name' not in scope or not scope['name']:
-                logging.warn(
-                    "skipping address-scope '%s/%s', since it is misconfigured" % (
-                        project.name, scope))
-                continue
+                if 'name' not in scope or not scope['name']:
+                    logging.warn(
+                        "skipping address-scope '%s/%s', since it is misconfigured" % (
+                            project.name, scope))
+                    continue
 
-            body = {'address_scope': scope.copy()}
-            body['address_scope']['tenant_id'] = project.id
-            query = {'tenant_id': project.id, 'name': scope['name']}
-            result = neutron.list_address_scopes(retrieve_all=True,
-                                                 **query)
-            if not result or not result['address_scopes']:
-                logging.info(
-                    "create address-scope '%s/%s'" % (
-                        project.name, scope['name']))
-                result = neutron.create_address_scope(body)
-                resource = result['address_scope']
-            else:
-                resource = result['address_scopes'][0]
-                for attr in list(scope.keys()):
-                    if scope[attr] != resource.get(attr, ''):
-                        logging.info(
-                            "%s differs. update address-cope'%s/%s'" % (
-                                attr, project.name, scope['name']))
-                        # drop read-only attributes
-                        body['address_scope'].pop('tenant_id', None)
-                        body['address_scope'].pop('ip_version', None)
-                        neutron.update_address_scope(resource['id'],
-                                                     body)
-                        break
+                body = {'address_scope': scope.copy()}
+                body['address_scope']['tenant_id'] = project.id
+                resource = find_neutron_resource('address_scopes', project.id,
+                                                 scope['name'], neutron)
+                if not resource:
+                    if plan_change('create', 'address-scope', '%s/%s' % (
+                            project.name, scope['name']),
+                            dict(scope, subnet_pools=subnet_pools or [])):
+                        continue
+                    logging.info("create address-scope '%s/%s'", project.name,
+                                 scope['name'])
+                    result = neutron.create_address_scope(body)
+                    resource = result['address_scope']
+                    remember_neutron_resource('address_scopes', resource)
+                else:
+                    for attr in list(scope.keys()):
+                        if scope[attr] != resource.get(attr, ''):
+                            if plan_change('update', 'address-scope',
+                                           '%s/%s' % (project.name,
+                                                      scope['name']),
+                                           scope, resource):
+                                break
+                            logging.info("%s differs. update address-cope'%s/%s'",
+                                         attr, project.name, scope['name'])
+                            # drop read-only attributes
+                            body['address_scope'].pop('tenant_id', None)
+                            body['address_scope'].pop('ip_version', None)
+                            result = neutron.update_address_scope(
+                                resource['id'], body)
+                            resource = result['address_scope']
+                            remember_neutron_resource('address_scopes',
+                                                      resource)
+                            break
 
-            if subnet_pools:
-                kvargs = {'address_scope_id': resource['id']}
-                seed_project_subnet_pools(project, subnet_pools, args,
-                                          sess,
-                                          **kvargs)
-        except Exception as e:
-            logging.error("could not seed address scope %s/%s: %s" % (
-                project.name, scope['name'], e))
-            raise
+                if subnet_pools:
+                    kvargs = {'address_scope_id': resource['id']}
+                    seed_project_subnet_pools(project, subnet_pools, args,
+                                              sess,
+                                              **kvargs)
+            except Exception as e:
+                logging.error("could not seed address scope %s/%s: %s" % (
+                    project.name, scope['name'], e))
+                raise
 
 
 def seed_project_subnet_pools(project, subnet_pools, args, sess,
                               **kvargs):
-    logging.debug(
-        "seeding subnet-pools of project %s" % project.name)
+    logging.debug("seeding subnet-pools of project %s", project.name)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     for subnet_pool in subnet_pools:
-        try:
-            subnet_pool = sanitize(subnet_pool, (
-                'name', 'default_quota', 'prefixes', 'min_prefixlen',
-                'shared',
-                'default_prefixlen', 'max_prefixlen', 'description',
-                'address_scope_id', 'is_default'))
+        with metering('subnet-pool', '%s/%s' % (
+                project.name, subnet_pool.get('name')),
+                'seed_project_subnet_pools'):
+            try:
+                subnet_pool = sanitize(subnet_pool, (
+                    'name', 'default_quota', 'prefixes', 'min_prefixlen',
+                    'shared',
+                    'default_prefixlen', 'max_prefixlen', 'description',
+                    'address_scope_id', 'is_default'))
 
-            if 'name' not in subnet_pool or not subnet_pool['name']:
-                logging.warn(
-                    "skipping subnet-pool '%s/%s', since it is misconfigured" % (
-                        project.name, subnet_pool))
-                continue
+                if 'name' not in subnet_pool or not subnet_pool['name']:
+                    logging.warn(
+                        "skipping subnet-pool '%s/%s', since it is misconfigured" % (
+                            project.name, subnet_pool))
+                    continue
 
-            if kvargs:
-                subnet_pool = dict(list(subnet_pool.items()) + list(kvargs.items()))
+                if kvargs:
+                    subnet_pool = dict(list(subnet_pool.items()) + list(kvargs.items()))
 
-            body = {'subnetpool': subnet_pool.copy()}
-            body['subnetpool']['tenant_id'] = project.id
+                body = {'subnetpool': subnet_pool.copy()}
+                body['subnetpool']['tenant_id'] = project.id
 
-            query = {'tenant_id': project.id,
-                     'name': subnet_pool['name']}
-            result = neutron.list_subnetpools(retrieve_all=True,
-                                              **query)
-            if not result or not result['subnetpools']:
-                logging.info(
-                    "create subnet-pool '%s/%s'" % (
-                        project.name, subnet_pool['name']))
-                result = neutron.create_subnetpool(body)
-                # cache the subnetpool-id
-                if project.id not in subnetpool_cache:
-                    subnetpool_cache[project.id] = {}
-                subnetpool_cache[project.id][subnet_pool['name']] = \
-                    result['subnetpool']['id']
-            else:
-                resource = result['subnetpools'][0]
-                # cache the subnetpool-id
-                if project.id not in subnetpool_cache:
-                    subnetpool_cache[project.id] = {}
-                subnetpool_cache[project.id][subnet_pool['name']] = \
-                    resource['id']
-
-                for attr in list(subnet_pool.keys()):
-                    if attr == 'prefixes':
-                        for prefix in subnet_pool['prefixes']:
-                            if prefix not in resource.get('prefixes',
-                                                          []):
+                resource = find_neutron_resource('subnetpools', project.id,
+                                                 subnet_pool['name'], neutron)
+                if not resource:
+                    if plan_change('create', 'subnet-pool', '%s/%s' % (
+                            project.name, subnet_pool['name']), subnet_pool):
+                        continue
+                    logging.info("create subnet-pool '%s/%s'", project.name,
+                                 subnet_pool['name'])
+                    result = neutron.create_subnetpool(body)
+                    remember_neutron_resource('subnetpools',
+                                              result['subnetpool'])
+                    # cache the subnetpool-id
+                    with cache_lock:
+                        subnetpool_cache.setdefault(project.id, {})[
+                            subnet_pool['name']] = result['subnetpool']['id']
+                else:
+                    # cache the subnetpool-id
+                    with cache_lock:
+                        subnetpool_cache.setdefault(project.id, {})[
+                            subnet_pool['name']] = resource['id']
+
+                    for attr in list(subnet_pool.keys()):
+                        if attr == 'prefixes':
+                            for prefix in subnet_pool['prefixes']:
+                                if prefix not in resource.get('prefixes',
+                                                              []):
+                                    if plan_change('update', 'subnet-pool',
+                                                   '%s/%s' % (
+                                                       project.name,
+                                                       subnet_pool['name']),
+                                                   subnet_pool, resource):
+                                        break
+                                    logging.info(
+                                        "update subnet-pool prefixes '%s/%s'",
+                                        project.name, subnet_pool['name'])
+                                    # drop read-only attributes
+                                    body['subnetpool'].pop('tenant_id',
+                                                           None)
+                                    body['subnetpool'].pop('shared', None)
+                                    result = neutron.update_subnetpool(
+                                        resource['id'], body)
+                                    remember_neutron_resource(
+                                        'subnetpools', result['subnetpool'])
+                                    break
+                        else:
+                            # a hacky comparison due to the neutron api not dealing with string/int attributes consistently
+                            if str(subnet_pool[attr]) != str(
+                                    resource.get(attr, '')):
+                                if plan_change('update', 'subnet-pool',
+                                               '%s/%s' % (project.name,
+                                                          subnet_pool['name']),
+                                               subnet_pool, resource):
+                                    break
                                 logging.info(
-                                    "update subnet-pool prefixes '%s/%s'" % (
-                                        project.name,
-                                        subnet_pool['name']))
+                                    "%s differs. update subnet-pool'%s/%s'", attr,
+                                    project.name, subnet_pool['name'])
                                 # drop read-only attributes
-                                body['subnetpool'].pop('tenant_id',
-                                                       None)
+                                body['subnetpool'].pop('tenant_id', None)
                                 body['subnetpool'].pop('shared', None)
-                                neutron.update_subnetpool(
+                                result = neutron.update_subnetpool(
                                     resource['id'], body)
+                                remember_neutron_resource('subnetpools',
+                                                          result['subnetpool'])
                                 break
-                    else:
-                        # a hacky comparison due to the neutron api not dealing with string/int attributes consistently
-                        if str(subnet_pool[attr]) != str(
-                                resource.get(attr, '')):
-                            logging.info(
-                                "%s differs. update subnet-pool'%s/%s'" % (
-                                    attr, project.name,
-                                    subnet_pool['name']))
-                            # drop read-only attributes
-                            body['subnetpool'].pop('tenant_id', None)
-                            body['subnetpool'].pop('shared', None)
-                            neutron.update_subnetpool(resource['id'],
-                                                      body)
-                            break
-        except Exception as e:
-            logging.error("could not seed subnet pool %s/%s: %s" % (
-                project.name, subnet_pool['name'], e))
-            raise
+            except Exception as e:
+                logging.error("could not seed subnet pool %s/%s: %s" % (
+                    project.name, subnet_pool['name'], e))
+                raise
 
 
 def seed_project_networks(project, networks, args, sess):
@@ -1063,67 +2427,82 @@ def seed_project_networks(project, networks, args, sess):
               'provider_physical_network': 'provider:physical_network',
               'provider_segmentation_id': 'provider:segmentation_id'}
 
-    logging.debug("seeding networks of project %s" % project.name)
+    logging.debug("seeding networks of project %s", project.name)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     for network in networks:
-        try:
-            subnets = network.pop('subnets', None)
+        with metering('network', '%s/%s' % (
+                project.name, network.get('name')), 'seed_project_networks'):
+            if subtree_unchanged('network', '%s/%s' % (
+                    project.id, network.get('name')), network, args):
+                continue
 
-            tags = network.pop('tags', None)
+            try:
+                subnets = network.pop('subnets', None)
 
-            # rename some yaml unfriendly network attributes
-            for key, value in list(rename.items()):
-                if key in network:
-                    network[value] = network.pop(key)
+                tags = network.pop('tags', None)
 
-            network = sanitize(network, (
-                'name', 'admin_state_up', 'port_security_enabled',
-                'provider:network_type', 'provider:physical_network',
-                'provider:segmentation_id', 'qos_policy_id',
-                'router:external',
-                'shared', 'vlan_transparent', 'description'))
+                # rename some yaml unfriendly network attributes
+                for key, value in list(rename.items()):
+                    if key in network:
+                        network[value] = network.pop(key)
 
-            if 'name' not in network or not network['name']:
-                logging.warn(
-                    "skipping network '%s/%s', since it is misconfigured" % (
-                        project.name, network))
-                continue
+                network = sanitize(network, (
+                    'name', 'admin_state_up', 'port_security_enabled',
+                    'provider:network_type', 'provider:physical_network',
+                    'provider:segmentation_id', 'qos_policy_id',
+                    'router:external',
+                    'shared', 'vlan_transparent', 'description'))
 
-            body = {'network': network.copy()}
-            body['network']['tenant_id'] = project.id
-            query = {'tenant_id': project.id, 'name': network['name']}
-            result = neutron.list_networks(retrieve_all=True, **query)
-            if not result or not result['networks']:
-                logging.info(
-                    "create network '%s/%s'" % (
-                        project.name, network['name']))
-                result = neutron.create_network(body)
-                resource = result['network']
-            else:
-                resource = result['networks'][0]
-                for attr in list(network.keys()):
-                    if network[attr] != resource.get(attr, ''):
-                        logging.info(
-                            "%s differs. update network'%s/%s'" % (
-                                attr, project.name, network['name']))
-                        # drop read-only attributes
-                        body['network'].pop('tenant_id', None)
-                        neutron.update_network(resource['id'], body)
-                        break
+                if 'name' not in network or not network['name']:
+                    logging.warn(
+                        "skipping network '%s/%s', since it is misconfigured" % (
+                            project.name, network))
+                    continue
 
-            if tags:
-                seed_network_tags(resource, tags, args, sess)
+                body = {'network': network.copy()}
+                body['network']['tenant_id'] = project.id
+                resource = find_neutron_resource('networks', project.id,
+                                                 network['name'], neutron)
+                if not resource:
+                    if plan_change('create', 'network', '%s/%s' % (
+                            project.name, network['name']),
+                            dict(network, tags=tags or [],
+                                 subnets=subnets or [])):
+                        continue
+                    logging.info("create network '%s/%s'", project.name,
+                                 network['name'])
+                    result = neutron.create_network(body)
+                    resource = result['network']
+                    remember_neutron_resource('networks', resource)
+                else:
+                    for attr in list(network.keys()):
+                        if network[attr] != resource.get(attr, ''):
+                            if plan_change('update', 'network', '%s/%s' % (
+                                    project.name, network['name']), network,
+                                    resource):
+                                break
+                            logging.info("%s differs. update network'%s/%s'", attr,
+                                         project.name, network['name'])
+                            # drop read-only attributes
+                            body['network'].pop('tenant_id', None)
+                            result = neutron.update_network(resource['id'],
+                                                            body)
+                            resource = result['network']
+                            remember_neutron_resource('networks', resource)
+                            break
 
-            if subnets:
-                seed_network_subnets(resource, subnets, args, sess)
-        except Exception as e:
-            logging.error("could not seed network %s/%s: %s" % (
-                project.name, network['name'], e))
-            raise
+                if tags:
+                    seed_network_tags(resource, tags, args, sess)
+
+                if subnets:
+                    seed_network_subnets(resource, subnets, args, sess)
+            except Exception as e:
+                logging.error("could not seed network %s/%s: %s" % (
+                    project.name, network['name'], e))
+                raise
 
 
 def seed_project_routers(project, routers, args, sess):
@@ -1150,153 +2529,160 @@ def seed_project_routers(project, routers, args, sess):
 
     regex = r"^([^@]+)@([^@]+)@([^@]+)$"
 
-    logging.debug("seeding routers of project %s" % project.name)
+    logging.debug("seeding routers of project %s", project.name)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     # grab a keystone client
-    keystone = keystoneclient.Client(session=sess,
-                                     interface=args.interface)
+    keystone = get_client('keystone', args, sess)
 
     for router in routers:
-        try:
-            interfaces = None
-            if 'interfaces' in router:
-                interfaces = router.pop('interfaces', None)
+        with metering('router', '%s/%s' % (
+                project.name, router.get('name')), 'seed_project_routers'):
+            try:
+                interfaces = None
+                if 'interfaces' in router:
+                    interfaces = router.pop('interfaces', None)
 
-            router = sanitize(router, (
-                'name', 'admin_state_up', 'description',
-                'external_gateway_info', 'distributed', 'ha',
-                'availability_zone_hints', 'flavor_id',
-                'service_type_id', 'routes'))
+                router = sanitize(router, (
+                    'name', 'admin_state_up', 'description',
+                    'external_gateway_info', 'distributed', 'ha',
+                    'availability_zone_hints', 'flavor_id',
+                    'service_type_id', 'routes'))
 
-            if 'name' not in router or not router['name']:
-                logging.warn(
-                    "skipping router '%s %s', since it is misconfigured" % (
-                        project.name, router))
-                continue
+                if 'name' not in router or not router['name']:
+                    logging.warn(
+                        "skipping router '%s %s', since it is misconfigured" % (
+                            project.name, router))
+                    continue
 
-            if 'external_gateway_info' in router:
-                # lookup network-id
-                if 'network' in router['external_gateway_info']:
-                    network_id = None
-
-                    # network@project@domain ?
-                    match = re.match(regex,
-                                     router['external_gateway_info'][
-                                         'network'])
-                    if match:
-                        project_id = get_project_id(match.group(3),
-                                                    match.group(2),
-                                                    keystone)
-                        if project_id:
-                            network_id = get_network_id(project_id,
-                                                        match.group(1),
+                if 'external_gateway_info' in router:
+                    # lookup network-id
+                    if 'network' in router['external_gateway_info']:
+                        network_id = None
+
+                        # network@project@domain ?
+                        match = re.match(regex,
+                                         router['external_gateway_info'][
+                                             'network'])
+                        if match:
+                            project_id = get_project_id(match.group(3),
+                                                        match.group(2),
+                                                        keystone)
+                            if project_id:
+                                network_id = get_network_id(project_id,
+                                                            match.group(1),
+                                                            neutron)
+                        else:
+                            # network of this project
+                            network_id = get_network_id(project.id, router[
+                                'external_gateway_info']['network'],
                                                         neutron)
-                    else:
-                        # network of this project
-                        network_id = get_network_id(project.id, router[
-                            'external_gateway_info']['network'],
-                                                    neutron)
-                    if not network_id:
-                        logging.warn(
-                            "skipping router '%s/%s': external_gateway_info.network %s not found" % (
-                                project.name, router['name'],
-                                router['external_gateway_info'][
-                                    'network']))
-                        continue
-                    router['external_gateway_info'][
-                        'network_id'] = network_id
-                    router['external_gateway_info'].pop('network', None)
+                        if not network_id:
+                            logging.warn(
+                                "skipping router '%s/%s': external_gateway_info.network %s not found" % (
+                                    project.name, router['name'],
+                                    router['external_gateway_info'][
+                                        'network']))
+                            continue
+                        router['external_gateway_info'][
+                            'network_id'] = network_id
+                        router['external_gateway_info'].pop('network', None)
 
-                if 'external_fixed_ips' in router[
-                    'external_gateway_info']:
-                    for index, efi in enumerate(
+                    if 'external_fixed_ips' in router[
+                        'external_gateway_info']:
+                        for index, efi in enumerate(
+                                router['external_gateway_info'][
+                                    'external_fixed_ips']):
+                            if 'subnet' in efi:
+                                subnet_id = None
+
+                                # subnet@project@domain ?
+                                match = re.match(regex, efi['subnet'])
+                                if match:
+                                    project_id = get_project_id(
+                                        match.group(3), match.group(2),
+                                        keystone)
+                                    if project_id:
+                                        subnet_id = get_subnet_id(
+                                            project_id, match.group(1),
+                                            neutron)
+                                else:
+                                    # subnet of this project
+                                    subnet_id = get_subnet_id(project.id,
+                                                              efi['subnet'],
+                                                              neutron)
+                                if not subnet_id:
+                                    logging.warn(
+                                        "skipping router '%s/%s': external_gateway_info.external_fixed_ips.subnet %s not found" % (
+                                            project.name, router['name'],
+                                            efi['subnet']))
+                                    continue
+                                efi['subnet_id'] = subnet_id
+                                efi.pop('subnet', None)
                             router['external_gateway_info'][
-                                'external_fixed_ips']):
-                        if 'subnet' in efi:
-                            subnet_id = None
-
-                            # subnet@project@domain ?
-                            match = re.match(regex, efi['subnet'])
-                            if match:
-                                project_id = get_project_id(
-                                    match.group(3), match.group(2),
-                                    keystone)
-                                if project_id:
-                                    subnet_id = get_subnet_id(
-                                        project_id, match.group(1),
-                                        neutron)
-                            else:
-                                # subnet of this project
-                                subnet_id = get_subnet_id(project.id,
-                                                          efi['subnet'],
-                                                          neutron)
-                            if not subnet_id:
-                                logging.warn(
-                                    "skipping router '%s/%s': external_gateway_info.external_fixed_ips.subnet %s not found" % (
-                                        project.name, router['name'],
-                                        efi['subnet']))
-                                continue
-                            efi['subnet_id'] = subnet_id
-                            efi.pop('subnet', None)
-                        router['external_gateway_info'][
-                            'external_fixed_ips'][index] = sanitize(efi,
-                                                                    ('subnet_id',
-                                                                     'ip_address'))
-
-                router['external_gateway_info'] = sanitize(
-                    router['external_gateway_info'],
-                    ('network_id', 'enable_snat', 'external_fixed_ips'))
-
-            body = {'router': router.copy()}
-            body['router']['tenant_id'] = project.id
-            query = {'tenant_id': project.id, 'name': router['name']}
-            result = neutron.list_routers(retrieve_all=True, **query)
-            if not result or not result['routers']:
-                logging.info(
-                    "create router '%s/%s': %s" % (
-                        project.name, router['name'], body))
-                result = neutron.create_router(body)
-                resource = result['router']
-            else:
-                resource = result['routers'][0]
-                update = False
-
-                for attr in list(router.keys()):
-                    if attr == 'external_gateway_info':
-                        if 'network_id' in router[attr] and resource.get(attr, ''):
-                            if router[attr]['network_id'] != \
-                                    resource[attr]['network_id']:
+                                'external_fixed_ips'][index] = sanitize(efi,
+                                                                        ('subnet_id',
+                                                                         'ip_address'))
+
+                    router['external_gateway_info'] = sanitize(
+                        router['external_gateway_info'],
+                        ('network_id', 'enable_snat', 'external_fixed_ips'))
+
+                body = {'router': router.copy()}
+                body['router']['tenant_id'] = project.id
+                resource = find_neutron_resource('routers', project.id,
+                                                 router['name'], neutron)
+                if not resource:
+                    if plan_change('create', 'router', '%s/%s' % (
+                            project.name, router['name']),
+                            dict(router, interfaces=interfaces or [])):
+                        continue
+                    logging.info("create router '%s/%s': %s", project.name,
+                                 router['name'], body)
+                    result = neutron.create_router(body)
+                    resource = result['router']
+                    remember_neutron_resource('routers', resource)
+                else:
+                    update = False
+
+                    for attr in list(router.keys()):
+                        if attr == 'external_gateway_info':
+                            if 'network_id' in router[attr] and resource.get(attr, ''):
+                                if router[attr]['network_id'] != \
+                                        resource[attr]['network_id']:
+                                    update = True
+
+                            if ('external_fixed_ips' in router[
+                                'external_gateway_info'] and
+                                    external_fixed_ip_subnets_differ(
+                                        router['external_gateway_info'][
+                                            'external_fixed_ips'],
+                                        resource['external_gateway_info'][
+                                            'external_fixed_ips'])):
                                 update = True
-
-                        if ('external_fixed_ips' in router[
-                            'external_gateway_info'] and
-                                external_fixed_ip_subnets_differ(
-                                    router['external_gateway_info'][
-                                        'external_fixed_ips'],
-                                    resource['external_gateway_info'][
-                                        'external_fixed_ips'])):
+                        elif router[attr] != resource.get(attr, ''):
                             update = True
-                    elif router[attr] != resource.get(attr, ''):
-                        update = True
-
-                if update:
-                    logging.info("update router '%s/%s': %s" % (
-                        project.name, router['name'], body))
-                    # drop read-only attributes
-                    body['router'].pop('tenant_id', None)
-                    result = neutron.update_router(resource['id'], body)
-                    resource = result['router']
 
-            if interfaces:
-                seed_router_interfaces(resource, interfaces, args, sess)
-        except Exception as e:
-            logging.error("could not seed router %s/%s: %s" % (
-                project.name, router['name'], e))
-            raise
+                    if update and not plan_change(
+                            'update', 'router', '%s/%s' % (
+                                project.name, router['name']), router,
+                            resource):
+                        logging.info("update router '%s/%s': %s", project.name,
+                                     router['name'], body)
+                        # drop read-only attributes
+                        body['router'].pop('tenant_id', None)
+                        result = neutron.update_router(resource['id'], body)
+                        resource = result['router']
+                        remember_neutron_resource('routers', resource)
+
+                if interfaces:
+                    seed_router_interfaces(resource, interfaces, args, sess)
+            except Exception as e:
+                logging.error("could not seed router %s/%s: %s" % (
+                    project.name, router['name'], e))
+                raise
 
 
 def seed_router_interfaces(router, interfaces, args, sess):
@@ -1309,16 +2695,15 @@ def seed_router_interfaces(router, interfaces, args, sess):
     :return:
     """
 
-    logging.debug("seeding interfaces of router %s" % router['name'])
+    logging.debug("seeding interfaces of router %s", router['name'])
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     # grab a keystone client
-    keystone = keystoneclient.Client(session=sess,
-                                     interface=args.interface)
+    keystone = get_client('keystone', args, sess)
 
+    wanted = []
     for interface in interfaces:
         if 'subnet' in interface:
             subnet_id = None
@@ -1347,30 +2732,45 @@ def seed_router_interfaces(router, interfaces, args, sess):
                     router['name'], interface))
             continue
 
-        # check if the interface is already configured for the router
-        query = {'device_id': router['id']}
-        result = neutron.list_ports(retrieve_all=True, **query)
-        found = False
-        for port in result['ports']:
-            if 'port_id' in interface and port['id'] == interface['port_id']:
-                found = True
-                break
-            elif 'subnet_id' in interface:
-                for ip in port['fixed_ips']:
-                    if 'subnet_id' in ip and ip['subnet_id'] == \
-                            interface['subnet_id']:
-                        found = True
-                        break
-            if found:
-                break
+        wanted.append(interface)
+
+    if not wanted:
+        return
 
-        if found:
+    # check which interfaces are already configured for the router, with a
+    # single listing of the routers ports
+    query = {'device_id': router['id']}
+    result = neutron.list_ports(retrieve_all=True, **query)
+    port_ids = set()
+    subnet_ids = set()
+    for port in result['ports']:
+        port_ids.add(port['id'])
+        for ip in port['fixed_ips']:
+            if 'subnet_id' in ip:
+                subnet_ids.add(ip['subnet_id'])
+
+    missing = []
+    for interface in wanted:
+        if interface.get('port_id') in port_ids or \
+                interface.get('subnet_id') in subnet_ids:
             continue
+        if interface not in missing:
+            missing.append(interface)
+
+    def add_interface(interface):
+        with metering('router-interface', router['name'],
+                      'seed_router_interfaces'):
+            if plan_change('create', 'router-interface', router['name'],
+                           interface):
+                return
+            # add router interface
+            neutron.add_interface_router(router['id'], interface)
+            logging.info("added interface %s to router'%s'", interface,
+                         router['name'])
 
-        # add router interface
-        neutron.add_interface_router(router['id'], interface)
-        logging.info("added interface %s to router'%s'" % (
-            interface, router['name']))
+    record_unchanged('router-interface', len(wanted) - len(missing))
+    run_concurrently(add_interface, missing,
+                     get_service_limit('network', args))
 
 
 def seed_network_tags(network, tags, args, sess):
@@ -1383,24 +2783,26 @@ def seed_network_tags(network, tags, args, sess):
     :return:
     """
 
-    logging.debug("seeding tags of network %s" % network['name'])
+    logging.debug("seeding tags of network %s", network['name'])
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     for tag in tags:
-        if not tag or len(tag) > 60:
-            logging.warn(
-                "skipping tag '%s/%s', since it is invalid" % (
-                    network['name'], tag))
-            continue
+        with metering('network-tag', '%s/%s' % (
+                network['name'], tag), 'seed_network_tags'):
+            if not tag or len(tag) > 60:
+                logging.warn(
+                    "skipping tag '%s/%s', since it is invalid" % (
+                        network['name'], tag))
+                continue
 
-        if tag not in network['tags']:
-            logging.info(
-                "adding tag %s to network '%s'" % (
-                    tag, network['name']))
-            neutron.add_tag('networks', network['id'], tag)
+            if tag not in network['tags']:
+                if plan_change('create', 'network-tag', '%s/%s' % (
+                        network['name'], tag)):
+                    continue
+                logging.info("adding tag %s to network '%s'", tag, network['name'])
+                neutron.add_tag('networks', network['id'], tag)
 
 
 def seed_network_subnets(network, subnets, args, sess):
@@ -1413,71 +2815,169 @@ def seed_network_subnets(network, subnets, args, sess):
     :return:
     """
 
-    logging.debug("seeding subnets of network %s" % network['name'])
+    logging.debug("seeding subnets of network %s", network['name'])
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess,
-                                   interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     for subnet in subnets:
-        # lookup subnetpool-id
-        if 'subnetpool' in subnet:
-            subnet['subnetpool_id'] = get_subnetpool_id(
-                network['tenant_id'],
-                subnet['subnetpool'],
-                neutron)
-            if not subnet['subnetpool_id']:
+        with metering('subnet', '%s/%s' % (
+                network['name'], subnet.get('name')), 'seed_network_subnets'):
+            # lookup subnetpool-id
+            if 'subnetpool' in subnet:
+                subnet['subnetpool_id'] = get_subnetpool_id(
+                    network['tenant_id'],
+                    subnet['subnetpool'],
+                    neutron)
+                if not subnet['subnetpool_id']:
+                    logging.warn(
+                        "skipping subnet '%s/%s', since its subnetpool is invalid" % (
+                            network['name'], subnet))
+                    continue
+                subnet.pop('subnetpool', None)
+
+            subnet = sanitize(subnet, (
+                'name', 'enable_dhcp', 'dns_nameservers',
+                'allocation_pools', 'host_routes', 'ip_version',
+                'gateway_ip', 'cidr', 'prefixlen', 'subnetpool_id',
+                'description'))
+
+            if 'name' not in subnet or not subnet['name']:
                 logging.warn(
-                    "skipping subnet '%s/%s', since its subnetpool is invalid" % (
+                    "skipping subnet '%s/%s', since it is misconfigured" % (
                         network['name'], subnet))
                 continue
-            subnet.pop('subnetpool', None)
 
-        subnet = sanitize(subnet, (
-            'name', 'enable_dhcp', 'dns_nameservers',
-            'allocation_pools', 'host_routes', 'ip_version',
-            'gateway_ip', 'cidr', 'prefixlen', 'subnetpool_id',
-            'description'))
+            if 'gateway_ip' in subnet and subnet['gateway_ip'] == 'null':
+                subnet['gateway_ip'] = None
 
-        if 'name' not in subnet or not subnet['name']:
-            logging.warn(
-                "skipping subnet '%s/%s', since it is misconfigured" % (
-                    network['name'], subnet))
-            continue
+            body = {'subnet': subnet.copy()}
+            body['subnet']['network_id'] = network['id']
+            body['subnet']['tenant_id'] = network['tenant_id']
+
+            resource = find_neutron_resource('subnets', network['tenant_id'],
+                                             subnet['name'], neutron,
+                                             network_id=network['id'])
+            if not resource:
+                if plan_change('create', 'subnet', '%s/%s' % (
+                        network['name'], subnet['name']), subnet):
+                    continue
+                logging.info("create subnet '%s/%s'", network['name'],
+                             subnet['name'])
+                result = neutron.create_subnet(body)
+                remember_neutron_resource('subnets', result['subnet'])
+            else:
+                for attr in list(subnet.keys()):
+                    if subnet[attr] != resource.get(attr, ''):
+                        if plan_change('update', 'subnet', '%s/%s' % (
+                                network['name'], subnet['name']), subnet,
+                                resource):
+                            break
+                        logging.info("%s differs. update subnet'%s/%s'", attr,
+                                     network['name'], subnet['name'])
+                        # drop read-only attributes
+                        body['subnet'].pop('cidr', None)
+                        body['subnet'].pop('segment_id', None)
+                        body['subnet'].pop('tenant_id', None)
+                        body['subnet'].pop('network_id', None)
+                        body['subnet'].pop('subnetpool_id', None)
+                        body['subnet'].pop('ip_version', None)
+                        body['subnet'].pop('prefixlen', None)
+                        result = neutron.update_subnet(resource['id'], body)
+                        remember_neutron_resource('subnets', result['subnet'])
+                        break
+
+
+def get_swift_prefix(args, sess):
+    """
+    get the storage-url prefix ('.../AUTH_') of the object-store, which is
+    resolved once per seed run
+    :return: prefix
+    """
+    with cache_lock:
+        if not swift_auth:
+            # poor mans storage-url generation
+            try:
+                swift_endpoint = sess.get_endpoint(
+                    service_type='object-store',
+                    interface=args.interface)
+            except exceptions.EndpointNotFound:
+                swift_endpoint = sess.get_endpoint(
+                    service_type='object-store',
+                    interface='admin')
+            swift_auth['prefix'] = swift_endpoint.split('/AUTH_')[0] + '/AUTH_'
+        return swift_auth['prefix']
+
+
+def checkout_swift_connection(url):
+    """
+    take an idle http connection to the object-store of a storage-url from
+    its pool, or open a new one, to be passed as http_conn to the
+    swiftclient functions
+    :return: (parsed url, connection), swiftclient takes the path of the
+             request from the parsed url, not from the storage-url
+    """
+    parsed = urlparse(url)
+    with cache_lock:
+        pool = swift_connections.setdefault(parsed.netloc, queue.Queue())
+        try:
+            return parsed, pool.get_nowait()
+        except queue.Empty:
+            pass
+    return parsed, swiftclient.http_connection(url, insecure=True)[1]
 
-        if 'gateway_ip' in subnet and subnet['gateway_ip'] == 'null':
-            subnet['gateway_ip'] = None
 
-        body = {'subnet': subnet.copy()}
-        body['subnet']['network_id'] = network['id']
-        body['subnet']['tenant_id'] = network['tenant_id']
+def return_swift_connection(connection):
+    """ put a connection taken with checkout_swift_connection() back """
+    parsed, conn = connection
+    with cache_lock:
+        swift_connections.setdefault(parsed.netloc, queue.Queue()).put(conn)
 
-        query = {'network_id': network['id'], 'name': subnet['name']}
-        result = neutron.list_subnets(retrieve_all=True, **query)
-        if not result or not result['subnets']:
-            logging.info(
-                "create subnet '%s/%s'" % (
-                    network['name'], subnet['name']))
-            neutron.create_subnet(body)
+
+def swift_request(func, url, sess, *args, **kwargs):
+    """
+    call a low-level swiftclient function on a storage-url, reusing the
+    pooled http connections, and account for it in the metrics
+    :param func: e.g. swiftclient.head_container
+    :param url: the storage-url of the account
+    :param sess: the session, which caches and renews the token
+    :param args: the container and further arguments of func
+    :return: the result of func
+    """
+    method = func.__name__.split('_')[0].upper()
+    target = '%s/%s' % (url, args[0]) if args else url
+    if method in ('PUT', 'POST'):
+        kwargs['response_dict'] = response = {}
+    token = sess.get_token()
+    connection = checkout_swift_connection(url)
+    start = time.time()
+    status = None
+    try:
+        result = func(url, token, *args, http_conn=connection, **kwargs)
+        if method in ('PUT', 'POST'):
+            status = response.get('status')
         else:
-            resource = result['subnets'][0]
-            for attr in list(subnet.keys()):
-                if subnet[attr] != resource.get(attr, ''):
-                    logging.info(
-                        "%s differs. update subnet'%s/%s'" % (
-                            attr, network['name'], subnet['name']))
-                    # drop read-only attributes
-                    body['subnet'].pop('cidr', None)
-                    body['subnet'].pop('segment_id', None)
-                    body['subnet'].pop('tenant_id', None)
-                    body['subnet'].pop('network_id', None)
-                    body['subnet'].pop('subnetpool_id', None)
-                    body['subnet'].pop('ip_version', None)
-                    body['subnet'].pop('prefixlen', None)
-                    neutron.update_subnet(resource['id'], body)
-                    break
+            status = 204 if method == 'HEAD' else 200
+        return_swift_connection(connection)
+        return result
+    except swiftclient.ClientException as e:
+        # the error response has been read, the connection can be reused
+        status = e.http_status
+        return_swift_connection(connection)
+        raise
+    except Exception:
+        # drop the connection, the next request opens a new one
+        connection[1].close()
+        raise
+    finally:
+        seconds = time.time() - start
+        record_api_call('object-store', seconds, not status or status >= 400)
+        if tracing:
+            trace_request('object-store', method, target, status, start,
+                          seconds)
 
 
+@metered('swift-account')
 def seed_swift(project, swift, args, sess):
     """
     Seeds swift account and containers for a project
@@ -1489,42 +2989,31 @@ def seed_swift(project, swift, args, sess):
     """
 
     if 'enabled' in swift and swift['enabled']:
-        logging.debug(
-            "seeding swift account for project %s" % project.name)
+        logging.debug("seeding swift account for project %s", project.name)
 
         try:
-            service_token = sess.get_token()
-
-            # poor mans storage-url generation
-            try:
-                swift_endpoint = sess.get_endpoint(
-                    service_type='object-store',
-                    interface=args.interface)
-            except exceptions.EndpointNotFound:
-                swift_endpoint = sess.get_endpoint(
-                    service_type='object-store',
-                    interface='admin')
+            storage_url = get_swift_prefix(args, sess) + project.id
 
-            storage_url = swift_endpoint.split('/AUTH_')[0] + '/AUTH_' + project.id
-
-            # Create swiftclient Connection
-            conn = swiftclient.Connection(session=sess,
-                                          preauthurl=storage_url,
-                                          preauthtoken=service_token,
-                                          insecure=True)
             try:
-                # see if the account already exists
-                conn.head_account()
+                # see if the account already exists, and list its containers
+                _, listing = swift_request(swiftclient.get_account,
+                                           storage_url, sess,
+                                           full_listing=True)
+                existing = set(c['name'] for c in listing)
             except swiftclient.ClientException:
                 # nope, go create it
-                logging.info(
-                    'creating swift account for project %s' % project.name)
-                swiftclient.put_object(storage_url, token=service_token)
+                if plan_change('create', 'swift-account', project.name,
+                               swift):
+                    return
+                logging.info('creating swift account for project %s',
+                             project.name)
+                swift_request(swiftclient.put_object, storage_url, sess)
+                existing = set()
 
             # seed swift containers
             if 'containers' in swift:
                 seed_swift_containers(project, swift['containers'],
-                                      conn)
+                                      storage_url, existing, args, sess)
 
         except Exception as e:
             logging.error(
@@ -1533,88 +3022,95 @@ def seed_swift(project, swift, args, sess):
             raise
 
 
-def seed_swift_containers(project, containers, conn):
+def seed_swift_containers(project, containers, storage_url, existing, args,
+                          sess):
     """
     Creates swift containers for a project
     :param project:
     :param containers:
-    :param conn:
+    :param storage_url: the storage-url of the projects account
+    :param existing: the names of the containers of the account
+    :param args:
+    :param sess:
     :return:
     """
 
-    logging.debug(
-        "seeding swift containers for project %s" % project.name)
+    logging.debug("seeding swift containers for project %s", project.name)
 
-    for container in containers:
-        try:
-            # prepare the container metadata
-            headers = {}
-            if 'metadata' in container:
-                for meta in list(container['metadata'].keys()):
-                    header = 'x-container-%s' % meta
-                    headers[header] = str(container['metadata'][meta])
+    def seed_container(container):
+        with metering('swift-container', '%s/%s' % (
+                project.name, container.get('name')),
+                'seed_swift_containers'):
             try:
-                # see if the container already exists
-                result = conn.head_container(container['name'])
+                # prepare the container metadata
+                headers = {}
+                if 'metadata' in container:
+                    for meta in list(container['metadata'].keys()):
+                        header = 'x-container-%s' % meta
+                        headers[header] = str(container['metadata'][meta])
+                name = '%s/%s' % (project.name, container['name'])
+
+                if container['name'] not in existing:
+                    # nope, go create it
+                    if plan_change('create', 'swift-container', name, headers):
+                        return
+                    logging.info('creating swift container %s', name)
+                    swift_request(swiftclient.put_container, storage_url, sess,
+                                  container['name'], headers)
+                    return
+
+                # only the metadata of existing containers needs to be compared
+                if not headers:
+                    return
+                result = swift_request(swiftclient.head_container, storage_url,
+                                       sess, container['name'])
                 for header in list(headers.keys()):
                     if headers[header] != result.get(header, ''):
-                        logging.info(
-                            "%s differs. update container %s/%s" % (
-                                header, project.name,
-                                container['name']))
-                        conn.post_container(container['name'], headers)
-                        break
-            except swiftclient.ClientException:
-                # nope, go create it
-                logging.info(
-                    'creating swift container %s/%s' % (
-                        project.name, container['name']))
-                conn.put_container(container['name'], headers)
-        except Exception as e:
-            logging.error(
-                "could not seed swift container for project %s: %s" % (
-                    project.name, e))
-            raise
+                        if plan_change('update', 'swift-container', name,
+                                       headers, result):
+                            break
+                        logging.info("%s differs. update container %s", header,
+                                     name)
+                        swift_request(swiftclient.post_container, storage_url,
+                                      sess, container['name'], headers)
+                        break
+            except Exception as e:
+                logging.error(
+                    "could not seed swift container for project %s: %s" % (
+                        project.name, e))
+                raise
 
+    run_concurrently(seed_container, containers,
+                     get_service_limit('object-store', args))
 
-def seed_project_designate_quota(project, config, args):
+
+@metered('dns-quota')
+def seed_project_designate_quota(project, config, args, sess):
     """
     Seeds designate quota for a project
     :param project:
     :param config:
     :param args:
+    :param sess:
     :return:
     """
 
     # seed designate quota
-    logging.debug(
-        "seeding designate quota for project %s" % project.name)
+    logging.debug("seeding designate quota for project %s", project.name)
 
     try:
-        # the designate client needs a token scoped to a project.id
-        # due to a crappy bugfix in https://review.openstack.org/#/c/187570/
-        designate_args = copy.copy(args)
-        designate_args.os_project_id = project.id
-        designate_args.os_domain_id = None
-        designate_args.os_domain_name = None
-        plugin = cli.load_from_argparse_arguments(designate_args)
-        sess = session.Session(auth=plugin,
-                               user_agent='openstack-seeder',
-                               verify=not args.insecure)
-
-        designate = designateclient.Client(session=sess,
-                                           endpoint_type=args.interface + 'URL',
-                                           all_projects=True)
+        designate = get_designate_client(project, args, sess)
 
         result = designate.quotas.list(project.id)
         new_quota = {}
         for attr in list(config.keys()):
             if int(config[attr]) > int(result.get(attr, '')):
                 logging.info(
-                    "%s differs. set project %s designate quota to '%s'" % (
-                        attr, project.name, config))
+                    "%s differs. set project %s designate quota to '%s'", attr,
+                    project.name, config)
                 new_quota[attr] = config[attr]
-        if len(new_quota):
+        if len(new_quota) and not plan_change(
+                'update', 'dns-quota', project.name, new_quota, result):
             designate.quotas.update(project.id, new_quota)
 
     except Exception as e:
@@ -1623,89 +3119,161 @@ def seed_project_designate_quota(project, config, args):
                 project.name, e))
 
 
-def seed_project_dns_zones(project, zones, args):
+def get_designate_inventory(args, sess):
+    """
+    get the (cached) designate zones and tsig keys of all projects, which
+    are listed once per run
+    :param args:
+    :param sess:
+    :return: dict of 'zones' by (project-id, name), 'zone_names' by name
+             and 'tsigkeys' by name
+    """
+    with designate_lock:
+        if not designate_inventory:
+            designate = get_client('designate', args, sess)
+            zones = list_designate(designate.zones.list)
+            tsigkeys = list_designate(designate.tsigkeys.list)
+            designate_inventory['zones'] = dict(
+                ((z['project_id'], z['name']), z) for z in zones)
+            designate_inventory['zone_names'] = dict(
+                (z['name'], z) for z in zones)
+            designate_inventory['tsigkeys'] = dict(
+                (k['name'], k) for k in tsigkeys)
+        return designate_inventory
+
+
+def find_dns_zone(project, name, args, sess):
+    """
+    find a designate zone in the inventory, zone names are unique across
+    projects
+    :return: the zone of the project (or of another one), None if missing
+    """
+    inventory = get_designate_inventory(args, sess)
+    with designate_lock:
+        return inventory['zones'].get((project.id, name)) or \
+            inventory['zone_names'].get(name)
+
+
+def remember_dns_zone(zone):
+    """ add a created designate zone to the inventory """
+    with designate_lock:
+        if designate_inventory:
+            designate_inventory['zones'][(zone['project_id'],
+                                          zone['name'])] = zone
+            designate_inventory['zone_names'][zone['name']] = zone
+
+
+def seed_project_dns_zones(project, zones, args, sess):
     """
     Seed a projects designate zones and dependent objects
     :param project:
     :param zones:
     :param args:
+    :param sess:
     :return:
     """
 
-    logging.debug("seeding dns zones of project %s" % project.name)
+    logging.debug("seeding dns zones of project %s", project.name)
 
     try:
-        # the designate client needs a token scoped to a project.id,
-        # due to a crappy bugfix in https://review.openstack.org/#/c/187570/
-        designate_args = copy.copy(args)
-        designate_args.os_project_id = project.id
-        designate_args.os_domain_id = None
-        designate_args.os_domain_name = None
-        plugin = cli.load_from_argparse_arguments(designate_args)
-        sess = session.Session(auth=plugin,
-                               user_agent='openstack-seeder',
-                               verify=not args.insecure)
-
-        designate = designateclient.Client(session=sess,
-                                           endpoint_type=args.interface + 'URL',
-                                           all_projects=True)
+        designate = get_designate_client(project, args, sess)
 
         for zone in zones:
-            recordsets = zone.pop('recordsets', None)
+            with metering('dns-zone', '%s/%s' % (
+                    project.name, zone.get('name')), 'seed_project_dns_zones'):
+                if subtree_unchanged('dns_zone', zone.get('name'), zone, args):
+                    continue
 
-            zone = sanitize(zone, (
-                'name', 'email', 'ttl', 'description', 'masters',
-                'type'))
+                recordsets = zone.pop('recordsets', None)
 
-            if 'name' not in zone or not zone['name']:
-                logging.warn(
-                    "skipping dns zone '%s/%s', since it is misconfigured" % (
-                        project.name, zone))
-                continue
+                zone = sanitize(zone, (
+                    'name', 'email', 'ttl', 'description', 'masters',
+                    'type'))
 
-            try:
-                resource = designate.zones.get(zone['name'])
-                for attr in list(zone.keys()):
-                    if zone[attr] != resource.get(attr, ''):
-                        logging.info(
-                            "%s differs. update dns zone'%s/%s'" % (
-                                attr, project.name, zone['name']))
-                        designate.zones.update(resource['id'], zone)
-                        break
-            except designateclient.exceptions.NotFound:
-                logging.info(
-                    "create dns zone '%s/%s'" % (
-                        project.name, zone['name']))
-                # wtf
-                if 'type' in zone:
-                    zone['type_'] = zone.pop('type')
-                resource = designate.zones.create(zone.pop('name'),
-                                                  **zone)
-
-            if recordsets:
-                seed_dns_zone_recordsets(resource, recordsets,
-                                         designate)
+                if 'name' not in zone or not zone['name']:
+                    logging.warn(
+                        "skipping dns zone '%s/%s', since it is misconfigured" % (
+                            project.name, zone))
+                    continue
+
+                resource = find_dns_zone(project, zone['name'], args, sess)
+                if resource:
+                    for attr in list(zone.keys()):
+                        if zone[attr] != resource.get(attr, ''):
+                            if plan_change('update', 'dns-zone', '%s/%s' % (
+                                    project.name, zone['name']), zone,
+                                    resource):
+                                break
+                            logging.info("%s differs. update dns zone'%s/%s'",
+                                         attr, project.name, zone['name'])
+                            designate.zones.update(resource['id'], zone)
+                            break
+                else:
+                    if plan_change('create', 'dns-zone', '%s/%s' % (
+                            project.name, zone['name']),
+                            dict(zone, recordsets=recordsets or [])):
+                        continue
+                    logging.info("create dns zone '%s/%s'", project.name,
+                                 zone['name'])
+                    # wtf
+                    if 'type' in zone:
+                        zone['type_'] = zone.pop('type')
+                    resource = designate.zones.create(zone.pop('name'),
+                                                      **zone)
+                    remember_dns_zone(resource)
+
+                if recordsets:
+                    seed_dns_zone_recordsets(resource, recordsets,
+                                             designate, args)
 
     except Exception as e:
         logging.error("could not seed project dns zones %s: %s" % (
             project.name, e))
 
 
-def seed_dns_zone_recordsets(zone, recordsets, designate):
+def list_designate(func, *args):
+    """
+    list all resources of a paginated designate listing, following the
+    markers
+    :param func: e.g. designate.recordsets.list
+    :param args: the positional arguments of func, e.g. the zone-id
+    :return: the resources of all pages
+    """
+    result = []
+    marker = None
+    while True:
+        page = func(*args, marker=marker, limit=DNS_PAGE_SIZE)
+        result.extend(page)
+        if not page or not getattr(page, 'next_page', False):
+            return result
+        marker = page[-1]['id']
+
+
+def seed_dns_zone_recordsets(zone, recordsets, designate, args):
     """
     seed a designate zones recordsets
     :param zone:
     :param recordsets:
     :param designate:
+    :param args:
     :return:
     """
 
-    logging.debug("seeding recordsets of dns zones %s" % zone['name'])
+    logging.debug("seeding recordsets of dns zones %s", zone['name'])
 
-    for recordset in recordsets:
-        try:
-            # records = recordset.pop('records', None)
+    try:
+        # all recordsets of the zone by name and type
+        existing = dict(((r['name'], r['type']), r) for r in
+                        list_designate(designate.recordsets.list, zone['id']))
+    except Exception as e:
+        logging.error(
+            "could not seed dns zone %s recordsets: %s" % (zone['name'], e))
+        return
 
+    def seed_recordset(recordset):
+        with metering('dns-recordset', '%s/%s' % (
+                zone['name'], recordset.get('name')),
+                'seed_dns_zone_recordsets'):
             recordset = sanitize(recordset, (
                 'name', 'ttl', 'description', 'type', 'records'))
 
@@ -1713,108 +3281,109 @@ def seed_dns_zone_recordsets(zone, recordsets, designate):
                 logging.warn(
                     "skipping recordset %s of dns zone %s, since it is misconfigured" % (
                         recordset, zone['name']))
-                continue
+                return
             if 'type' not in recordset or not recordset['type']:
                 logging.warn(
                     "skipping recordset %s of dns zone %s, since it is misconfigured" % (
                         recordset, zone['name']))
-                continue
+                return
+
+            name = '%s/%s/%s' % (zone['name'], recordset['name'],
+                                 recordset['type'])
+            resource = existing.get((recordset['name'], recordset['type']))
+            try:
+                if not resource:
+                    if plan_change('create', 'dns-recordset', name, recordset):
+                        return
+                    logging.info("create dns zones %s recordset %s",
+                                 zone['name'], recordset['name'])
+                    designate.recordsets.create(zone['id'],
+                                                recordset['name'],
+                                                recordset['type'],
+                                                recordset['records'],
+                                                description=recordset.get(
+                                                    'description'),
+                                                ttl=recordset.get('ttl'))
+                    return
 
-            query = {'name': recordset['name'],
-                     'type': recordset['type']}
-            result = designate.recordsets.list(zone['id'],
-                                               criterion=query)
-            if not result:
-                logging.info(
-                    "create dns zones %s recordset %s" % (
-                        zone['name'], recordset['name']))
-                designate.recordsets.create(zone['id'],
-                                            recordset['name'],
-                                            recordset['type'],
-                                            recordset['records'],
-                                            description=recordset.get(
-                                                'description'),
-                                            ttl=recordset.get('ttl'))
-            else:
-                resource = result[0]
                 for attr in list(recordset.keys()):
                     if attr == 'records':
-                        for record in recordset['records']:
-                            if record not in resource.get('records',
-                                                          []):
-                                logging.info(
-                                    "update dns zone %s recordset %s record %s" % (
-                                        zone['name'], recordset['name'],
-                                        record))
-                                designate.recordsets.update(zone['id'],
-                                                            resource[
-                                                                'id'],
-                                                            recordset)
-                                break
-                    elif recordset[attr] != resource.get(attr, ''):
+                        # the desired records have to be a subset of the
+                        # current ones
+                        differs = not set(recordset['records']).issubset(
+                            resource.get('records', []))
+                    else:
+                        differs = recordset[attr] != resource.get(attr, '')
+                    if differs:
+                        if plan_change('update', 'dns-recordset', name,
+                                       recordset, resource):
+                            break
                         logging.info(
-                            "%s differs. update dns zone'%s recordset %s'" % (
-                                attr, zone['name'], recordset['name']))
-                        designate.recordsets.update(zone['id'],
-                                                    resource['id'],
+                            "%s differs. update dns zone'%s recordset %s'",
+                            attr, zone['name'], recordset['name'])
+                        designate.recordsets.update(zone['id'], resource['id'],
                                                     recordset)
                         break
+            except Exception as e:
+                logging.error(
+                    "could not seed dns zone %s recordset %s: %s" % (
+                        zone['name'], recordset['name'], e))
 
-        except Exception as e:
-            logging.error(
-                "could not seed dns zone %s recordsets: %s" % (
-                    zone['name'], e))
+    # the recordsets are compared against the single listing, only the
+    # differing ones are sent to designate
+    run_concurrently(seed_recordset, recordsets,
+                     get_service_limit('dns', args))
 
 
-def seed_project_tsig_keys(project, keys, args):
+def seed_project_tsig_keys(project, keys, args, sess):
     """
     Seed a projects designate tsig keys
     :param project:
     :param keys:
     :param args:
+    :param sess:
     :return:
     """
 
-    logging.debug("seeding dns tsig keys of project %s" % project.name)
+    logging.debug("seeding dns tsig keys of project %s", project.name)
 
     try:
-        # the designate client needs a token scoped to a project.id,
-        # due to a crappy bugfix in https://review.openstack.org/#/c/187570/
-        designate_args = copy.copy(args)
-        designate_args.os_project_id = project.id
-        designate_args.os_domain_id = None
-        designate_args.os_domain_name = None
-        plugin = cli.load_from_argparse_arguments(designate_args)
-        sess = session.Session(auth=plugin,
-                               user_agent='openstack-seeder',
-                               verify=not args.insecure)
-        designate = designateclient.Client(session=sess,
-                                           endpoint_type=args.interface + 'URL',
-                                           all_projects=True)
+        designate = get_designate_client(project, args, sess)
+        tsigkeys = get_designate_inventory(args, sess)['tsigkeys']
 
         for key in keys:
-            key = sanitize(key, (
-                'name', 'algorithm', 'secret', 'scope', 'resource_id'))
+            with metering('dns-tsigkey', '%s/%s' % (
+                    project.name, key.get('name')), 'seed_project_tsig_keys'):
+                key = sanitize(key, (
+                    'name', 'algorithm', 'secret', 'scope', 'resource_id'))
 
-            if 'name' not in key or not key['name']:
-                logging.warn(
-                    "skipping dns tsig key '%s/%s', since it is misconfigured" % (
-                        project.name, key))
-                continue
-            try:
-                resource = designate.tsigkeys.get(key['name'])
-                for attr in list(key.keys()):
-                    if key[attr] != resource.get(attr, ''):
-                        logging.info(
-                            "%s differs. update dns tsig key '%s/%s'" % (
-                                attr, project.name, key['name']))
-                        designate.tsigkeys.update(resource['id'], key)
-                        break
-            except designateclient.exceptions.NotFound:
-                logging.info(
-                    "create dns tsig key '%s/%s'" % (
-                        project.name, key['name']))
-                designate.tsigkeys.create(key.pop('name'), **key)
+                if 'name' not in key or not key['name']:
+                    logging.warn(
+                        "skipping dns tsig key '%s/%s', since it is misconfigured" % (
+                            project.name, key))
+                    continue
+                # tsig key names are unique across projects
+                with designate_lock:
+                    resource = tsigkeys.get(key['name'])
+                if resource:
+                    for attr in list(key.keys()):
+                        if key[attr] != resource.get(attr, ''):
+                            if plan_change('update', 'dns-tsigkey', '%s/%s' % (
+                                    project.name, key['name']), key, resource):
+                                break
+                            logging.info("%s differs. update dns tsig key '%s/%s'",
+                                         attr, project.name, key['name'])
+                            designate.tsigkeys.update(resource['id'], key)
+                            break
+                else:
+                    if plan_change('create', 'dns-tsigkey', '%s/%s' % (
+                            project.name, key['name']), key):
+                        continue
+                    logging.info("create dns tsig key '%s/%s'", project.name,
+                                 key['name'])
+                    resource = designate.tsigkeys.create(key.pop('name'), **key)
+                    with designate_lock:
+                        tsigkeys[resource['name']] = resource
 
     except Exception as e:
         logging.error("could not seed project dns tsig keys %s: %s" % (
@@ -1830,39 +3399,45 @@ def seed_project_ec2_creds(project, domain, creds, args, sess):
     :return:
     """
 
-    logging.debug("seeding ec2 credentials of project %s" % project.name)
+    logging.debug("seeding ec2 credentials of project %s", project.name)
 
     try:
         # grab a keystone client
-        keystone = keystoneclient.Client(session=sess,
-                                         interface=args.interface)
+        keystone = get_client('keystone', args, sess)
     except Exception as e:
         logging.error("Couldn't get keystone client")
         return
 
     for cred in creds:
-        cred = sanitize(cred, ('user', 'user_domain', 'access', 'key'))
-        project_id = get_project_id(domain.name, project.name, keystone)
-        user_id = get_user_id(cred['user_domain'], cred['user'], keystone)
+        with metering('ec2-credential', '%s/%s' % (
+                project.name, cred.get('user')), 'seed_project_ec2_creds'):
+            cred = sanitize(cred, ('user', 'user_domain', 'access', 'key'))
+            project_id = get_project_id(domain.name, project.name, keystone)
+            user_id = get_user_id(cred['user_domain'], cred['user'], keystone)
 
-        if cred.get('access') is None or cred.get('key') is None:
-            logging.error(
-                "missing access or key for ec2 credentials"
-            )
-            return
+            if cred.get('access') is None or cred.get('key') is None:
+                logging.error(
+                    "missing access or key for ec2 credentials"
+                )
+                return
 
-        try:
-            # Check if credential exist - Update if exists
-            result = keystone.credentials.get(cred)
-            if not result:
-                logging.info("Create ec2 credentials")
-                keystone.credentials.create(user=user_id, type="ec2", project=project_id,
-                                        blob='{"access":"' + cred['access'] +
-                                             '", "secret":"' + cred['key'] + '"}')
-            else:
-                logging.info("Ec2 credentials already exist")
-        except Exception as e:
-            logging.error("Could not seed ec2 credentials")
+            try:
+                # Check if credential exist - Update if exists
+                result = keystone.credentials.get(cred)
+                if not result:
+                    # the key is the ec2 secret, keep it out of the plan
+                    if plan_change('create', 'ec2-credential', '%s/%s' % (
+                            project.name, cred['user']),
+                                   dict(cred, key='********')):
+                        continue
+                    logging.info("Create ec2 credentials")
+                    keystone.credentials.create(user=user_id, type="ec2", project=project_id,
+                                            blob='{"access":"' + cred['access'] +
+                                                 '", "secret":"' + cred['key'] + '"}')
+                else:
+                    logging.info("Ec2 credentials already exist")
+            except Exception as e:
+                logging.error("Could not seed ec2 credentials")
 
 
 def domain_config_equal(new, current):
@@ -1886,30 +3461,41 @@ def domain_config_equal(new, current):
     return True
 
 
+@metered('domain-config')
 def seed_domain_config(domain, driver, keystone):
-    logging.debug(
-        "seeding domain config %s %s" % (domain.name, redact(driver)))
+    logging.debug("seeding domain config %s %s", domain.name,
+                  redacted(driver))
 
     # get the current domain configuration
     try:
         result = keystone.domain_configs.get(domain)
         if not domain_config_equal(driver, result.to_dict()):
-            logging.info('updating domain config %s' % domain.name)
+            if plan_change('update', 'domain-config', domain.name, driver,
+                           result.to_dict()):
+                return
+            logging.info('updating domain config %s', domain.name)
             keystone.domain_configs.update(domain, driver)
     except exceptions.NotFound:
-        logging.info('creating domain config %s' % domain.name)
+        if plan_change('create', 'domain-config', domain.name, driver):
+            return
+        logging.info('creating domain config %s', domain.name)
         keystone.domain_configs.create(domain, driver)
     except Exception as e:
         logging.error(
             'could not configure domain %s: %s' % (domain.name, e))
 
 
+@metered('domain')
 def seed_domain(domain, args, sess):
-    logging.debug("seeding domain %s" % domain)
+    if subtree_unchanged('domain', domain.get('name'), domain, args):
+        return
+    logging.debug("seeding domain %s", domain)
 
     # grab a keystone client
-    keystone = keystoneclient.Client(session=sess,
-                                     interface=args.interface)
+    keystone = get_client('keystone', args, sess)
+
+    # the complete spec, for the plan of a dry-run
+    spec = dict(domain)
 
     users = None
     if 'users' in domain:
@@ -1937,23 +3523,28 @@ def seed_domain(domain, args, sess):
             "skipping domain '%s', since it is misconfigured" % domain)
         return
 
-    result = keystone.domains.list(name=domain['name'])
-    if not result:
-        logging.info("create domain '%s'" % domain['name'])
+    resource = find_keystone_entity(
+        'domains', domain['name'],
+        lambda: keystone.domains.list(name=domain['name']))
+    if not resource:
+        if plan_change('create', 'domain', domain['name'], spec):
+            return
+        logging.info("create domain '%s'", domain['name'])
         resource = keystone.domains.create(**domain)
+        remember_created_domain(resource)
     else:
-        resource = result[0]
         for attr in list(domain.keys()):
             if domain[attr] != resource._info.get(attr, ''):
-                logging.info(
-                    "%s differs. update domain '%s'" % (
-                        attr, domain['name']))
-                keystone.domains.update(resource.id, **domain)
+                if plan_change('update', 'domain', domain['name'], domain,
+                               resource._info):
+                    break
+                logging.info("%s differs. update domain '%s'", attr,
+                             domain['name'])
+                resource = keystone.domains.update(resource.id, **domain)
                 break
 
-    # cache the domain id
-    if resource.name not in domain_cache:
-        domain_cache[resource.name] = resource.id
+    # cache the domain
+    remember_keystone_entity('domains', domain['name'], resource)
 
     if driver:
         seed_domain_config(resource, driver, keystone)
@@ -1984,41 +3575,124 @@ def seed_domain(domain, args, sess):
                     assignment['group'] = '%s@%s' % (role['group'], domain['name'])
             if 'inherited' in role:
                 assignment['inherited'] = role['inherited']
-            role_assignments.append(assignment)
+            add_role_assignment(assignment)
+
+
+def seed_domains(domains, args, sess):
+    """
+    seed keystone domains, concurrently if more than one domain worker
+    has been requested
+    """
+    workers = getattr(args, 'domain_workers', 1) or 1
+    if workers <= 1:
+        for domain in domains:
+            seed_domain(domain, args, sess)
+        return
+
+    def seed_domain_buffered(domain):
+        # collect the assignments per domain, so that they can be merged
+        # in the order of the seed, regardless of which worker finishes first
+        pending.role_assignments = []
+        pending.group_members = {}
+        try:
+            seed_domain(domain, args, sess)
+            return pending.role_assignments, pending.group_members
+        finally:
+            pending.role_assignments = None
+            pending.group_members = None
 
+    logging.info("seeding %d domains with %d workers", len(domains), workers)
+    results = run_concurrently(seed_domain_buffered, domains, workers)
+    with cache_lock:
+        for assignments, members in results:
+            role_assignments.extend(assignments)
+            for group, users in members.items():
+                group_members.setdefault(group, []).extend(users)
 
+
+@metered('resource-class')
 def seed_resource_class(resource_class, args, sess):
-    logging.debug("seeding resource-class %s" % resource_class)
+    logging.debug("seeding resource-class %s", resource_class)
+    if plan_change('create', 'resource-class', resource_class):
+        return
 
     try:
-        ks_filter = {
-            'service_type': 'placement',
-            'interface': args.interface,
-        }
-
-        # api_version=1.7 -> idempotent resource class creation
-        http = placementclient(session=sess, ks_filter=ks_filter, api_version='1.7')
-        result = http.request('PUT', PER_CLASS_URL.format(name=resource_class))
+        http = get_client('placement', args, sess)
+        http.request('PUT', PER_CLASS_URL.format(name=resource_class))
     except Exception as e:
         logging.error("Failed to seed resource-class %s: %s" % (resource_class, e))
 
 
+@metered('trait')
 def seed_trait(trait, args, sess):
+    if plan_change('create', 'trait', trait):
+        return
     try:
-        ks_filter = {'service_type': 'placement', 'interface': args.interface}
-        http = placementclient(session=sess, ks_filter=ks_filter)
+        http = get_client('placement', args, sess)
         http.request('PUT', '/traits/{}'.format(trait))
     except Exception as e:
         logging.error("Failed to seed trait %s: %s" % (trait, e))
 
 
+def seed_resource_classes(names, args, sess):
+    """
+    seed the placement resource classes missing from a single listing,
+    concurrently bounded by the placement service limit
+    """
+    try:
+        http = get_client('placement', args, sess)
+        result = http.request('GET', '/resource_classes').json()
+        existing = set(r['name'] for r in result['resource_classes'])
+    except Exception as e:
+        logging.error("Failed to list resource-classes: %s" % e)
+        return
+
+    missing = sorted(set(names) - existing)
+    record_unchanged('resource-class', len(set(names)) - len(missing))
+    if missing:
+        logging.info("creating resource-classes %s", ', '.join(missing))
+    run_concurrently(lambda name: seed_resource_class(name, args, sess),
+                     missing, get_service_limit('placement', args))
+
+
+def seed_traits(names, args, sess):
+    """
+    seed the placement traits missing from a single listing, concurrently
+    bounded by the placement service limit
+    """
+    try:
+        http = get_client('placement', args, sess)
+        existing = set(http.request('GET', '/traits').json()['traits'])
+    except Exception as e:
+        logging.error("Failed to list traits: %s" % e)
+        return
+
+    missing = sorted(set(names) - existing)
+    record_unchanged('trait', len(set(names)) - len(missing))
+    if missing:
+        logging.info("creating traits %s", ', '.join(missing))
+    run_concurrently(lambda name: seed_trait(name, args, sess),
+                     missing, get_service_limit('placement', args))
+
+
+def seed_flavors(flavors, args, sess):
+    """
+    seed nova flavors against the flavor catalog, concurrently bounded by
+    the compute service limit
+    """
+    run_concurrently(lambda flavor: seed_flavor(flavor, args, sess),
+                     flavors, get_service_limit('compute', args))
+
+
+@metered('flavor')
 def seed_flavor(flavor, args, sess):
     global resource_classes, traits
-    logging.debug("seeding flavor %s" % flavor)
+    if subtree_unchanged('flavor', flavor.get('id'), flavor, args):
+        return
+    logging.debug("seeding flavor %s", flavor)
 
     try:
-        nova = novaclient.Client("2.1", session=sess,
-                                 endpoint_type=args.interface + 'URL')
+        nova = get_client('nova', args, sess)
 
         extra_specs = None
         if 'extra_specs' in flavor:
@@ -2030,10 +3704,11 @@ def seed_flavor(flavor, args, sess):
                 for k in extra_specs:
                     if k.startswith('resources:CUSTOM_'):
                         resource_classes.add(k.split(':', 2)[-1])
-                        logging.info("got resource_classes: {}".format(resource_classes))
+                        logging.debug("got resource_classes: %s",
+                                      resource_classes)
                     if k.startswith('trait:CUSTOM_'):
                         traits.add(k.split(':', 2)[-1])
-                        logging.info("got traits: {}".format(traits))
+                        logging.debug("got traits: %s", traits)
 
 
         flavor = sanitize(flavor, (
@@ -2048,10 +3723,8 @@ def seed_flavor(flavor, args, sess):
 
         # wtf, flavors has no update(): needs to be dropped and re-created instead
         create = False
-        resource = None
-        try:
-            resource = nova.flavors.get(flavor['id'])
-
+        resource = get_flavor_catalog(args, sess).get(str(flavor['id']))
+        if resource:
             # 'rename' some attributes, since api and internal representation differ
             flavor_cmp = flavor.copy()
             if 'is_public' in flavor_cmp:
@@ -2064,26 +3737,46 @@ def seed_flavor(flavor, args, sess):
             # check for delta
             for attr in list(flavor_cmp.keys()):
                 if flavor_cmp[attr] != getattr(resource, attr):
+                    if plan_change('update', 'flavor', flavor['name'],
+                                   dict(flavor_cmp,
+                                        extra_specs=extra_specs or {}),
+                                   resource._info):
+                        return
                     logging.info(
-                        "deleting flavor '%s' to re-create, since '%s' differs" %
-                        (flavor['name'], attr))
+                        "deleting flavor '%s' to re-create, since '%s' differs",
+                        flavor['name'], attr)
                     resource.delete()
+                    with flavor_lock:
+                        flavor_catalog['flavors'].pop(resource.id, None)
                     create = True
                 break
-        except novaexceptions.NotFound:
+        else:
             create = True
 
         # (re-) create the flavor
         if create:
-            logging.info("creating flavor '%s'" % flavor['name'])
+            if plan_change('create', 'flavor', flavor['name'],
+                           dict(flavor, extra_specs=extra_specs or {})):
+                return
+            logging.info("creating flavor '%s'", flavor['name'])
             flavor['flavorid'] = flavor.pop('id')
             resource = nova.flavors.create(**flavor)
+            with flavor_lock:
+                flavor_catalog['flavors'][resource.id] = resource
+                # a re-created flavor lost its access list
+                flavor_access.pop(resource.id, None)
 
         # take care of the flavors extra specs
         if extra_specs and resource:
             set_extra_specs = False
             try:
-                keys = resource.get_keys()
+                if create:
+                    keys = {}
+                elif 'extra_specs' in resource._info:
+                    # embedded in the listing of the flavor catalog
+                    keys = dict(resource._info['extra_specs'])
+                else:
+                    keys = resource.get_keys()
                 for k, v in extra_specs.items():
                     if v != keys.get(k, ''):
                         keys[k] = v
@@ -2092,35 +3785,37 @@ def seed_flavor(flavor, args, sess):
                 set_extra_specs = True
                 keys = extra_specs
 
+            if set_extra_specs and plan_change(
+                    'update', 'flavor-extra-specs', flavor['name'],
+                    extra_specs, resource._info.get('extra_specs', {})):
+                return
             if set_extra_specs:
-                logging.info(
-                    "updating extra-specs '%s' of flavor '%s'" % (
-                        keys, flavor['name']))
+                logging.info("updating extra-specs '%s' of flavor '%s'", keys,
+                             flavor['name'])
                 resource.set_keys(keys)
     except Exception as e:
         logging.error("Failed to seed flavor %s: %s" % (flavor, e))
         raise
 
 
+@metered('share-type')
 def seed_share_type(sharetype, args, sess, config):
     """ seed manila share type """
-    logging.debug("seeding Manila share type %s" % sharetype)
+    if subtree_unchanged('share_type', sharetype.get('name'), sharetype,
+                         args):
+        return
+    logging.debug("seeding Manila share type %s", sharetype)
 
     # intialize manila client
     try:
-        api_version = api_versions.APIVersion("2.40")
-        client = manilaclient.Client(session=sess, api_version=api_version)
+        client = get_client('manila', args, sess)
         manager = client.share_types
     except Exception as e:
         logging.error("Fail to initialize client: %s" % e)
         raise
 
     def get_type_by_name(name):
-        opts = {'all_tenants': 1}
-        for t in manager.list(search_opts=opts):
-            if t.name == name:
-                return t
-        return None
+        return get_type_catalog('share_types', client).get(name)
 
     def validate_share_type(sharetype):
         sharetype = sanitize(sharetype, [
@@ -2133,12 +3828,7 @@ def seed_share_type(sharetype, args, sess, config):
         return sharetype
 
     def update_type(stype, extra_specs):
-        to_be_unset = []
-        for k in list(stype.extra_specs.keys()):
-            if k not in list(extra_specs.keys()):
-                to_be_unset.append(k)
-        stype.unset_keys(to_be_unset)
-        stype.set_keys(extra_specs)
+        update_extra_specs(stype, extra_specs, 'share type')
 
     def create_type(sharetype):
         extra_specs = sharetype['extra_specs']
@@ -2154,17 +3844,21 @@ def seed_share_type(sharetype, args, sess, config):
             pass
         sharetype['extra_specs'] = extra_specs
         try:
-            manager.create(**sharetype)
+            stype = manager.create(**sharetype)
         except:
             sharetype.pop('description')
-            manager.create(**sharetype)
+            stype = manager.create(**sharetype)
+        remember_type('share_types', stype)
 
     # validation sharetype
     sharetype = validate_share_type(sharetype)
-    logging.debug("Validated Manila share type %s" % sharetype)
+    logging.debug("Validated Manila share type %s", sharetype)
 
     # update share type if exists
     stype = get_type_by_name(sharetype['name'])
+    if not stype and plan_change('create', 'share-type', sharetype['name'],
+                                 sharetype):
+        return
     if stype:
         try:
             update_type(stype, sharetype['extra_specs'])
@@ -2178,41 +3872,41 @@ def seed_share_type(sharetype, args, sess, config):
             logging.error("Failed to create share type %s: %s" % (sharetype, e))
             raise
 
+@metered('volume-type')
 def seed_volume_type(volume_type, args, sess):
     """seed a cinder volume type"""
-    logging.debug("seeding volume-type %s" % volume_type)
+    if subtree_unchanged('volume_type', volume_type.get('name'), volume_type,
+                         args):
+        return
+    logging.debug("seeding volume-type %s", volume_type)
     # intialize cinder client
 
     try:
-        cinder = cinderclient.Client(session=sess, interface=args.interface, api_version="3.50")
+        cinder = get_client('cinder', args, sess)
     except Exception as e:
         logging.error("Fail to initialize cinder client: %s" % e)
         raise
 
     def get_type_by_name(name):
-        for t in cinder.volume_types.list(is_public=volume_type['is_public']):
-            if t.name == name:
-                return t
-        return None
+        return get_type_catalog('volume_types', cinder).get(name)
 
     def update_type(vtype, extra_specs):
-        to_be_unset = []
-        for k in list(vtype.extra_specs.keys()):
-            if k not in list(extra_specs.keys()):
-                to_be_unset.append(k)
-        vtype.unset_keys(to_be_unset)
-        vtype.set_keys(extra_specs)
+        update_extra_specs(vtype, extra_specs, 'volume type')
 
     def create_type(volume_type):
         vtype = cinder.volume_types.create(volume_type['name'], volume_type['description'], volume_type['is_public'])
+        remember_type('volume_types', vtype)
         if 'extra_specs' in volume_type:
             extra_specs = volume_type.pop('extra_specs', None)
             if not isinstance(extra_specs, dict):
                 logging.warn("skipping volume-type '%s', since it has invalid extra_specs" % volume_type)
-        else:
-            vtype.set_keys(extra_specs)
+            else:
+                vtype.set_keys(extra_specs)
 
     vtype = get_type_by_name(volume_type['name'])
+    if not vtype and plan_change('create', 'volume-type',
+                                 volume_type['name'], volume_type):
+        return
     if vtype:
         try:
             update_type(vtype, volume_type['extra_specs'])
@@ -2226,16 +3920,17 @@ def seed_volume_type(volume_type, args, sess):
             logging.error("Failed to create volume type %s: %s" % (volume_type, e))
             raise
 
+@metered('rbac-policy', None)
 def seed_rbac_policy(rbac, args, sess, keystone):
     """ seed a neutron rbac-policy """
 
     object_name_regex = r"^([^@]+)@([^@]+)@([^@]+)$"
     target_name_regex = r"^([^@]+)@([^@]+)$"
 
-    logging.debug("seeding rbac-policy %s" % rbac)
+    logging.debug("seeding rbac-policy %s", rbac)
 
     # grab a neutron client
-    neutron = neutronclient.Client(session=sess, interface=args.interface)
+    neutron = get_client('neutron', args, sess)
 
     rbac = sanitize(rbac, ('object_type', 'object_name', 'object_id', 'action', 'target_tenant_name', 'target_tenant'))
 
@@ -2283,7 +3978,9 @@ def seed_rbac_policy(rbac, args, sess, keystone):
         if not result or not result['rbac_policies']:
             body = {'rbac_policy': rbac.copy()}
 
-            logging.info("create rbac-policy '%s'" % rbac)
+            if plan_change('create', 'rbac-policy', rbac['object_id'], rbac):
+                return
+            logging.info("create rbac-policy '%s'", rbac)
             neutron.create_rbac_policy(body=body)
 
     except Exception as e:
@@ -2291,29 +3988,119 @@ def seed_rbac_policy(rbac, args, sess, keystone):
         raise
 
 
-def resolve_group_members(keystone):
-    for group, users in group_members.items():
-        logging.debug("resolving group members %s %s" % (group, users))
-        for uid in users:
-            username, domain = uid.split('@')
-            user = get_user_id(domain, username, keystone)
+def resolve_group_members(keystone, args):
+    """
+    reconcile the collected group members: the current members of every
+    group are listed once, only the missing users are added
+    """
+
+    def resolve_group(item):
+        group, users = item
+        logging.debug("resolving group members %s %s", group,
+                      [uid for uid, _ in users])
+
+        # the current members, by domain-id and name
+        names = set()
+        ids = set()
+        for user in keystone.users.list(group=group):
+            names.add((user.domain_id, user.name))
+            ids.add(user.id)
+
+        for uid, subtrees in users:
+            with metering('group-membership', '%s/%s' % (uid, group),
+                          'resolve_group_members') as entity:
+                # a skipped membership leaves its subtrees incomplete
+                entity['subtrees'] = subtrees
+                username, domain = uid.split('@')
+                if (get_domain_id(domain, keystone), username) in names:
+                    continue
 
-            if user:
-                try:
-                    keystone.users.check_in_group(user, group)
-                except exceptions.NotFound:
-                    logging.info(
-                        "add user '%s' to group '%s'" % (uid, group))
-                    keystone.users.add_to_group(user, group)
-            else:
-                logging.warn(
-                    "could not add user '%s' to group '%s'" % (
-                        uid, group))
+                user = get_user_id(domain, username, keystone)
+                if user:
+                    if user not in ids:
+                        if plan_change('grant', 'group-membership', '%s/%s' % (
+                                uid, group)):
+                            continue
+                        logging.info("add user '%s' to group '%s'", uid, group)
+                        keystone.users.add_to_group(user, group)
+                        ids.add(user)
+                else:
+                    logging.warn(
+                        "could not add user '%s' to group '%s'" % (
+                            uid, group))
+
+    run_concurrently(resolve_group, list(group_members.items()),
+                     get_service_limit('identity', args))
+
+
+def role_assignment_key(role_id, role_assignment):
+    """
+    a comparable key of a role assignment
+    :param role_id:
+    :param role_assignment: the keyword arguments of keystone.roles.grant()
+    :return: (role-id, actor-type, actor-id, scope-type, scope-id, inherited)
+    """
+    if 'user' in role_assignment:
+        actor = ('user', role_assignment['user'])
+    else:
+        actor = ('group', role_assignment.get('group'))
+    if 'system' in role_assignment:
+        scope = ('system', role_assignment['system'])
+    elif 'project' in role_assignment:
+        scope = ('project', role_assignment['project'])
+    elif 'domain' in role_assignment:
+        scope = ('domain', role_assignment['domain'])
+    else:
+        scope = (None, None)
+    inherited = bool(role_assignment.get('os_inherit_extension_inherited'))
+    return (role_id,) + actor + scope + (inherited,)
+
+
+def existing_role_assignment_key(resource):
+    """ a comparable key of a role assignment listed by keystone """
+    info = resource._info
+    if 'user' in info:
+        actor = ('user', info['user']['id'])
+    else:
+        actor = ('group', info.get('group', {}).get('id'))
+    scope = info.get('scope', {})
+    if 'system' in scope:
+        target = ('system', 'all')
+    elif 'project' in scope:
+        target = ('project', scope['project']['id'])
+    elif 'domain' in scope:
+        target = ('domain', scope['domain']['id'])
+    else:
+        target = (None, None)
+    inherited = 'OS-INHERIT:inherited_to' in scope
+    return (info['role']['id'],) + actor + target + (inherited,)
+
+
+def list_role_assignments(scope, keystone):
+    """
+    list the existing role assignments on a scope
+    :param scope: (scope-type, scope-id)
+    :param keystone:
+    :return: set of role assignment keys, None if they could not be listed
+    """
+    kind, id = scope
+    try:
+        result = keystone.role_assignments.list(**{kind: id})
+    except Exception as e:
+        logging.warn("could not list role assignments of %s %s: %s" % (
+            kind, id, e))
+        return None
+    return set(existing_role_assignment_key(r) for r in result)
 
 
-def resolve_role_assignments(keystone):
-    for assignment in role_assignments:
-        logging.debug("resolving role assignment %s" % assignment)
+def resolve_role_assignments(keystone, args):
+    """
+    reconcile the collected role assignments: the existing assignments are
+    listed once per scope, only the missing ones are granted
+    """
+    desired = {}
+    for assignment, subtrees in role_assignments:
+        logging.debug("resolving role assignment %s", assignment)
 
         try:
             role_assignment = dict()
@@ -2326,6 +4113,7 @@ def resolve_role_assignments(keystone):
                     logging.warn(
                         "user %s not found, skipping role assignment.." %
                         assignment['user'])
+                    mark_incomplete(subtrees)
                     continue
                 role_assignment['user'] = id
             elif 'group' in assignment:
@@ -2335,6 +4123,7 @@ def resolve_role_assignments(keystone):
                     logging.warn(
                         "group %s not found, skipping role assignment.." %
                         assignment['group'])
+                    mark_incomplete(subtrees)
                     continue
                 role_assignment['group'] = id
             if 'system' in assignment:
@@ -2346,6 +4135,7 @@ def resolve_role_assignments(keystone):
                         logging.warn(
                             "domain %s not found, skipping role assignment.." %
                             assignment['domain'])
+                        mark_incomplete(subtrees)
                         continue
                     role_assignment['domain'] = id
                 if 'project' in assignment:
@@ -2355,6 +4145,7 @@ def resolve_role_assignments(keystone):
                         logging.warn(
                             "project %s not found, skipping role assignment.." %
                             assignment['project'])
+                        mark_incomplete(subtrees)
                         continue
                     role_assignment['project'] = id
                 elif 'project_id' in assignment:
@@ -2364,31 +4155,96 @@ def resolve_role_assignments(keystone):
                     role_assignment['os_inherit_extension_inherited'] = \
                         assignment['inherited']
 
-            try:
-                keystone.roles.check(role_id, **role_assignment)
-            except exceptions.NotFound:
-                logging.info("grant '%s' to '%s'" % (role, assignment))
-                keystone.roles.grant(role_id, **role_assignment)
+            key = role_assignment_key(role_id, role_assignment)
+            if key not in desired:
+                desired[key] = (role, role_id, role_assignment, assignment)
         except ValueError as e:
             logging.error(
                 "skipped role assignment %s since it is invalid: %s" % (
                     assignment, e))
 
+    # one listing per scope (project, domain or system)
+    scopes = sorted(set(key[3:5] for key in desired if key[3]))
+    workers = get_service_limit('identity', args)
+    listings = run_concurrently(lambda scope: list_role_assignments(
+        scope, keystone), scopes, workers)
+    existing = dict(zip(scopes, listings))
+
+    missing = []
+    for key, value in desired.items():
+        current = existing.get(key[3:5])
+        if current is not None and key in current:
+            continue
+        missing.append((current is None, value))
+
+    def grant(item):
+        unverified, (role, role_id, role_assignment, assignment) = item
+        actor = assignment.get('user') or assignment.get('group')
+        target = assignment.get('project') or assignment.get(
+            'project_id') or assignment.get('domain') or assignment.get(
+            'system')
+        with metering('role-assignment', '%s/%s/%s' % (role, actor, target),
+                      'resolve_role_assignments'):
+            try:
+                if unverified:
+                    # the scope could not be listed, check the assignment
+                    # itself
+                    try:
+                        keystone.roles.check(role_id, **role_assignment)
+                        return
+                    except exceptions.NotFound:
+                        pass
+                if plan_change('grant', 'role-assignment', role, assignment):
+                    return
+                logging.info("grant '%s' to '%s'", role, assignment)
+                keystone.roles.grant(role_id, **role_assignment)
+            except ValueError as e:
+                logging.error(
+                    "skipped role assignment %s since it is invalid: %s" % (
+                        assignment, e))
+
+    logging.debug("%d of %d role assignments are missing", len(missing),
+                  len(desired))
+    record_unchanged('role-assignment', len(desired) - len(missing))
+    run_concurrently(grant, missing, workers)
+
 
 def seed_quota_class_sets(quota_class_set, sess):
     # this have been patched into Nova to create custom quotas (flavor based)
     for quota_class, quotas in quota_class_set.items():
-        logging.debug("seeding nova quota-class-set %s" % quota_class)
+        with metering('quota-class-set', quota_class, 'seed_quota_class_sets'):
+            logging.debug("seeding nova quota-class-set %s", quota_class)
+            if plan_change('update', 'quota-class-set', quota_class, quotas):
+                continue
 
-        try:
-            resp = sess.post('/os-quota-class-sets/' + quota_class,
-                             endpoint_filter={'service_type': 'compute',
-                                              'interface': 'public'},
-                             json=dict({"quota_class_set": quotas}))
-            logging.debug("Create/Update os-quota-class-set : %s" % resp.text)
-        except Exception as e:
-            logging.error("could not seed quota-class-set %s: %s" % (quota_class, e))
-            raise
+            try:
+                resp = sess.post('/os-quota-class-sets/' + quota_class,
+                                 endpoint_filter={'service_type': 'compute',
+                                                  'interface': 'public'},
+                                 json=dict({"quota_class_set": quotas}))
+                logging.debug("Create/Update os-quota-class-set : %s", resp.text)
+            except Exception as e:
+                logging.error("could not seed quota-class-set %s: %s" % (quota_class, e))
+                raise
+
+
+def reset_caches():
+    """
+    clear the caches and indexes of the previous seed run. they are cleared
+    per seed document, also for the documents of a multi-document stream and
+    in serve mode, so that every document is seeded against the current
+    state of openstack. only the session, the api clients and the
+    object-store connections are kept across documents, the designate
+    clients of the projects are dropped
+    """
+    with cache_lock:
+        for cache in (role_cache, domain_cache, project_cache, user_cache,
+                      group_cache, subnetpool_cache, network_cache,
+                      subnet_cache, neutron_inventory, swift_auth,
+                      designate_inventory, share_type_access, type_catalogs,
+                      flavor_catalog, flavor_access, flavor_fetches,
+                      resource_classes, traits, designate_clients):
+            cache.clear()
 
 
 def seed_config(config, args, sess):
@@ -2399,48 +4255,48 @@ def seed_config(config, args, sess):
     role_assignments = []
 
     # grab a keystone client
-    keystone = keystoneclient.Client(session=sess,
-                                     interface=args.interface)
+    keystone = get_client('keystone', args, sess)
+
+    # snapshot the existing keystone entities
+    load_keystone_inventory(config, keystone)
 
     if 'roles' in config:
         for role in config['roles']:
             if role:
-                seed_role(role, keystone)
+                seed_role(role, keystone, args)
 
     if 'regions' in config:
         # seed parent regions
         for region in config['regions']:
             if 'parent_region' not in region:
-                seed_region(region, keystone)
+                seed_region(region, keystone, args)
         # seed child regions
         for region in config['regions']:
             if 'parent_region' in region:
-                seed_region(region, keystone)
+                seed_region(region, keystone, args)
 
     if 'services' in config:
         for service in config['services']:
-            seed_service(service, keystone)
+            seed_service(service, keystone, args)
 
     if 'flavors' in config:
-        for flavor in config['flavors']:
-            seed_flavor(flavor, args, sess)
+        seed_flavors(config['flavors'], args, sess)
 
     # Run it after seed_flavor, as we collect resource_classes there
     if 'resource_classes' in config:
         resource_classes.update(config['resource_classes'])
 
-    for resource_class in resource_classes:
-        seed_resource_class(resource_class, args, sess)
+    if resource_classes:
+        seed_resource_classes(resource_classes, args, sess)
 
     if 'traits' in config:
         traits.update(config['traits'])
 
-    for trait in traits:
-        seed_trait(trait, args, sess)
+    if traits:
+        seed_traits(traits, args, sess)
 
     if 'domains' in config:
-        for domain in config['domains']:
-            seed_domain(domain, args, sess)
+        seed_domains(config['domains'], args, sess)
 
     if 'rbac_policies' in config:
         for rbac in config['rbac_policies']:
@@ -2465,44 +4321,271 @@ def seed_config(config, args, sess):
                 seed_volume_type(volume_type, args, sess)
 
     if group_members:
-        resolve_group_members(keystone)
+        resolve_group_members(keystone, args)
 
     if role_assignments:
-        resolve_role_assignments(keystone)
+        resolve_role_assignments(keystone, args)
+
+
+def create_session(args):
+    """ create the seeders keystoneauth session from the cli arguments """
+    plugin = cli.load_from_argparse_arguments(args)
+    return make_session(args, plugin)
+
+
+def get_plan():
+    """ the plan of a dry-run: the changes in a stable order """
+    with cache_lock:
+        changes = sorted(plan, key=lambda c: (c['kind'], c['name'],
+                                              c['action']))
+    summary = {}
+    for change in changes:
+        summary[change['action']] = summary.get(change['action'], 0) + 1
+    return {'summary': summary, 'changes': changes}
+
+
+def merge_plans(plans):
+    """ the plan of a multi-document seed, the changes in document order """
+    merged = {'summary': {}, 'changes': []}
+    for p in plans:
+        for action, count in p['summary'].items():
+            merged['summary'][action] = merged['summary'].get(action, 0) + count
+        merged['changes'].extend(p['changes'])
+    return merged
+
+
+def write_plan(args, document=None):
+    """ write the plan of a dry-run as json to --plan-file or stdout """
+    document = json.dumps(document or get_plan(), indent=2, sort_keys=True,
+                          default=str)
+    if args.plan_file:
+        with open(args.plan_file, 'w') as f:
+            f.write(document + '\n')
+    else:
+        sys.stdout.write(document + '\n')
+        sys.stdout.flush()
+
+
+def peak_memory():
+    """ the peak resident memory of the process in bytes """
+    rss = getrusage(RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos bytes
+    if sys.platform == 'darwin':
+        return rss
+    return rss * 1024
+
+
+def load_seeds(stream):
+    """
+    parse the documents of a yaml seed stream one after another, so that a
+    document is seeded before the next one is parsed, each document is
+    loaded completely
+    :param stream: a file or a string
+    :return: a generator of the non-empty documents and their parse time
+    """
+    documents = yaml.load_all(stream, Loader=SeedLoader)
+    index = 0
+    while True:
+        start = time.time()
+        try:
+            config = next(documents)
+        except StopIteration:
+            return
+        duration = time.time() - start
+        index += 1
+        logging.info("parsed seed document %d in %.3fs, peak memory %.1f MiB",
+                     index, duration, peak_memory() / 1048576.0)
+        if config:
+            yield config, duration
+
+
+def apply_seed(config, args, sess, name=None):
+    """
+    seed a parsed seed document, a dry-run only collects the plan
+    :param config:
+    :param args:
+    :param sess:
+    :param name: the identity of the seed, defaults to --seed-name
+    :return: 0 on success, 1 otherwise
+    """
+    global dry_run, tracing, seed_name
+
+    dry_run = args.dry_run
+    seed_name = name or getattr(args, 'seed_name', None)
+    del plan[:]
+    tracing = bool(getattr(args, 'trace_file', None))
+    del trace[:]
+
+    reset_metrics()
+    reset_caches()
+    errors = ErrorCounter()
+    incomplete = IncompleteSubtrees()
+    logging.getLogger().addHandler(errors)
+    logging.getLogger().addHandler(incomplete)
+    try:
+        logging.info("seeding openstack with %s",
+                     LazyFormat(summarize, config))
+        logging.debug("seed: %s", redacted(config, SEED_LOG_LIMIT))
+
+        load_fingerprints(args)
+        seed_config(config, args, sess)
+
+        # only remember what has been applied without any error
+        if args.dry_run:
+            logging.info("dry-run, planned changes: %s", get_plan()['summary'])
+        elif errors.count:
+            logging.warn(
+                "not saving the seed state, since %d errors occurred" %
+                errors.count)
+        else:
+            save_fingerprints(args)
+        return 0
+    except Exception as e:
+        logging.error("seed failed: %s" % e)
+        return 1
+    finally:
+        logging.getLogger().removeHandler(errors)
+        logging.getLogger().removeHandler(incomplete)
+        write_metrics(args)
+        if tracing:
+            write_trace(args)
 
 
 def seed(args):
     try:
+        sess = create_session(args)
+    except Exception as e:
+        logging.error("seed failed: %s" % e)
+        return 1
+
+    result = 0
+    plans = []
+    try:
+        # get seed content from file or stdin
         if args.input:
-            # get seed content from file
-            with open(args.input, 'r') as f:
-                config = yaml.load(f, Loader=yaml.SafeLoader)
+            stream = open(args.input, 'r')
         else:
-            # get seed content from stdin
-            seed_content = sys.stdin.read()
-            config = yaml.load(seed_content, Loader=yaml.SafeLoader)
+            stream = sys.stdin
+        try:
+            for config, _ in load_seeds(stream):
+                result |= apply_seed(config, args, sess)
+                if args.dry_run:
+                    plans.append(get_plan())
+        finally:
+            if args.input:
+                stream.close()
     except Exception as e:
         logging.error("could not parse seed input: %s" % e)
-        return 1
+        result = 1
+
+    if args.dry_run:
+        write_plan(args, merge_plans(plans))
+    return result
+
+
+def serve_document(content, args, sess):
+    """
+    seed a document (or a multi-document stream) received in serve mode
+    :param content: the yaml seed document
+    :param args:
+    :param sess:
+    :return: the result to be reported back to the sender
+    """
+    start = time.time()
+    result = {'status': 'ok', 'parse_duration': 0}
+    plans = []
+    # the operator names the seed in a leading '# seed: <name>' comment
+    header = SEED_HEADER.match(content)
+    name = header.group(1) if header else None
+    try:
+        for config, duration in load_seeds(content):
+            result['parse_duration'] += duration
+            if apply_seed(config, args, sess, name):
+                result['status'] = 'failed'
+            if args.dry_run:
+                plans.append(get_plan())
+    except Exception as e:
+        logging.error("could not parse seed input: %s" % e)
+        result['status'] = 'failed'
+        result['error'] = 'could not parse seed input: %s' % e
+
+    result['duration'] = round(time.time() - start, 3)
+    result['parse_duration'] = round(result['parse_duration'], 3)
+    result['max_rss'] = peak_memory()
+    if args.dry_run:
+        result['plan'] = merge_plans(plans)
+    return result
+
+
+def serve_stream(stream, output, args, sess):
+    """
+    seed the yaml documents of a stream one after another. documents are
+    terminated by a '...' line, for every document exactly one json result
+    line is written to output. a document may consist of several yaml
+    documents separated by '---' lines, they are seeded in order
+    """
+    lines = []
+
+    def flush():
+        content = ''.join(lines)
+        del lines[:]
+        result = serve_document(content, args, sess)
+        output.write(json.dumps(result, default=str) + '\n')
+        output.flush()
+
+    for line in stream:
+        if line.rstrip('\r\n') == '...':
+            flush()
+        else:
+            lines.append(line)
+    # an unterminated document at the end of the stream
+    if ''.join(lines).strip():
+        flush()
+
+
+def serve_socket(path, args, sess):
+    """
+    seed the yaml documents sent to a unix socket, one document per
+    connection. the json result is sent back on the same connection
+    """
 
+    class SeedHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            content = self.rfile.read().decode('utf-8')
+            result = serve_document(content, args, sess)
+            self.wfile.write((json.dumps(result, default=str) + '\n').encode('utf-8'))
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socketserver.UnixStreamServer(path, SeedHandler)
+    logging.info("serving seeds on %s", path)
     try:
-        logging.info("seeding openstack with '%s'" % redact(config))
-
-        if not args.dry_run:
-            plugin = cli.load_from_argparse_arguments(args)
-            sess = session.Session(auth=plugin,
-                                   user_agent='openstack-seeder',
-                                   verify=not args.insecure)
-            seed_config(config, args, sess)
-        return 0
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def serve(args):
+    """
+    seed documents one after another with a single process, so that the
+    sessions, tokens, clients and caches stay warm between the documents
+    """
+    try:
+        sess = create_session(args)
     except Exception as e:
-        logging.error("seed failed: %s" % e)
+        logging.error("could not create session: %s" % e)
         return 1
 
+    if args.socket:
+        serve_socket(args.socket, args, sess)
+    else:
+        serve_stream(sys.stdin, sys.stdout, args, sess)
+    return 0
 
-def main():
-    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+def make_parser(argv):
+    """ the seeders command line parser, including the keystoneauth options """
     parser = argparse.ArgumentParser()
     parser.add_argument('--input',
                         help='the yaml file with the identity configuration')
@@ -2520,9 +4603,68 @@ def main():
                         help="Set the logging level",
                         default='INFO')
     parser.add_argument('--dry-run', default=False, action='store_true',
-                        help='Only parse the seed, do no actual seeding.')
-    cli.register_argparse_arguments(parser, sys.argv[1:])
-    args = parser.parse_args()
+                        help='Only read the current state and print the '
+                             'plan of the changes the seed would make.')
+    parser.add_argument('--plan-file',
+                        help='the file to write the plan of a --dry-run '
+                             'to, instead of stdout')
+    parser.add_argument('--serve', default=False, action='store_true',
+                        help='keep running and seed the documents streamed '
+                             'to stdin (terminated by a "..." line) or sent '
+                             'to --socket one after another')
+    parser.add_argument('--socket',
+                        help='the unix socket to accept seeds on in '
+                             '--serve mode')
+    parser.add_argument('--state-file',
+                        help='the file to keep the fingerprints of the '
+                             'applied seed subtrees in, unchanged subtrees '
+                             'are skipped')
+    parser.add_argument('--state-ttl', type=int, default=86400,
+                        help='the number of seconds after which unchanged '
+                             'subtrees are seeded again')
+    parser.add_argument('--seed-name',
+                        help='the identity of the seed (e.g. namespace/name), '
+                             'which namespaces its entries in the state '
+                             'file')
+    parser.add_argument('--full', default=False, action='store_true',
+                        help='seed all subtrees, regardless of the state '
+                             'file')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='the maximum number of concurrent requests per '
+                             'service type, 1 (the default) seeds serially')
+    parser.add_argument('--domain-workers', type=int, default=1,
+                        help='the number of domains to seed concurrently')
+    parser.add_argument('--designate-sudo', default=False,
+                        action='store_true',
+                        help='act on behalf of projects in designate via '
+                             'sudo, instead of authenticating per project')
+    parser.add_argument('--metrics-file',
+                        help='the file to write the metrics of a seed run '
+                             'to, e.g. for the node-exporters textfile '
+                             'collector')
+    parser.add_argument('--metrics-format', default='prometheus',
+                        choices=['prometheus', 'json'],
+                        help='the format of the --metrics-file')
+    parser.add_argument('--trace-file',
+                        help='the file to write a trace of the api '
+                             'requests of a seed run to')
+    parser.add_argument('--trace-format', default='jsonl',
+                        choices=['jsonl', 'chrome'],
+                        help='the format of the --trace-file: json lines '
+                             'or chrome trace-events (chrome://tracing)')
+    parser.add_argument('--service-limit', action='append', default=[],
+                        type=service_limit, metavar='SERVICE=N',
+                        help='the number of concurrent requests to a '
+                             'service type, e.g. network=8 (can be given '
+                             'multiple times)')
+    cli.register_argparse_arguments(parser, argv)
+    return parser
+
+
+def main():
+    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+    args = make_parser(sys.argv[1:]).parse_args()
 
     logging.basicConfig(
         format='%(asctime)s %(levelname)s:%(name)s:%(message)s',
@@ -2539,6 +4681,8 @@ def main():
         handler.setLevel(logging.ERROR)
         setup_logging(handler)
 
+    if args.serve:
+        return serve(args)
     return seed(args)
 
 
@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openstack_seeder  # noqa: E402
+
+
+def make_args(*argv, **kwargs):
+    """
+    parse a seeder command line, for the arguments of a test
+    :param argv: the command line, the defaults if empty
+    :param kwargs: arguments to set on top of the parsed ones
+    :return: the arguments
+    """
+    argv = list(argv)
+    args = openstack_seeder.make_parser(argv).parse_args(argv)
+    for k, v in kwargs.items():
+        setattr(args, k, v)
+    return args
@@ -0,0 +1,45 @@
+import argparse
+import unittest
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class DesignateClientTest(unittest.TestCase):
+
+    def setUp(self):
+        argv = ['--interface', 'internal',
+                '--os-auth-type', 'password',
+                '--os-auth-url', 'http://keystone/v3',
+                '--os-username', 'admin',
+                '--os-password', 'secret',
+                '--os-user-domain-name', 'Default',
+                '--os-project-name', 'admin',
+                '--os-project-domain-name', 'Default']
+        self.args = make_args(*argv)
+        self.sess = openstack_seeder.create_session(self.args)
+        openstack_seeder.reset_caches()
+        self.addCleanup(openstack_seeder.reset_caches)
+
+    def client(self, project_id):
+        project = argparse.Namespace(id=project_id, name=project_id)
+        return openstack_seeder.get_designate_client(project, self.args,
+                                                     self.sess)
+
+    def test_projects_share_the_connection_pool(self):
+        sessions = [self.client(p).session.session for p in ('p1', 'p2')]
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIsNot(sessions[0].auth, sessions[1].auth)
+        for sess in sessions:
+            self.assertIs(sess.session, self.sess.session)
+
+    def test_clients_dropped_per_document(self):
+        client = self.client('p1')
+        self.assertIs(self.client('p1'), client)
+        openstack_seeder.reset_caches()
+        self.assertIsNot(self.client('p1'), client)
+
+
+if __name__ == '__main__':
+    unittest.main()
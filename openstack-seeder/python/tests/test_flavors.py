@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class FakeFlavor(object):
+
+    def __init__(self, id):
+        self.id = id
+        self.name = 'flavor-%s' % id
+
+
+class FakeNova(object):
+    """ a nova capping its flavor listings at max_limit """
+
+    def __init__(self, count, max_limit):
+        self.all = [FakeFlavor('%03d' % i) for i in range(count)]
+        self.max_limit = max_limit
+        self.locked = []
+        self.flavors = mock.Mock()
+        self.flavors.list.side_effect = self.list
+        self.flavor_access = mock.Mock()
+        self.flavor_access.list.side_effect = self.list_access
+        self.access_calls = {}
+        self.count_lock = threading.Lock()
+
+    def list(self, is_public=None, marker=None, limit=None):
+        self.locked.append(openstack_seeder.flavor_lock.locked())
+        flavors = [f for f in self.all if marker is None or f.id > marker]
+        return flavors[:min(limit, self.max_limit)]
+
+    def list_access(self, flavor):
+        self.locked.append(openstack_seeder.flavor_lock.locked())
+        with self.count_lock:
+            self.access_calls[flavor] = self.access_calls.get(flavor, 0) + 1
+        # give the other callers a chance to miss the cache
+        time.sleep(0.05)
+        return []
+
+
+class FlavorCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        openstack_seeder.reset_caches()
+        self.addCleanup(openstack_seeder.reset_caches)
+
+    def catalog(self, nova):
+        with mock.patch.object(openstack_seeder, 'get_client',
+                               return_value=nova):
+            return openstack_seeder.get_flavor_catalog(
+                make_args(), None)
+
+    def test_pages_capped_below_the_requested_limit(self):
+        nova = FakeNova(25, max_limit=10)
+        catalog = self.catalog(nova)
+        self.assertEqual(sorted(catalog), [f.id for f in nova.all])
+        # three pages and the final empty one
+        self.assertEqual(nova.flavors.list.call_count, 4)
+
+    def test_single_page(self):
+        nova = FakeNova(3, max_limit=1000)
+        self.assertEqual(len(self.catalog(nova)), 3)
+        self.assertEqual(nova.flavors.list.call_count, 2)
+
+    def test_concurrent_fetches_once_per_flavor(self):
+        nova = FakeNova(2, max_limit=1000)
+
+        def access(flavorid):
+            return openstack_seeder.get_flavor_access(
+                flavorid, make_args(), None)
+
+        with mock.patch.object(openstack_seeder, 'get_client',
+                               return_value=nova):
+            with ThreadPoolExecutor(8) as executor:
+                list(executor.map(access, ['000', '001'] * 8))
+        self.assertEqual(nova.access_calls, {'000': 1, '001': 1})
+        # one page and the final empty one
+        self.assertEqual(nova.flavors.list.call_count, 2)
+        # the flavor lock is never held during a request
+        self.assertNotIn(True, nova.locked)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import argparse
+import unittest
+from unittest import mock
+
+import tests  # noqa: F401
+
+import openstack_seeder
+
+
+class KeystoneInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        keystone = mock.Mock()
+        keystone.domains.list.return_value = [
+            argparse.Namespace(id='d1', name='Existing')]
+        keystone.roles.list.return_value = []
+        keystone.projects.list.return_value = []
+        openstack_seeder.reset_caches()
+        openstack_seeder.load_keystone_inventory(
+            {'domains': [{'name': 'Existing', 'projects': [{'name': 'a'}]},
+                         {'name': 'New', 'projects': [{'name': 'b'}]}]},
+            keystone)
+        self.addCleanup(openstack_seeder.reset_caches)
+
+    def test_created_domain_needs_no_lookups(self):
+        openstack_seeder.remember_created_domain(
+            argparse.Namespace(id='d2', name='New'))
+        fetch = mock.Mock(return_value=[])
+        for kind in ('projects', 'users', 'groups'):
+            self.assertIsNone(openstack_seeder.find_keystone_entity(
+                kind, ('New', 'b'), fetch))
+        self.assertIsNone(openstack_seeder.find_keystone_entity(
+            'roles', ('d2', 'member'), fetch))
+        fetch.assert_not_called()
+
+    def test_existing_domain_falls_back_to_a_lookup(self):
+        project = argparse.Namespace(id='p1', name='a')
+        fetch = mock.Mock(return_value=[project])
+        self.assertIs(openstack_seeder.find_keystone_entity(
+            'projects', ('Existing', 'a'), fetch), project)
+        fetch.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
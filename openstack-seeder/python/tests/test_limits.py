@@ -0,0 +1,33 @@
+import contextlib
+import io
+import unittest
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class ServiceLimitTest(unittest.TestCase):
+
+    def test_service_limits_override_the_concurrency(self):
+        args = make_args('--concurrency', '3',
+                          '--service-limit', 'network=1',
+                          '--service-limit', 'sharev2=12')
+        self.assertEqual(openstack_seeder.get_service_limit('network', args),
+                         1)
+        self.assertEqual(openstack_seeder.get_service_limit('sharev2', args),
+                         12)
+        self.assertEqual(openstack_seeder.get_service_limit('compute', args),
+                         3)
+
+    def test_invalid_service_limits_are_rejected(self):
+        for value in ('network', 'network=x', 'network=0', '=3'):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    make_args('--service-limit', value)
+            self.assertIn("invalid service limit '%s'" % value,
+                          stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
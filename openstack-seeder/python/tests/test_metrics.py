@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class EntityMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        openstack_seeder.reset_metrics()
+        del openstack_seeder.trace[:]
+        self.addCleanup(openstack_seeder.trace.__delitem__, slice(None))
+        patcher = mock.patch.object(openstack_seeder, 'tracing', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_accounted_per_entity(self):
+        neutron = mock.Mock()
+        network = {'name': 'net', 'id': 'n1', 'tags': ['a']}
+        with mock.patch.object(openstack_seeder, 'get_client',
+                               return_value=neutron):
+            openstack_seeder.seed_network_tags(
+                network, ['a', 'b', 'c'], make_args(), None)
+
+        m = openstack_seeder.metrics['entities']['network-tag']
+        self.assertEqual(m['calls'], 3)
+        self.assertEqual(m['noop'], 1)
+        self.assertEqual(m['changes'], {'create': 2})
+        self.assertEqual(neutron.add_tag.call_count, 2)
+        self.assertEqual(sorted(e['entity'] for e in openstack_seeder.trace),
+                         ['net/a', 'net/b', 'net/c'])
+
+    def test_unchanged_from_listing(self):
+        openstack_seeder.record_unchanged('role-assignment', 4)
+        openstack_seeder.record_unchanged('role-assignment', 0)
+        m = openstack_seeder.metrics['entities']['role-assignment']
+        self.assertEqual((m['calls'], m['noop']), (4, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import argparse
+import json
+import unittest
+from unittest import mock
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class Ec2CredentialPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        del openstack_seeder.plan[:]
+        self.addCleanup(openstack_seeder.plan.__delitem__, slice(None))
+        for name, value in (('dry_run', True),
+                            ('get_project_id', mock.Mock(return_value='p1')),
+                            ('get_user_id', mock.Mock(return_value='u1'))):
+            patcher = mock.patch.object(openstack_seeder, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_secret_key_not_planned(self):
+        keystone = mock.Mock()
+        keystone.credentials.get.return_value = None
+        project = argparse.Namespace(name='admin')
+        domain = argparse.Namespace(name='Default')
+        creds = [{'user': 'admin', 'user_domain': 'Default',
+                  'access': 'access-id', 'key': 'ec2-secret-key'}]
+        with mock.patch.object(openstack_seeder, 'get_client',
+                               return_value=keystone):
+            openstack_seeder.seed_project_ec2_creds(
+                project, domain, creds, make_args(), None)
+
+        plan = openstack_seeder.get_plan()
+        self.assertEqual(plan['summary'], {'create': 1})
+        self.assertEqual(plan['changes'][0]['attributes']['access'],
+                         'access-id')
+        self.assertNotIn('ec2-secret-key', json.dumps(plan))
+        keystone.credentials.create.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
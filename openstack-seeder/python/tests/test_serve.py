@@ -0,0 +1,66 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class ServeStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.seeded = []
+        self.leftovers = []
+
+        def seed_config(config, args, sess):
+            # every document starts with empty per-run caches
+            self.leftovers.append(
+                dict(openstack_seeder.designate_inventory,
+                     **openstack_seeder.neutron_inventory))
+            openstack_seeder.neutron_inventory['networks'] = {'a': 1}
+            openstack_seeder.designate_inventory['zones'] = {'b': 2}
+            self.seeded.append(config)
+
+        patcher = mock.patch.object(openstack_seeder, 'seed_config',
+                                    seed_config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve(self, content):
+        output = io.StringIO()
+        openstack_seeder.serve_stream(io.StringIO(content), output,
+                                      make_args(), None)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_one_result_per_terminated_document(self):
+        results = self.serve('roles: [{name: a}]\n'
+                             '---\n'
+                             'roles: [{name: b}]\n'
+                             '...\n'
+                             'roles: [{name: c}]\n'
+                             '...\n')
+        self.assertEqual(len(results), 2)
+        self.assertEqual([r['status'] for r in results], ['ok', 'ok'])
+        self.assertEqual([c['roles'][0]['name'] for c in self.seeded],
+                         ['a', 'b', 'c'])
+
+    def test_caches_are_cleared_per_document(self):
+        self.serve('roles: [{name: a}]\n...\nroles: [{name: b}]\n...\n')
+        self.assertEqual(len(self.seeded), 2)
+        self.assertEqual(self.leftovers, [{}, {}])
+
+    def test_empty_document_is_answered(self):
+        results = self.serve('...\n')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertEqual(self.seeded, [])
+
+    def test_parse_error_fails_the_document_only(self):
+        results = self.serve('roles: [\n...\nroles: [{name: b}]\n...\n')
+        self.assertEqual([r['status'] for r in results], ['failed', 'ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests import make_args
+
+import openstack_seeder
+
+
+class StateFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.seeded = []
+
+        def seed_config(config, args, sess):
+            for domain in config['domains']:
+                with openstack_seeder.metering('domain', domain['name'],
+                                               'seed_domain'):
+                    if openstack_seeder.subtree_unchanged(
+                            'domain', domain['name'], domain, args):
+                        continue
+                    self.seeded.append(domain['description'])
+                    for project in domain.get('projects', []):
+                        seed_project(domain, project, args)
+
+        def seed_project(domain, project, args):
+            with openstack_seeder.metering('project', project['name'],
+                                           'seed_project'):
+                if openstack_seeder.subtree_unchanged(
+                        'project', project['name'], project, args):
+                    return
+                if project.get('missing'):
+                    logging.warning("skipping project %s" % project['name'])
+
+        patcher = mock.patch.object(openstack_seeder, 'seed_config',
+                                    seed_config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def args(self, **kwargs):
+        kwargs.setdefault('state_file', os.path.join(self.dir, 'state.json'))
+        return make_args(**kwargs)
+
+    def apply(self, description, name, **kwargs):
+        config = {'domains': [{'name': 'Default',
+                               'description': description}]}
+        openstack_seeder.apply_seed(config, self.args(**kwargs), None, name)
+
+    def test_seeds_keep_their_own_fingerprints(self):
+        self.apply('a', 'ns/seed-a')
+        self.apply('b', 'ns/seed-b')
+        self.apply('a', 'ns/seed-a')
+        self.apply('b', 'ns/seed-b')
+        self.assertEqual(self.seeded, ['a', 'b'])
+
+        with open(self.args().state_file) as f:
+            self.assertEqual(sorted(json.load(f)),
+                             ['ns/seed-a:domain:Default',
+                              'ns/seed-b:domain:Default'])
+
+    def test_incomplete_subtrees_are_seeded_again(self):
+        config = {'domains': [
+            {'name': 'a', 'description': 'a',
+             'projects': [{'name': 'p', 'missing': True}]},
+            {'name': 'b', 'description': 'b'}]}
+        for _ in range(2):
+            openstack_seeder.apply_seed(json.loads(json.dumps(config)),
+                                        self.args(), None)
+        self.assertEqual(self.seeded, ['a', 'b', 'a'])
+
+        with open(self.args().state_file) as f:
+            self.assertEqual(sorted(json.load(f)), ['domain:b'])
+
+    def test_dry_run_does_not_skip_unchanged_subtrees(self):
+        self.apply('a', 'ns/seed-a')
+        self.apply('a', 'ns/seed-a', dry_run=True)
+        self.assertEqual(self.seeded, ['a', 'a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import tests  # noqa: F401
+
+import openstack_seeder
+
+
+def head_container(url, token, container, http_conn=None):
+    # swiftclient requests the path of the parsed url
+    head_container.calls.append((token, http_conn[1], http_conn[0].path))
+    if container == 'broken':
+        raise IOError('connection reset')
+    return {}
+
+
+class SwiftConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        openstack_seeder.swift_connections.clear()
+        self.addCleanup(openstack_seeder.swift_connections.clear)
+        head_container.calls = []
+        self.sess = mock.Mock()
+        self.sess.get_token.side_effect = ['token-%d' % i for i in range(100)]
+        patcher = mock.patch.object(
+            openstack_seeder.swiftclient, 'http_connection',
+            side_effect=lambda url, insecure: (url, mock.Mock()))
+        self.http_connection = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, container='c', url='https://swift/v1/AUTH_p'):
+        return openstack_seeder.swift_request(
+            head_container, url, self.sess, container)
+
+    def test_connections_shared_by_threads(self):
+        for _ in range(3):
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(lambda _: self.request(), range(4)))
+        self.assertLessEqual(self.http_connection.call_count, 4)
+        self.assertEqual(len(head_container.calls), 12)
+
+    def test_connection_reused_for_other_accounts(self):
+        self.request(url='https://swift/v1/AUTH_a')
+        self.request(url='https://swift/v1/AUTH_b')
+        self.assertEqual([c[2] for c in head_container.calls],
+                         ['/v1/AUTH_a', '/v1/AUTH_b'])
+        self.assertEqual(self.http_connection.call_count, 1)
+
+    def test_token_per_request(self):
+        self.request()
+        self.request()
+        self.assertEqual([c[0] for c in head_container.calls],
+                         ['token-0', 'token-1'])
+        self.assertEqual(self.http_connection.call_count, 1)
+
+    def test_broken_connection_dropped(self):
+        self.assertRaises(IOError, self.request, 'broken')
+        broken = head_container.calls[0][1]
+        broken.close.assert_called_once_with()
+        self.request()
+        self.assertIsNot(head_container.calls[1][1], broken)
+        self.assertEqual(self.http_connection.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()